@@ -1,16 +1,47 @@
 import sys
 
+from assets.StartupTracer import startup_tracer
+
+# 啟動追蹤需在其他匯入之前安裝
+startup_tracer.install_import_hook()
+
+from assets.SingleInstance import (InstanceServer, parse_command,
+                                   send_to_running_instance)
+
+# 已有執行中的實例時轉交參數後立即結束（在DDC探索與建立視窗之前）
+if __name__ == "__main__" and send_to_running_instance(sys.argv[1:]):
+    sys.exit(0)
+
 from PyQt6.QtCore import QRect, Qt, QTimer
 from PyQt6.QtGui import QAction, QBrush, QCursor, QIcon, QPainter, QPixmap
-from PyQt6.QtWidgets import (QApplication, QButtonGroup, QMenu, QMessageBox,
-                             QStyleFactory, QSystemTrayIcon, QWidget)
-
-from assets.DDCCI import DDCCIController
+from PyQt6.QtWidgets import (QApplication, QButtonGroup, QLabel, QMenu,
+                             QMessageBox, QStyleFactory, QSystemTrayIcon,
+                             QWidget)
+
+from assets.AdaptiveBrightness import AdaptiveBrightness
+from assets.AppPresetSwitcher import AppPresetSwitcher, create_foreground_source
+from assets.BusScheduler import BACKGROUND, BATCH, INTERACTIVE, BusScheduler
+from assets.ColorTemperature import (KELVIN_DEFAULT, KELVIN_MAX, KELVIN_MIN,
+                                     KELVIN_STEP, ColorTemperatureTable)
+from assets.DDCCI import create_controller, monitor_model
+from assets.DDCTrace import trace_recorder, traced_input
+from assets.DriftPoller import DriftPoller
+from assets.EventLog import event_log
 from assets.HotkeyManager import GlobalHotkeyManager
+from assets.LatencyTracer import LatencyTracer
 from assets.PresetManager import PresetManager
+from assets.ResumeReapply import ResumeReapplier
+from assets.ScreenIndex import ScreenGeometryIndex
+from assets.SoftwareDimming import DIM_LEVELS, SoftwareDimmer
+from assets.StallWatchdog import StallWatchdog
+from assets.StateSnapshot import (SnapshotVerifier, StateSnapshot,
+                                  monitor_identities)
+from assets.StateStore import StateStore
 from assets.styles import StyleSheets
 from assets.UIMode import UIMode
-from UI_files.UI import Ui_Form
+from assets.UsageAnalytics import CHECKPOINT_SECONDS, UsageAnalytics
+from assets.VCPControls import VCPControlPanel
+from UI_files.UI import ClickableSlider, Ui_Form
 
 QApplication.setHighDpiScaleFactorRoundingPolicy(
     Qt.HighDpiScaleFactorRoundingPolicy.PassThrough)
@@ -22,26 +53,34 @@ RED = 0x16
 GREEN = 0x18
 BLUE = 0x1A
 
+# 背景讀取在佇列中等待超過此時間（秒）即丟棄
+DRIFT_READ_TIMEOUT = 1.0
+
+# 動態VCP控制項在滑條面板中的起始位置（色溫滑條之下）
+DYNAMIC_CONTROLS_TOP = 190
+
 # X偏移與Y偏移
 X_OFFSET = 0
 Y_OFFSET = 0.9
 
 
-# 初始化控制器
-controller = DDCCIController()
-
-
 class MyWindow(QWidget, Ui_Form):
     """主視窗類 - VCP控制器的核心UI"""
 
-    def __init__(self, parent=None):
+    def __init__(self, controller, parent=None):
         super(MyWindow, self).__init__(parent)
-        self.setupUi(self)
+        self.controller = controller  # DDCCIController（或模擬、重播控制器）
+        with startup_tracer.phase('setupUi'):
+            self.setupUi(self)
 
         # 初始化核心組件
-        self.preset_manager = PresetManager()
-        self.hotkey_manager = GlobalHotkeyManager(self)
-        self.ui_mode_manager = UIMode(self)
+        with startup_tracer.phase('core components'):
+            self.latency_tracer = LatencyTracer()
+            self.preset_manager = PresetManager()
+            trace_recorder.record_config(self.preset_manager.config)
+            self.hotkey_manager = GlobalHotkeyManager(
+                self, self.preset_manager.get_hotkey_backend())
+            self.ui_mode_manager = UIMode(self)
 
         # 初始化狀態變數
         self._init_variables()
@@ -61,15 +100,51 @@ class MyWindow(QWidget, Ui_Form):
 
         # VCP相關
         self.monitor_idx = 0  # 使用第一台顯示器
-        self.current_preset = [0]*len(controller.monitors)
+        self.screen_count = len(self.controller.monitors)
         self.vcp_changed = False
-        self.screen_count = len(controller.monitors)
+
+        # 所有匯流排存取依優先等級排程（互動 > 批次 > 背景），主線程不等待DDC
+        self.bus = BusScheduler(self.controller)
+
+        # 每台顯示器的VCP值與目前預設，變更每幀合併為一次UI更新
+        self.state = StateStore(self.screen_count, self)
+        self.state.changed.connect(self._on_state_changed)
+        self.vcp_temp = self.state
+        self.current_preset = self.state.presets
+
+        # 快速啟動：以顯示器識別保存的最後狀態取代啟動時的DDC讀取，再於背景驗證
+        self.warm_start = self.preset_manager.get_warm_start()
+        self.state_snapshot = StateSnapshot(monitor_identities(self.controller.monitors))
+        self.state.changed.connect(
+            lambda changes: self.state_snapshot.save_later(self.vcp_temp))
+        self.snapshot_verifier = SnapshotVerifier(self.bus.client(BACKGROUND), self)
+        self.snapshot_verifier.mismatch.connect(self._on_drift_detected)
+        self.snapshot_verifier.maximum.connect(self._on_vcp_maximum)
+
+        # 使用統計（選用）：由已套用的亮度寫入與預設切換累計直方圖與每日統計
+        self.usage_analytics = None
+        if self.preset_manager.get_usage_analytics():
+            self.usage_analytics = UsageAnalytics(
+                self.state_snapshot.identities, self._usage_brightness_level)
+            self.bus.add_listener(self.usage_analytics.record)
+            self.state.changed.connect(self._record_preset_usage)
+            self.usage_timer = QTimer(self)
+            self.usage_timer.timeout.connect(self.usage_analytics.save)
+            self.usage_timer.start(CHECKPOINT_SECONDS * 1000)
+
+        # 延遲初始化（首次使用時才建立）
+        self.tray_menu = None
+        self.vcp_panel = None  # 依顯示器能力建立的VCP控制項（首次展開時建立）
+        self._button_panel_ready = False
+        self._presets_filled = False
 
         # 配置相關
         self.auto_hide_seconds = self.preset_manager.get_auto_hide_seconds()
+        self.prewarm_panel = self.preset_manager.get_prewarm_panel()
 
-        # UI佈局
-        self._calculate_default_position()
+        # UI佈局（螢幕範圍與預設位置由 QScreen 信號維護）
+        self.screen_index = ScreenGeometryIndex(QApplication.instance(), self)
+        self.x_default, self.y_default = self.screen_index.position(0)
 
         # VCP控制配置
         self.vcp_controls = [
@@ -80,72 +155,117 @@ class MyWindow(QWidget, Ui_Form):
             (self.slider_5, self.label_5, BLUE),
         ]
 
+        # 色溫控制（每台顯示器一張預先計算的查找表）
+        self.color_tables = {}
+        self._pending_color_temp = None
+
+        # 亮度匹配（每台顯示器依型號的響應曲線查表，型號取自EDID）
+        self.link_brightness = self.preset_manager.get_link_brightness()
+        self.brightness_curves = [
+            self.preset_manager.get_brightness_curve(
+                monitor_model(monitor), monitor['description'])
+            for monitor in self.controller.monitors
+        ]
+
+        # 軟體調光（選用）：亮度可低於硬體最小值，調整時由遮罩即時反映
+        self.dimmer = None
+        if self.preset_manager.get_software_dimming():
+            self.dimmer = SoftwareDimmer(
+                self.bus, self.brightness_curves, self.screen_index, self)
+            self.slider_1.setMinimum(-DIM_LEVELS)
+
     def _init_presets(self):
         """初始化預設配置"""
         # 檢查並初始化空預設
         self.preset_manager.initialize_screens(self.screen_count)
-        self._create_empty_presets()
 
-        # 緩存當前亮度值
-        self._load_current_vcp_values()
+        # 緩存當前VCP值（空預設的填入延後到首次使用預設時）
+        with startup_tracer.phase('VCP state'):
+            self._load_current_vcp_values()
+        if self.dimmer is not None:
+            for i in range(self.screen_count):
+                if BRIGHTNESS in self.vcp_temp[i]:
+                    self.dimmer.sync(i, self.vcp_temp[i][BRIGHTNESS])
 
         # 設置當前預設
         for i in range(self.screen_count):
             self.current_preset[i] = self.preset_manager.get_last_preset(i)
         self._update_button_selection()
 
+        if self.usage_analytics is not None:
+            for i in range(self.screen_count):
+                if BRIGHTNESS in self.vcp_temp[i]:
+                    self.usage_analytics.record(i, BRIGHTNESS, self.vcp_temp[i][BRIGHTNESS])
+
     def _init_app(self):
         """初始化應用程式數據"""
         self._init_presets()
         self.hide()  # 初始隱藏
+        if self.prewarm_panel:
+            self.winId()  # 預先建立原生窗口
+            self.ui_mode_manager.prepare_collapsed()
+
+        # 事件循環卡頓偵測（選用）
+        self.stall_watchdog = None
+        if self.preset_manager.get_stall_watchdog():
+            self.stall_watchdog = StallWatchdog(self)
+            self.stall_watchdog.start()
+
+        # 背景偵測顯示器OSD等外部造成的狀態漂移
+        self.drift_poller = DriftPoller(
+            self.bus.client(BACKGROUND, timeout=DRIFT_READ_TIMEOUT), lambda: self.vcp_temp, self)
+        self.drift_poller.drift_detected.connect(self._on_drift_detected)
+        if self.preset_manager.get_drift_poll():
+            self.drift_poller.start()
+
+        # 內容自適應亮度（選用）：依畫面明暗在背景等級調整亮度
+        self.adaptive_brightness = None
+        if self.preset_manager.get_adaptive_brightness():
+            dark_level, bright_level = self.preset_manager.get_adaptive_brightness_range()
+            self.adaptive_brightness = AdaptiveBrightness(
+                self.screen_index, dark_level, bright_level, parent=self)
+            for i in range(self.screen_count):
+                self.adaptive_brightness.mapper(i).reset(self._brightness_level(i))
+            self.adaptive_brightness.brightness_requested.connect(
+                self._apply_adaptive_brightness)
+            self.adaptive_brightness.start()
+
+        # 系統喚醒或螢幕開啟後重新套用快取的狀態（顯示器可能已回到出廠值）
+        self.resume_reapplier = ResumeReapplier(
+            self.bus.client(BATCH), lambda: self.vcp_temp, self)
+        if self.preset_manager.get_reapply_on_resume():
+            self.resume_reapplier.install(self)
+
+        # 依前景程式自動切換預設（有設定規則且平台支援時）
+        self.app_preset_switcher = None
+        rules = self.preset_manager.get_app_preset_rules(self.screen_count)
+        source = create_foreground_source(self) if rules else None
+        if source is not None:
+            self.app_preset_switcher = AppPresetSwitcher(source, rules, self)
+            self.app_preset_switcher.preset_requested.connect(self._apply_app_preset)
+            self.app_preset_switcher.start()
 
     def _get_current_screen_index(self):
-        """獲取滑鼠當前所在螢幕的索引"""
-        try:
-            # 獲取滑鼠位置
-            cursor_pos = QCursor.pos()
-
-            # 遍歷所有螢幕
-            screens = QApplication.screens()
-            for i, screen in enumerate(screens):
-                if screen.geometry().contains(cursor_pos):
-                    self.monitor_idx = i
-                    break
-            else:
-                # 如果沒找到，返回主螢幕
-                self.monitor_idx = 0
-
-        except Exception:
-            self.monitor_idx = 0  # 預設返回第一個螢幕
-
-    def _calculate_default_position(self):
-        """更新每個螢幕的UI預設位置"""
-        self.screen_pos = []
-        screens = QApplication.screens()
-        for screen in screens:
-            geom = screen.availableGeometry()
-            pos = (
-                geom.x() + geom.width() // 2 - 115,
-                geom.y() + geom.height() - geom.height() // 9
-            )
-            self.screen_pos.append(pos)
-        self.x_default, self.y_default = self.screen_pos[0]
+        """獲取滑鼠當前所在螢幕的索引（查詢快取的螢幕範圍）"""
+        self.monitor_idx = self.screen_index.index_at(QCursor.pos())
 
     def _position_ui_on_current_screen(self):
         """根據目前螢幕 index 顯示 UI"""
         self._get_current_screen_index()
-        if not hasattr(self, 'screen_pos') or len(self.screen_pos) != len(QApplication.screens()):
-            self._calculate_default_position()
-        self.x_default, self.y_default = self.screen_pos[self.monitor_idx]
+        self.x_default, self.y_default = self.screen_index.position(
+            self.monitor_idx)
 
     def _setup_components(self):
-        """設置各種UI組件"""
-        self._setup_window_properties()
-        self._setup_system_tray()
+        """設置各種UI組件（預設按鈕面板延後到首次展開時設置）"""
+        with startup_tracer.phase('stylesheet'):
+            self._setup_window_properties()
+        with startup_tracer.phase('tray icon'):
+            self._setup_system_tray()
         self._setup_auto_hide_timer()
-        self._setup_button_group()
+        self._setup_color_temperature_control()
         self._connect_signals()
-        self._setup_global_hotkeys()
+        with startup_tracer.phase('hotkeys'):
+            self._setup_global_hotkeys()
 
     def _setup_window_properties(self):
         """設置窗口屬性"""
@@ -168,8 +288,7 @@ class MyWindow(QWidget, Ui_Form):
         self.tray_icon.setIcon(self._create_tray_icon())
         self.tray_icon.setToolTip("VCP 控制器")
 
-        # 設置托盤選單
-        self.tray_icon.setContextMenu(self._create_tray_menu())
+        # 托盤選單在首次右鍵點擊時才建立
         self.tray_icon.activated.connect(self._on_tray_activated)
 
         # 顯示托盤圖示
@@ -196,6 +315,28 @@ class MyWindow(QWidget, Ui_Form):
         show_action.triggered.connect(self.show_collapsed_ui)
         tray_menu.addAction(show_action)
 
+        latency_action = QAction("顯示延遲統計", self)
+        latency_action.triggered.connect(self._show_latency_summary)
+        tray_menu.addAction(latency_action)
+
+        bus_action = QAction("顯示匯流排統計", self)
+        bus_action.triggered.connect(self._show_bus_summary)
+        tray_menu.addAction(bus_action)
+
+        if self.stall_watchdog is not None:
+            stall_action = QAction("顯示卡頓統計", self)
+            stall_action.triggered.connect(self._show_stall_summary)
+            tray_menu.addAction(stall_action)
+
+        if self.usage_analytics is not None:
+            usage_action = QAction("匯出使用統計", self)
+            usage_action.triggered.connect(self._export_usage)
+            tray_menu.addAction(usage_action)
+
+        dump_action = QAction("匯出診斷紀錄", self)
+        dump_action.triggered.connect(self._dump_event_log)
+        tray_menu.addAction(dump_action)
+
         tray_menu.addSeparator()
 
         quit_action = QAction("結束程式", self)
@@ -210,6 +351,43 @@ class MyWindow(QWidget, Ui_Form):
         self.auto_hide_timer.setSingleShot(True)
         self.auto_hide_timer.timeout.connect(self._auto_hide_ui)
 
+    def _setup_color_temperature_control(self):
+        """在展開面板底部加入色溫滑條"""
+        self.resize(224, 260)
+
+        self.t_label = QLabel("🌡", parent=self.widget_2)
+        self.t_label.setGeometry(QRect(11, 160, 25, 25))
+        self.t_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        self.slider_temp = ClickableSlider(parent=self.widget_2)
+        self.slider_temp.setGeometry(QRect(53, 160, 110, 25))
+        self.slider_temp.setOrientation(Qt.Orientation.Horizontal)
+        self.slider_temp.setRange(KELVIN_MIN, KELVIN_MAX)
+        self.slider_temp.setSingleStep(KELVIN_STEP)
+        self.slider_temp.setPageStep(KELVIN_STEP * 5)
+        self.slider_temp.setValue(KELVIN_DEFAULT)
+
+        self.label_temp = QLabel(str(KELVIN_DEFAULT // 100), parent=self.widget_2)
+        self.label_temp.setGeometry(QRect(175, 165, 21, 16))
+        self.label_temp.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        self.ui_mode_manager.add_expanded_elements(
+            self.slider_temp, self.t_label)
+
+        # 拖曳時合併為每輪事件循環一次寫入
+        self.color_temp_timer = QTimer(self)
+        self.color_temp_timer.setSingleShot(True)
+        self.color_temp_timer.timeout.connect(self._flush_color_temperature)
+        self.slider_temp.valueChanged.connect(self._on_color_temp_changed)
+
+    def _ensure_button_panel(self):
+        """首次顯示預設按鈕面板時才完成設置"""
+        if self._button_panel_ready:
+            return
+        self._setup_button_group()
+        self._button_panel_ready = True
+        self._update_button_selection()
+
     def _setup_button_group(self):
         """設置預設按鈕組"""
         self.button_group = QButtonGroup()
@@ -221,6 +399,7 @@ class MyWindow(QWidget, Ui_Form):
         ]
 
         for button, btn_id in buttons:
+            button.setProperty(StyleSheets.SELECTED_PROPERTY, False)
             self.button_group.addButton(button, btn_id)
             button.clicked.connect(
                 lambda checked, preset_id=btn_id: self._on_preset_button_clicked(
@@ -235,10 +414,10 @@ class MyWindow(QWidget, Ui_Form):
         self.sun_button.clicked.connect(self._toggle_expand)
 
         # VCP滑條信號
-        for i, (slider, label, vcp_code) in enumerate(self.vcp_controls):
+        for slider, label, vcp_code in self.vcp_controls:
             slider.valueChanged.connect(
-                lambda value, idx=i, lbl=label: self._on_slider_changed(
-                    idx, value, lbl)
+                lambda value, code=vcp_code, lbl=label: self._on_slider_changed(
+                    code, value, lbl)
             )
 
     def _setup_global_hotkeys(self):
@@ -256,6 +435,12 @@ class MyWindow(QWidget, Ui_Form):
             hotkey_config['brightness_down']
         )
 
+    def _ensure_presets_filled(self):
+        """首次使用預設時為空預設填入當前VCP值"""
+        if not self._presets_filled:
+            self._presets_filled = True
+            self._create_empty_presets()
+
     def _create_empty_presets(self):
         """為空的預設填入當前VCP值"""
         for screen_idx in range(self.screen_count):
@@ -264,52 +449,103 @@ class MyWindow(QWidget, Ui_Form):
                 if self.preset_manager.is_preset_empty(screen_idx, i)
             ]
 
-            if empty_presets:
-                # 切換到該螢幕獲取VCP值
-                old_monitor = self.monitor_idx
-                self.monitor_idx = screen_idx
-                current_values = self._get_current_vcp_values()
-
-                # 為空預設填入值
-                for preset_id in empty_presets:
-                    self.preset_manager.save_preset(
-                        screen_idx, preset_id, current_values)
-
-                # 恢復原來的螢幕
-                self.monitor_idx = old_monitor
-
-    def _get_current_vcp_values(self):
-        """獲取當前所有VCP值"""
-        values = []
-        for _, _, vcp_code in self.vcp_controls:
-            try:
-                value = controller.VCP_get(self.monitor_idx, vcp_code)[0]
-                values.append(value)
-            except Exception:
-                values.append(50)  # 預設值
-        return values
+            # 為空預設填入該螢幕的當前值
+            for preset_id in empty_presets:
+                self.preset_manager.save_preset(
+                    screen_idx, preset_id, self.vcp_temp[screen_idx])
 
     def _load_current_vcp_values(self):
-        """載入當前VCP值到UI"""
-        self.vcp_temp = []
+        """載入當前VCP值：有快照的顯示器直接使用並在背景驗證，其餘讀取DDC"""
+        snapshot = self.state_snapshot.load() if self.warm_start else [None] * self.screen_count
+        verify = {}
+        cold = []
         for i in range(self.screen_count):
-            self.vcp_temp.append([])
-            for slider, label, vcp_code in self.vcp_controls:
-                current_value = controller.VCP_get(
-                    i, vcp_code)[0]
-                self.vcp_temp[i].append(current_value)
+            if snapshot[i]:
+                self.state.load(i, snapshot[i])
+                verify[i] = snapshot[i]
+            else:
+                cold.append(i)
+        for i, values in self._read_vcp_values(cold).items():
+            self.state.load(i, values)
+        if verify:
+            self.snapshot_verifier.start(verify)
+
+    def _read_vcp_values(self, monitor_indices):
+        """經由匯流排排程器讀取顯示器所有支援的VCP值 {顯示器索引: {VCP代碼: 值}}
+
+        各顯示器的讀取在各自的執行線程並行，主線程等待全部完成。
+        """
+        slider_codes = {vcp_code for _, _, vcp_code in self.vcp_controls}
+        supported = {i: self.bus.supported_codes(i, BATCH) for i in monitor_indices}
+        reads = {i: {vcp_code: self.bus.get(i, vcp_code, BATCH)
+                     for vcp_code in supported[i].result() or ()}
+                 for i in monitor_indices}
+
+        all_values = {}
+        for monitor_idx, requests in reads.items():
+            values = all_values[monitor_idx] = {}
+            for vcp_code, request in requests.items():
+                result = request.result()
+                if result is not None:
+                    values[vcp_code] = result['current']
+                    if vcp_code == BRIGHTNESS:
+                        self.brightness_curves[monitor_idx].set_max(result['max'])
+                    continue
+                event_log.record('read_vcp_value', monitor_idx, vcp_code, error='read failed')
+                # 滑條控制的代碼讀取失敗時使用預設值，其他代碼不保存
+                if vcp_code in slider_codes:
+                    values[vcp_code] = 50
+        return all_values
 
     def _set_current_slider_values(self):
         """載入當前VCP值到UI"""
-        self._loading_preset = True
-        i = 0
         for slider, label, vcp_code in self.vcp_controls:
-            try:
-                slider.setValue(self.vcp_temp[self.monitor_idx][i])
-            except Exception:
-                slider.setValue(50)
-            i += 1
-        self._loading_preset = False
+            self._show_slider_value(slider, label, self._slider_value(
+                vcp_code, self.vcp_temp[self.monitor_idx].get(vcp_code, 50)))
+        self._sync_color_temperature_slider()
+
+    @staticmethod
+    def _show_slider_value(slider, label, value):
+        """更新滑條與標籤顯示（不觸發 valueChanged）"""
+        slider.blockSignals(True)
+        slider.setValue(value)
+        slider.blockSignals(False)
+        label.setText(str(value))
+
+    def _on_state_changed(self, changes):
+        """狀態變更批次（每幀最多一次）：只更新目前螢幕改變的控制項"""
+        if self.monitor_idx not in changes:
+            return
+        codes, preset_changed = changes[self.monitor_idx]
+        values = self.vcp_temp[self.monitor_idx]
+        for slider, label, vcp_code in self.vcp_controls:
+            # 使用者正在拖曳的滑條不更新
+            if vcp_code in codes and not slider.isSliderDown():
+                self._show_slider_value(
+                    slider, label, self._slider_value(vcp_code, values.get(vcp_code, 50)))
+        if self.vcp_panel is not None:
+            self.vcp_panel.update(codes, values)
+        if codes & {RED, GREEN, BLUE} and not self.slider_temp.isSliderDown():
+            self._sync_color_temperature_slider()
+        if preset_changed:
+            self._update_button_selection()
+
+    def _color_table(self, monitor_idx):
+        """顯示器的色溫查找表（套用該顯示器的RGB校正）"""
+        if monitor_idx not in self.color_tables:
+            self.color_tables[monitor_idx] = ColorTemperatureTable(
+                self.preset_manager.get_color_correction(monitor_idx))
+        return self.color_tables[monitor_idx]
+
+    def _sync_color_temperature_slider(self):
+        """依目前RGB增益將色溫滑條移到最接近的色溫（不觸發寫入）"""
+        values = self.vcp_temp[self.monitor_idx]
+        gains = [values.get(code, 100) for code in (RED, GREEN, BLUE)]
+        kelvin = self._color_table(self.monitor_idx).nearest_kelvin(gains)
+        self.slider_temp.blockSignals(True)
+        self.slider_temp.setValue(kelvin)
+        self.slider_temp.blockSignals(False)
+        self.label_temp.setText(str(kelvin // 100))
 
     # 事件處理方法
     def enterEvent(self, event):
@@ -326,70 +562,215 @@ class MyWindow(QWidget, Ui_Form):
     def closeEvent(self, event):
         """關閉事件 - 最小化到系統托盤"""
         event.ignore()
-        self.ui_mode_manager.hide_all_panels()
-        self.hide()
-        self.ui_mode = None
+        self._hide_ui()
 
     # 快捷鍵和按鈕事件處理
     def _on_tray_activated(self, reason):
         """系統托盤激活事件"""
         if reason == QSystemTrayIcon.ActivationReason.DoubleClick:
             self.show_collapsed_ui()
+        elif reason == QSystemTrayIcon.ActivationReason.Context:
+            if self.tray_menu is None:
+                self.tray_menu = self._create_tray_menu()
+            self.tray_menu.popup(QCursor.pos())
 
+    @traced_input()
     def _on_preset_button_clicked(self, preset_id):
         """預設按鈕點擊事件"""
         if self.ui_mode == 'compact':
             # 快捷模式：載入預設後立即隱藏
             # self.load_preset(preset_id)
-            self.ui_mode_manager.hide_all_panels()
-            self.hide()
-            self.ui_mode = None
+            self._hide_ui()
 
-    def _on_slider_changed(self, vcp_index, value, label):
+    @traced_input('set_slider_value',
+                  encode=lambda self, vcp_code, value, label: [vcp_code, value])
+    def _on_slider_changed(self, vcp_code, value, label):
         """滑條值改變事件"""
         # 更新標籤顯示
         label.setText(str(value))
         self.vcp_changed = True
 
-        # 防止載入預設時觸發VCP設定
-        if hasattr(self, '_loading_preset') and self._loading_preset:
-            return
+        # 設定VCP值（亮度以感知亮度查表）
+        if vcp_code == BRIGHTNESS:
+            self._apply_brightness_level(value)
+        else:
+            self._set_vcp_value(vcp_code, value)
 
-        # 設定VCP值
-        self._set_vcp_value(vcp_index, self.vcp_controls[vcp_index][2], value)
+    @traced_input('set_slider_value',
+                  encode=lambda self, vcp_code, value: [vcp_code, value])
+    def _on_control_changed(self, vcp_code, value):
+        """動態VCP控制項（滑條、開關、清單）改變事件"""
+        self.vcp_changed = True
+        self._set_vcp_value(vcp_code, value)
 
     # UI顯示方法
 
+    @traced_input('set_color_temperature',
+                  encode=lambda self, kelvin: [kelvin])
+    def _on_color_temp_changed(self, kelvin):
+        """色溫滑條改變事件 - 只記錄目標值，寫入合併到下一輪事件循環"""
+        self.label_temp.setText(str(kelvin // 100))
+        self._pending_color_temp = kelvin
+        if not self.color_temp_timer.isActive():
+            self.color_temp_timer.start(0)
+
+    def _flush_color_temperature(self):
+        """以一批寫入套用最新的色溫（只寫入改變的增益）"""
+        kelvin, self._pending_color_temp = self._pending_color_temp, None
+        if kelvin is None:
+            return
+        red, green, blue = self._color_table(self.monitor_idx).gains_for(kelvin)
+        self._apply_vcp_values({RED: red, GREEN: green, BLUE: blue}, INTERACTIVE)
+        self.vcp_changed = True
+
+    def set_color_temperature(self, kelvin):
+        """設定色溫滑條（用於重播使用者拖曳）"""
+        self.slider_temp.setValue(kelvin)
+
+    def set_slider_value(self, vcp_code, value):
+        """設定指定VCP代碼的滑條值（用於重播使用者拖曳）"""
+        for slider, _, code in self.vcp_controls:
+            if code == vcp_code:
+                slider.setValue(value)
+                return
+        if self.vcp_panel is None or not self.vcp_panel.set_value(vcp_code, value):
+            self._on_control_changed(vcp_code, value)
+
+    @traced_input()
     def show_collapsed_ui(self):
         """顯示收縮狀態UI"""
+        self.latency_tracer.begin_if_idle('collapsed')
+        self.latency_tracer.mark('slot')
         self._position_ui_on_current_screen()
-        self.slider_1.setValue(self.vcp_temp[self.monitor_idx][0])
+        self.latency_tracer.mark('position')
+        self._show_slider_value(
+            self.slider_1, self.label, self._brightness_level(self.monitor_idx))
         self.ui_mode = 'collapsed'
         self.ui_mode_manager.set_collapsed()
+        self.latency_tracer.mark('layout')
         self._show_and_activate()
 
+    @traced_input()
     def show_compact_ui(self):
         """顯示快捷模式UI"""
+        self.latency_tracer.begin_if_idle('compact')
+        self.latency_tracer.mark('slot')
         self._position_ui_on_current_screen()
+        self.latency_tracer.mark('position')
         self.ui_mode = 'compact'
+        self._ensure_button_panel()
         self.ui_mode_manager.set_compact()
+        self.latency_tracer.mark('layout')
         self._show_and_activate()
 
+    @traced_input()
     def _toggle_expand(self):
         """切換展開/收縮狀態"""
         if self.is_expanded:
             self.ui_mode_manager.set_collapsed()
         else:
             self._set_current_slider_values()
+            extra_height = self._show_vcp_panel()
+            self._ensure_button_panel()
             self._update_button_selection()
-            self.ui_mode_manager.set_expanded()
+            self.ui_mode_manager.set_expanded(extra_height)
+
+    def _show_vcp_panel(self):
+        """顯示目前螢幕支援的動態VCP控制項（首次展開時才建立），返回所需的額外高度"""
+        if self.vcp_panel is None:
+            self.vcp_panel = VCPControlPanel(
+                self.widget_2, DYNAMIC_CONTROLS_TOP, self.bus, self)
+            self.vcp_panel.value_changed.connect(self._on_control_changed)
+            self.vcp_panel.capabilities_changed.connect(self._on_vcp_capabilities_changed)
+        return self.vcp_panel.show_for(self.monitor_idx, self.vcp_temp[self.monitor_idx])
+
+    def _on_vcp_capabilities_changed(self, monitor_idx):
+        """能力字串在背景讀取完成：展開中的面板依實際可選值重新建立控制項"""
+        if self.is_expanded and monitor_idx == self.monitor_idx:
+            self.ui_mode_manager.set_expanded(self._show_vcp_panel())
 
     def _show_and_activate(self):
         """顯示並激活窗口"""
         self.show()
         self.activateWindow()
         self.raise_()
+        self.latency_tracer.mark('shown')
+        self.drift_poller.notify_active()
         self._start_auto_hide_timer()
+        # 下一輪事件循環時窗口已完成繪製
+        QTimer.singleShot(0, self.latency_tracer.finish)
+
+    def _on_drift_detected(self, monitor_idx, vcp_code, value, read_started):
+        """實際VCP值與快取不同：更新快取與UI（讀取開始後有寫入請求則忽略）"""
+        if self.bus.last_write_time(monitor_idx) > read_started:
+            return
+        if self.vcp_temp[monitor_idx].get(vcp_code) == value:
+            return
+
+        event_log.record('drift', monitor_idx, vcp_code,
+                         detail=f"{self.vcp_temp[monitor_idx].get(vcp_code)} -> {value}")
+        self.vcp_temp[monitor_idx][vcp_code] = value
+        if vcp_code == BRIGHTNESS and self.dimmer is not None:
+            self.dimmer.sync(monitor_idx, value)
+        if self.usage_analytics is not None:
+            self.usage_analytics.record(monitor_idx, vcp_code, value)
+
+    def _on_vcp_maximum(self, monitor_idx, vcp_code, maximum):
+        """快照載入的狀態驗證時讀到VCP最大值：以顯示器回報的亮度最大值重建響應曲線"""
+        if vcp_code != BRIGHTNESS:
+            return
+        if self.brightness_curves[monitor_idx].set_max(maximum) and self.dimmer is not None:
+            value = self.vcp_temp[monitor_idx].get(BRIGHTNESS)
+            if value is not None:
+                self.dimmer.sync(monitor_idx, value)
+
+    def _usage_brightness_level(self, monitor_idx, value):
+        """使用統計記錄的亮度：VCP值對應的感知亮度（可能在匯流排線程呼叫，只查表）"""
+        return self.brightness_curves[monitor_idx].level_for(value)
+
+    def _record_preset_usage(self, changes):
+        """狀態變更批次：記錄預設切換到使用統計"""
+        for monitor_idx, (_, preset_changed) in changes.items():
+            if preset_changed:
+                self.usage_analytics.record_preset(monitor_idx, self.current_preset[monitor_idx])
+
+    def _hide_ui(self):
+        """隱藏UI（預熱模式下同時排好下次顯示的佈局）"""
+        if self.prewarm_panel:
+            self.hide()
+            self.ui_mode_manager.prepare_collapsed()
+        else:
+            self.ui_mode_manager.hide_all_panels()
+            self.hide()
+        self.ui_mode = None
+
+    def _dump_event_log(self):
+        """將事件紀錄輸出到檔案"""
+        try:
+            path = event_log.dump()
+            self.tray_icon.showMessage("診斷紀錄", f"已輸出至 {path}")
+        except OSError as e:
+            self.tray_icon.showMessage("診斷紀錄", f"輸出失敗: {e}")
+
+    def _export_usage(self):
+        """將使用統計輸出為 CSV"""
+        try:
+            paths = self.usage_analytics.export_csv()
+            self.tray_icon.showMessage("使用統計", "已輸出至 " + "、".join(paths))
+        except OSError as e:
+            self.tray_icon.showMessage("使用統計", f"輸出失敗: {e}")
+
+    def _show_latency_summary(self):
+        """在托盤通知顯示延遲統計"""
+        self.tray_icon.showMessage("顯示延遲", self.latency_tracer.summary())
+
+    def _show_bus_summary(self):
+        """在托盤通知顯示匯流排排程統計"""
+        self.tray_icon.showMessage("匯流排排程", self.bus.summary())
+
+    def _show_stall_summary(self):
+        """在托盤通知顯示卡頓統計"""
+        self.tray_icon.showMessage("事件循環卡頓", self.stall_watchdog.summary())
 
     # 自動隱藏相關
     def _start_auto_hide_timer(self):
@@ -404,16 +785,16 @@ class MyWindow(QWidget, Ui_Form):
 
     def _auto_hide_ui(self):
         """自動隱藏UI"""
-        self.ui_mode_manager.hide_all_panels()
-        self.hide()
-        self.ui_mode = None
+        self._hide_ui()
 
+    @traced_input()
     def load_preset_and_show_compact(self, preset_id):
         """載入預設並顯示快捷模式UI"""
         self.show_compact_ui()
         self.load_preset(preset_id)
 
     # VCP操作方法
+    @traced_input()
     def adjust_brightness(self, adjustment):
         """調整亮度（快捷鍵觸發）"""
         try:
@@ -423,79 +804,211 @@ class MyWindow(QWidget, Ui_Form):
             else:
                 self._start_auto_hide_timer()
 
-            # 計算新亮度值
-            new_brightness = max(
-                0, min(100, self.vcp_temp[self.monitor_idx][0] + adjustment))
+            # 計算新亮度值（感知亮度）：調整硬體亮度時VCP值至少移動一格
+            level = self._brightness_level(self.monitor_idx)
+            if level >= 0 and level + adjustment >= 0:
+                level = self.brightness_curves[self.monitor_idx].step(
+                    self.vcp_temp[self.monitor_idx].get(BRIGHTNESS, 50), adjustment)
+            else:
+                level += adjustment
+            new_brightness = max(self.slider_1.minimum(), min(100, level))
 
             # 更新UI（會自動觸發VCP設定）
             self.slider_1.setValue(new_brightness)
 
-        except Exception:
-            pass  # 靜默處理錯誤
+        except Exception as e:
+            event_log.record('adjust_brightness', self.monitor_idx,
+                             BRIGHTNESS, error=repr(e))
+
+    def _set_vcp_value(self, vcp_code, value, monitor_idx=None, priority=INTERACTIVE):
+        """設定VCP值（預設為目前螢幕），寫入排入匯流排排程器後立即返回"""
+        if monitor_idx is None:
+            monitor_idx = self.monitor_idx
+        if vcp_code == BRIGHTNESS and self.dimmer is not None:
+            self.dimmer.sync(monitor_idx, value)
+        if not self.vcp_temp[monitor_idx].get(vcp_code) == value:
+            self.bus.set(monitor_idx, vcp_code, value, priority)
+            self.vcp_temp[monitor_idx][vcp_code] = value
+
+    def _brightness_level(self, monitor_idx):
+        """顯示器目前的感知亮度"""
+        value = self.vcp_temp[monitor_idx].get(BRIGHTNESS, 50)
+        return self._dimmed_level(
+            monitor_idx, self.brightness_curves[monitor_idx].level_for(value))
+
+    def _dimmed_level(self, monitor_idx, level):
+        """硬體已在最低亮度時，加上軟體調光的部分（小於 0）"""
+        if self.dimmer is not None and level <= 0:
+            target = self.dimmer.target_level(monitor_idx)
+            if target is not None:
+                return min(level, target)
+        return level
+
+    def _slider_value(self, vcp_code, value):
+        """VCP值對應的滑條值（亮度滑條顯示感知亮度）"""
+        if vcp_code == BRIGHTNESS:
+            return self._dimmed_level(
+                self.monitor_idx, self.brightness_curves[self.monitor_idx].level_for(value))
+        return value
+
+    def _set_brightness_level(self, level, monitor_idx):
+        """以感知亮度設定螢幕（軟體調光時遮罩立即反映，硬體在背景寫入）"""
+        self._notify_manual_brightness(monitor_idx, level)
+        if self.dimmer is None:
+            self._set_vcp_value(
+                BRIGHTNESS, self.brightness_curves[monitor_idx].vcp_for(level), monitor_idx)
+            return
+        self.vcp_temp[monitor_idx][BRIGHTNESS] = self.dimmer.set_level(monitor_idx, level)
+        if self.isVisible():
+            self.raise_()  # 遮罩不蓋住控制面板
+
+    def _notify_manual_brightness(self, monitor_idx, level=None):
+        """使用者調整了亮度：內容自適應亮度暫停並以新亮度為基準"""
+        if self.adaptive_brightness is not None:
+            if level is None:
+                level = self._brightness_level(monitor_idx)
+            self.adaptive_brightness.notify_manual(monitor_idx, level)
+
+    def _apply_adaptive_brightness(self, monitor_idx, level):
+        """內容自適應亮度要求的感知亮度（背景等級寫入，不影響互動操作）"""
+        if monitor_idx >= self.screen_count or BRIGHTNESS not in self.vcp_temp[monitor_idx]:
+            return
+        self._set_vcp_value(
+            BRIGHTNESS, self.brightness_curves[monitor_idx].vcp_for(level), monitor_idx, BACKGROUND)
 
-    def _set_vcp_value(self, vcp_index, vcp_code, value):
-        """設定VCP值"""
-        try:
-            if not self.vcp_temp[self.monitor_idx][vcp_index] == value:
-                controller.VCP_set(self.monitor_idx, vcp_code, value)
-                self.vcp_temp[self.monitor_idx][vcp_index] = value
-        except Exception:
-            pass  # 靜默處理錯誤
+    def _apply_brightness_level(self, level):
+        """以感知亮度設定目前螢幕，連動模式下同步其他螢幕"""
+        self._set_brightness_level(level, self.monitor_idx)
+        self._link_brightness(level)
+
+    def _link_brightness(self, level):
+        """連動模式：其他螢幕各自查表設定相同的感知亮度"""
+        if not self.link_brightness:
+            return
+        for monitor_idx in range(self.screen_count):
+            if monitor_idx != self.monitor_idx and BRIGHTNESS in self.vcp_temp[monitor_idx]:
+                self._set_brightness_level(level, monitor_idx)
+
+    def _apply_vcp_values(self, values, priority=BATCH):
+        """批次套用 {VCP代碼: 值}：只寫入顯示器支援且有改變的代碼（滑條由狀態變更批次更新）"""
+        supported = self.vcp_temp[self.monitor_idx]
+        for vcp_code, value in values.items():
+            if vcp_code in supported:
+                self._set_vcp_value(vcp_code, value, priority=priority)
+
+        if BRIGHTNESS in values and BRIGHTNESS in supported:
+            self._notify_manual_brightness(self.monitor_idx)
+            self._link_brightness(self._brightness_level(self.monitor_idx))
 
     # 預設管理方法
+    @traced_input()
     def load_preset(self, preset_id):
         """載入預設配置"""
+        self._ensure_presets_filled()
         values = self.preset_manager.get_preset(self.monitor_idx, preset_id)
         if not values:
             return
 
-        # 防止觸發VCP設定
-        self._loading_preset = True
-
-        # 設定所有滑條值並更新VCP
-        for vcp_index, ((slider, _, vcp_code), value) in enumerate(zip(self.vcp_controls, values)):
-            slider.setValue(value)
-            self._set_vcp_value(
-                vcp_index, self.vcp_controls[vcp_index][2], value)
-
-        # 完成載入
-        self._loading_preset = False
+        self._apply_vcp_values(values)
 
-        # 更新狀態
+        # 更新狀態（按鈕選取由狀態變更批次更新）
         self.current_preset[self.monitor_idx] = preset_id
         self.preset_manager.save_last_preset(preset_id, self.monitor_idx)
-        self._update_button_selection()
+
+    def _apply_app_preset(self, monitor_idx, preset_id):
+        """前景程式切換時為指定螢幕套用預設（只寫入與目前狀態不同的值）"""
+        self._ensure_presets_filled()
+        values = self.preset_manager.get_preset(monitor_idx, preset_id)
+        if not values:
+            return
+
+        supported = self.vcp_temp[monitor_idx]
+        for vcp_code, value in values.items():
+            if vcp_code in supported:
+                self._set_vcp_value(vcp_code, value, monitor_idx, BATCH)
+        if BRIGHTNESS in values and BRIGHTNESS in supported:
+            self._notify_manual_brightness(monitor_idx)
+
+        if self.current_preset[monitor_idx] != preset_id:
+            self.current_preset[monitor_idx] = preset_id
+            self.preset_manager.save_last_preset(preset_id, monitor_idx)
 
     def _save_current_preset(self):
         """保存當前值到選中的預設"""
+        self._ensure_presets_filled()
         if self.current_preset[self.monitor_idx] is not None:
             self.preset_manager.save_preset(
                 self.monitor_idx, self.current_preset[self.monitor_idx], self.vcp_temp[self.monitor_idx])
 
     def _update_button_selection(self):
-        """更新按鈕選取效果"""
+        """更新按鈕選取效果（只重新套用狀態改變的兩個按鈕）"""
+        if not self._button_panel_ready:
+            return
+        selected = self.current_preset[self.monitor_idx]
+        previous = getattr(self, '_last_selected_preset', None)
         # 避免重複更新相同狀態
-        if hasattr(self, '_last_selected_preset') and self._last_selected_preset == self.current_preset[self.monitor_idx]:
+        if previous == selected:
             return
-        buttons = [self.button_1, self.button_2, self.button_3, self.button_4]
-        for i, button in enumerate(buttons, 1):
-            if i == self.current_preset[self.monitor_idx]:
-                button.setStyleSheet(StyleSheets.get_selected_button_style())
-            else:
-                button.setStyleSheet(StyleSheets.get_normal_button_style())
-        self._last_selected_preset = self.current_preset[self.monitor_idx]
+
+        buttons = {1: self.button_1, 2: self.button_2,
+                   3: self.button_3, 4: self.button_4}
+        for preset_id in (previous, selected):
+            button = buttons.get(preset_id)
+            if button is None:
+                continue
+            button.setProperty(StyleSheets.SELECTED_PROPERTY,
+                               preset_id == selected)
+            button.style().unpolish(button)
+            button.style().polish(button)
+        self._last_selected_preset = selected
+
+    # 其他實例轉交的命令
+    def handle_command(self, args):
+        """處理命令列參數（無參數時顯示控制面板）"""
+        options = parse_command(args)
+        if options is None:
+            event_log.record('instance_command', error=' '.join(args))
+            return
+
+        if options.set:
+            self._get_current_screen_index()
+            self._apply_vcp_values(dict(options.set))
+        if options.preset:
+            self.load_preset_and_show_compact(options.preset)
+        elif options.compact:
+            self.show_compact_ui()
+        elif options.show or not options.set:
+            self.show_collapsed_ui()
 
     # 清理和退出
     def _cleanup_and_quit(self):
         """清理資源並退出程式"""
         self.hotkey_manager.cleanup()
-        controller.cleanup()
+        self.drift_poller.stop()
+        if self.adaptive_brightness is not None:
+            self.adaptive_brightness.stop()
+        if self.stall_watchdog is not None:
+            self.stall_watchdog.stop()
+        self.resume_reapplier.uninstall()
+        if self.dimmer is not None:
+            self.dimmer.close()
+        if self.app_preset_switcher is not None:
+            self.app_preset_switcher.stop()
+        self.bus.close()
+        self.state_snapshot.flush()
+        if self.usage_analytics is not None:
+            self.usage_analytics.save()
+        self.controller.cleanup()
         QApplication.quit()
 
 
 def main():
     """主程式入口點"""
-    app = QApplication(sys.argv)
+    # 未處理的例外發生時輸出事件紀錄
+    event_log.install_crash_handler()
+
+    with startup_tracer.phase('QApplication'):
+        app = QApplication(sys.argv)
     app.setStyle(QStyleFactory.create("WindowsVista"))
 
     # 設置程式不會因為所有窗口關閉而結束
@@ -506,8 +1019,24 @@ def main():
         QMessageBox.critical(None, "系統托盤", "系統托盤不可用")
         return 1
 
+    # 單一實例：啟動期間已有其他實例開始監聽時，轉交參數後結束
+    instance_server = InstanceServer()
+    if not instance_server.listen():
+        send_to_running_instance(sys.argv[1:])
+        return 0
+
+    # 確定是唯一的實例後才探索顯示器（轉交參數的啟動不碰DDC）
+    with startup_tracer.phase('DDC discovery'):
+        controller = create_controller()
+
     # 創建主窗口
-    window = MyWindow()
+    window = MyWindow(controller)
+    instance_server.command_received.connect(window.handle_command)
+    if sys.argv[1:]:
+        QTimer.singleShot(0, lambda: window.handle_command(sys.argv[1:]))
+
+    # 事件循環開始後輸出啟動報告（需設定 VCPANEL_TRACE_STARTUP）
+    QTimer.singleShot(0, startup_tracer.report)
 
     # 運行應用程式
     return app.exec()
@@ -0,0 +1,206 @@
+import time
+
+import numpy as np
+from PyQt6.QtCore import QObject, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QImage
+
+# 取樣畫面大小（grabWindow 後以最近鄰縮小）
+SAMPLE_WIDTH = 64
+SAMPLE_HEIGHT = 36
+
+INTERVAL_MS = 2000   # 每台螢幕的取樣間隔
+CPU_BUDGET = 0.02    # 取樣與計算佔用主線程時間的上限（比例）
+HYSTERESIS = 6       # 目標亮度至少改變多少才寫入（感知亮度級數）
+STABLE_SAMPLES = 2   # 新目標需連續出現的取樣次數（切換視窗的瞬間畫面不會觸發）
+MANUAL_HOLD = 60.0   # 使用者手動調整亮度後暫停的秒數
+PERCENTILE = 90
+PERCENTILE_WEIGHT = 0.3  # 亮部（百分位數）在畫面亮度中的權重
+
+# sRGB 值 -> 線性光的查找表
+_LINEAR = np.linspace(0, 1, 256)
+SRGB_TO_LINEAR = np.where(_LINEAR <= 0.04045, _LINEAR / 12.92,
+                          ((_LINEAR + 0.055) / 1.055) ** 2.4).astype(np.float32)
+# Rec.709 亮度係數（R, G, B）
+LUMA_WEIGHTS = np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+
+
+def frame_luminance(frame):
+    """計算畫面的 (平均亮度, 百分位數亮度)，皆為 0~1 的相對亮度
+
+    frame 為 H×W×3 的 RGB uint8 陣列。
+    """
+    luminance = SRGB_TO_LINEAR[frame] @ LUMA_WEIGHTS
+    return float(luminance.mean()), float(np.percentile(luminance, PERCENTILE))
+
+
+def image_to_frame(image):
+    """將 QImage 轉為 H×W×3 的 RGB uint8 陣列"""
+    image = image.convertToFormat(QImage.Format.Format_RGB32)
+    width, height = image.width(), image.height()
+    buffer = image.constBits()
+    buffer.setsize(image.sizeInBytes())
+    pixels = np.frombuffer(buffer, np.uint8).reshape(height, image.bytesPerLine() // 4, 4)
+    # Format_RGB32 在記憶體中為 B, G, R, A
+    return pixels[:, :width, 2::-1].copy()
+
+
+def grab_screen_frame(screen):
+    """擷取螢幕並縮小為取樣畫面，失敗時返回None"""
+    pixmap = screen.grabWindow(0)
+    if pixmap.isNull():
+        return None
+    image = pixmap.toImage().scaled(
+        SAMPLE_WIDTH, SAMPLE_HEIGHT,
+        Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.FastTransformation)
+    return image_to_frame(image)
+
+
+class LuminanceMapper:
+    """將畫面亮度對應到目標感知亮度（含遲滯）
+
+    暗的畫面（深色 IDE）使用 dark_level，亮的畫面（白底文件）使用 bright_level，
+    之間線性內插。目標與目前相差不到 HYSTERESIS，或新目標尚未連續出現
+    STABLE_SAMPLES 次時不改變。
+    """
+
+    def __init__(self, dark_level, bright_level,
+                 hysteresis=HYSTERESIS, stable_samples=STABLE_SAMPLES):
+        self.dark_level = dark_level
+        self.bright_level = bright_level
+        self.hysteresis = hysteresis
+        self.stable_samples = stable_samples
+        self.level = None      # 目前套用的目標
+        self._candidate = None
+        self._candidate_count = 0
+
+    def target_for(self, mean, percentile):
+        """畫面亮度對應的目標感知亮度（不含遲滯）"""
+        # 相對亮度以平方根壓縮，接近感知上的明暗
+        brightness = ((1 - PERCENTILE_WEIGHT) * mean + PERCENTILE_WEIGHT * percentile) ** 0.5
+        return round(self.dark_level + (self.bright_level - self.dark_level) * brightness)
+
+    def reset(self, level=None):
+        """以目前實際的感知亮度為基準重新開始"""
+        self.level = level
+        self._candidate = None
+        self._candidate_count = 0
+
+    def update(self, mean, percentile):
+        """加入一次取樣，目標需要改變時返回新的感知亮度，否則返回None"""
+        target = self.target_for(mean, percentile)
+        if self.level is not None and abs(target - self.level) < self.hysteresis:
+            self._candidate = None
+            self._candidate_count = 0
+            return None
+
+        if self._candidate is not None and abs(target - self._candidate) < self.hysteresis:
+            self._candidate_count += 1
+        else:
+            self._candidate = target
+            self._candidate_count = 1
+        if self._candidate_count < self.stable_samples:
+            return None
+
+        self.level = target
+        self._candidate = None
+        self._candidate_count = 0
+        return target
+
+
+class AdaptiveBrightness(QObject):
+    """內容自適應亮度 - 定期取樣每個螢幕的畫面亮度並要求調整亮度
+
+    在主線程以計時器輪流取樣一個螢幕（grabWindow 必須在GUI線程），並依
+    實際耗時拉長間隔，使佔用時間不超過 CPU_BUDGET。frame_source 可替換為
+    返回合成畫面的函式以便測試。
+    """
+
+    # 信號參數：顯示器索引, 目標感知亮度
+    brightness_requested = pyqtSignal(int, int)
+
+    def __init__(self, screen_index, dark_level, bright_level,
+                 frame_source=grab_screen_frame, parent=None):
+        super().__init__(parent)
+        self.screen_index = screen_index
+        self.dark_level = dark_level
+        self.bright_level = bright_level
+        self.frame_source = frame_source
+        self.mappers = {}
+        self.cost_ms = 0.0  # 最近一次取樣與計算的耗時
+        self._hold_until = {}
+        self._cursor = 0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._tick)
+
+    def start(self):
+        self._timer.start(INTERVAL_MS)
+
+    def stop(self):
+        self._timer.stop()
+
+    def notify_manual(self, monitor_idx, level=None):
+        """使用者手動調整亮度：暫停該螢幕並以新的亮度為基準"""
+        self._hold_until[monitor_idx] = time.monotonic() + MANUAL_HOLD
+        self.mapper(monitor_idx).reset(level)
+
+    def mapper(self, monitor_idx):
+        if monitor_idx not in self.mappers:
+            self.mappers[monitor_idx] = LuminanceMapper(self.dark_level, self.bright_level)
+        return self.mappers[monitor_idx]
+
+    def process(self, monitor_idx, frame):
+        """處理一個取樣畫面，需要調整時返回目標感知亮度"""
+        if time.monotonic() < self._hold_until.get(monitor_idx, 0.0):
+            return None
+        return self.mapper(monitor_idx).update(*frame_luminance(frame))
+
+    def _tick(self):
+        """取樣下一個螢幕，並依耗時排定下一次"""
+        screens = self.screen_index.screens
+        started = time.perf_counter()
+        if screens:
+            self._cursor %= len(screens)
+            monitor_idx = self._cursor
+            self._cursor += 1
+            frame = self.frame_source(screens[monitor_idx])
+            level = None if frame is None else self.process(monitor_idx, frame)
+            if level is not None:
+                self.brightness_requested.emit(monitor_idx, level)
+        self.cost_ms = (time.perf_counter() - started) * 1000
+
+        # 每個螢幕各自 INTERVAL_MS 取樣一次，且佔用比例不超過 CPU_BUDGET
+        interval = INTERVAL_MS / max(1, len(screens))
+        self._timer.start(round(max(interval, self.cost_ms / CPU_BUDGET)))
+
+
+# 使用範例（合成畫面）
+
+
+def _demo():
+    rng = np.random.default_rng(0)
+    frames = {
+        'dark IDE': rng.integers(20, 60, (SAMPLE_HEIGHT, SAMPLE_WIDTH, 3), dtype=np.uint8),
+        'white document': np.full((SAMPLE_HEIGHT, SAMPLE_WIDTH, 3), 245, dtype=np.uint8),
+        'mixed': np.concatenate([
+            np.full((SAMPLE_HEIGHT, SAMPLE_WIDTH // 2, 3), 30, dtype=np.uint8),
+            np.full((SAMPLE_HEIGHT, SAMPLE_WIDTH // 2, 3), 240, dtype=np.uint8)], axis=1),
+    }
+    mapper = LuminanceMapper(dark_level=70, bright_level=40)
+    for name in ('dark IDE', 'dark IDE', 'white document', 'dark IDE',
+                 'white document', 'white document', 'mixed', 'mixed'):
+        mean, percentile = frame_luminance(frames[name])
+        print(f"{name:15s} mean {mean:.3f} p{PERCENTILE} {percentile:.3f}"
+              f" -> target {mapper.target_for(mean, percentile):3d}"
+              f" write {mapper.update(mean, percentile)}")
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        frame_luminance(frames['mixed'])
+    print(f"frame_luminance: {(time.perf_counter() - start):.3f} ms/次"
+          f"（{SAMPLE_WIDTH}×{SAMPLE_HEIGHT}）")
+
+
+if __name__ == "__main__":
+    _demo()
@@ -0,0 +1,162 @@
+import ctypes
+import os
+from ctypes import wintypes
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from assets.EventLog import event_log
+
+# Windows API 常數
+EVENT_SYSTEM_FOREGROUND = 0x0003
+WINEVENT_OUTOFCONTEXT = 0x0000
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+
+class ForegroundSource(QObject):
+    """前景視窗事件來源 - 前景程式改變時發出程式名稱（小寫，例如 code.exe）"""
+
+    foreground_changed = pyqtSignal(str)
+
+    def start(self):
+        """開始監聽"""
+
+    def stop(self):
+        """停止監聽"""
+
+
+class FakeForegroundSource(ForegroundSource):
+    """測試用的前景事件來源"""
+
+    def activate(self, process_name):
+        """模擬切換到指定程式"""
+        self.foreground_changed.emit(process_name.lower())
+
+
+class WindowsForegroundSource(ForegroundSource):
+    """以 SetWinEventHook 監聽前景視窗切換（回調在 Qt 主線程的訊息循環中執行）"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 獨立的 DLL 物件，宣告的函數型別不影響其他模組
+        # （HANDLE 返回值未宣告時會被截斷為 32 位元的 int）
+        self.user32 = ctypes.WinDLL('user32')
+        self.kernel32 = ctypes.WinDLL('kernel32')
+        self._event_proc = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+        self._declare_functions()
+        self._hook = None
+        self._callback = None
+
+    def _declare_functions(self):
+        user32, kernel32 = self.user32, self.kernel32
+        user32.SetWinEventHook.argtypes = [
+            wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, self._event_proc,
+            wintypes.DWORD, wintypes.DWORD, wintypes.DWORD]
+        user32.SetWinEventHook.restype = wintypes.HANDLE
+        user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+        user32.UnhookWinEvent.restype = wintypes.BOOL
+        user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, wintypes.LPDWORD]
+        user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+        kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+        kernel32.OpenProcess.restype = wintypes.HANDLE
+        kernel32.QueryFullProcessImageNameW.argtypes = [
+            wintypes.HANDLE, wintypes.DWORD, wintypes.LPWSTR, wintypes.LPDWORD]
+        kernel32.QueryFullProcessImageNameW.restype = wintypes.BOOL
+        kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        kernel32.CloseHandle.restype = wintypes.BOOL
+
+    def start(self):
+        if self._hook:
+            return
+        # 保留回調引用，避免被回收
+        self._callback = self._event_proc(self._on_event)
+        self._hook = self.user32.SetWinEventHook(
+            EVENT_SYSTEM_FOREGROUND, EVENT_SYSTEM_FOREGROUND,
+            None, self._callback, 0, 0, WINEVENT_OUTOFCONTEXT)
+
+    def stop(self):
+        if self._hook:
+            self.user32.UnhookWinEvent(self._hook)
+            self._hook = None
+
+    def _on_event(self, hook, event, hwnd, id_object, id_child, thread_id, event_time):
+        name = self._process_name(hwnd)
+        if name:
+            self.foreground_changed.emit(name)
+
+    def _process_name(self, hwnd):
+        """視窗所屬程式的執行檔名稱"""
+        pid = wintypes.DWORD()
+        self.user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        process = self.kernel32.OpenProcess(
+            PROCESS_QUERY_LIMITED_INFORMATION, False, pid.value)
+        if not process:
+            return None
+        try:
+            size = wintypes.DWORD(260)
+            buffer = ctypes.create_unicode_buffer(size.value)
+            if not self.kernel32.QueryFullProcessImageNameW(
+                    process, 0, buffer, ctypes.byref(size)):
+                return None
+            return os.path.basename(buffer.value).lower()
+        finally:
+            self.kernel32.CloseHandle(process)
+
+
+def create_foreground_source(parent=None):
+    """建立目前平台可用的前景事件來源，不支援時返回None"""
+    if hasattr(ctypes, 'windll'):
+        return WindowsForegroundSource(parent)
+    return None
+
+
+class AppPresetSwitcher(QObject):
+    """依前景程式自動切換預設
+
+    rules 為 {程式名稱: {顯示器索引: 預設編號}}。前景切換經過防抖，
+    快速 alt-tab 回到原程式不會觸發任何寫入；重複聚焦同一程式也不會重新套用。
+    """
+
+    # 信號參數：顯示器索引, 預設編號
+    preset_requested = pyqtSignal(int, int)
+
+    DEBOUNCE_MS = 800
+
+    def __init__(self, source, rules, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.rules = rules
+        self.current_app = None
+        self._pending_app = None
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.timeout.connect(self._apply_pending)
+        self.source.foreground_changed.connect(self._on_foreground_changed)
+
+    def start(self):
+        self.source.start()
+
+    def stop(self):
+        self._debounce_timer.stop()
+        self.source.stop()
+
+    def _on_foreground_changed(self, process_name):
+        """記錄最新的前景程式並重新開始防抖計時"""
+        self._pending_app = process_name
+        self._debounce_timer.start(self.DEBOUNCE_MS)
+
+    def _apply_pending(self):
+        """防抖結束：只有前景程式真的換了且有對應規則時才切換"""
+        app_name, self._pending_app = self._pending_app, None
+        if app_name is None or app_name == self.current_app:
+            return
+        self.current_app = app_name
+
+        presets = self.rules.get(app_name)
+        if not presets:
+            return
+        event_log.record('app_preset', detail=f"{app_name}: {presets}")
+        for monitor_idx, preset_id in presets.items():
+            self.preset_requested.emit(monitor_idx, preset_id)
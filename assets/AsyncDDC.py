@@ -0,0 +1,122 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncDDCController:
+    """DDCCIController 的 asyncio 介面
+
+    controller 可為 BusScheduler.client() 返回的 BusClient，指令即與程式的其他
+    匯流排存取一同依優先等級排程（BusClient 會阻塞，因此在執行緒池中呼叫）。
+    同一台顯示器的指令以各自的 asyncio.Lock 序列化，不同顯示器的指令
+    在執行緒池中並行，因此「所有螢幕設定亮度」的耗時取決於最慢的匯流排。
+    逾時或取消時，已送出的匯流排交易無法中斷，會在實際完成後才釋放該顯示器的鎖。
+    """
+
+    def __init__(self, controller, executor=None, timeout=None):
+        self.controller = controller
+        self.timeout = timeout
+        self._own_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=max(1, len(controller.monitors)),
+            thread_name_prefix='ddc')
+        self._locks = {}
+        self._loop = None
+
+    def _lock(self, monitor_idx):
+        """顯示器的 asyncio 鎖（換了事件循環時重新建立）"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._locks = {}
+        return self._locks.setdefault(monitor_idx, asyncio.Lock())
+
+    async def _run(self, monitor_idx, func, *args, timeout=None):
+        """在執行緒池中執行一個匯流排操作（含等待鎖的時間都計入逾時）"""
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+
+        # 逾時直接取消 acquire 本身（Lock.acquire 被取消時不會持有鎖）；
+        # Python 3.12 之前的 wait_for 在逾時與取得鎖同時發生時會遺失已取得的鎖
+        lock = self._lock(monitor_idx)
+        async with asyncio.timeout_at(deadline):
+            await lock.acquire()
+
+        future = loop.run_in_executor(self.executor, func, *args)
+        try:
+            async with asyncio.timeout_at(deadline):
+                result = await asyncio.shield(future)
+        except BaseException:
+            if future.done():
+                lock.release()
+            else:
+                future.add_done_callback(
+                    lambda f: (f.cancelled() or f.exception(), lock.release()))
+            raise
+        lock.release()
+        return result
+
+    async def get(self, monitor_idx, vcp_code, timeout=None):
+        """讀取VCP值，返回 {'current', 'max'}，失敗時返回None"""
+        return await self._run(monitor_idx, self.controller.get_vcp_feature,
+                               monitor_idx, vcp_code, timeout=timeout)
+
+    async def set(self, monitor_idx, vcp_code, value, timeout=None):
+        """設定VCP值，返回是否成功"""
+        return await self._run(monitor_idx, self.controller.VCP_set,
+                               monitor_idx, vcp_code, value, timeout=timeout)
+
+    async def get_all(self, vcp_code, timeout=None):
+        """並行讀取所有顯示器（失敗的顯示器以例外物件表示）"""
+        return await asyncio.gather(
+            *(self.get(i, vcp_code, timeout) for i in range(len(self.controller.monitors))),
+            return_exceptions=True)
+
+    async def set_all(self, vcp_code, value, timeout=None):
+        """並行設定所有顯示器（失敗的顯示器以例外物件表示）"""
+        return await asyncio.gather(
+            *(self.set(i, vcp_code, value, timeout) for i in range(len(self.controller.monitors))),
+            return_exceptions=True)
+
+    def close(self):
+        """關閉自行建立的執行緒池"""
+        if self._own_executor:
+            self.executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+# 使用範例
+
+
+async def _demo(controller):
+    async with AsyncDDCController(controller, timeout=2.0) as ddc:
+        start = time.perf_counter()
+        results = await ddc.set_all(0x10, 60)
+        print(f"set_all 亮度 60: {results} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+
+        start = time.perf_counter()
+        values = await ddc.get_all(0x10)
+        print(f"get_all 亮度: {values} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+
+
+def main():
+    from assets.BusScheduler import INTERACTIVE, BusScheduler
+    from assets.DDCCI import create_controller
+
+    controller = create_controller()
+    bus = BusScheduler(controller)
+    try:
+        asyncio.run(_demo(bus.client(INTERACTIVE)))
+    finally:
+        bus.close()
+        controller.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import numpy as np
+
+LEVEL_MAX = 100
+
+
+class BrightnessCurve:
+    """亮度響應曲線 - 將感知亮度（0~100）分段線性對應到顯示器的VCP亮度值
+
+    曲線的值以顯示器VCP最大值的百分比表示，依顯示器回報的最大值（set_max）
+    預先計算正向與反向查找表，調整亮度時只需查表。
+    """
+
+    IDENTITY = ((0, 0), (LEVEL_MAX, LEVEL_MAX))
+
+    def __init__(self, points=IDENTITY, vcp_max=LEVEL_MAX):
+        points = sorted((int(level), int(value)) for level, value in points)
+        if len(points) < 2:
+            points = list(self.IDENTITY)
+        self.points = points
+
+        self._levels = np.array([p[0] for p in points], dtype=np.float64)
+        # 確保單調遞增，反向查表才有意義
+        self._values = np.maximum.accumulate(
+            np.array([p[1] for p in points], dtype=np.float64))
+        self.vcp_max = None
+        self.set_max(vcp_max)
+
+    def set_max(self, vcp_max):
+        """依顯示器回報的VCP最大值重建查找表，最大值改變時返回True"""
+        vcp_max = int(vcp_max) if vcp_max and vcp_max > 0 else LEVEL_MAX
+        if vcp_max == self.vcp_max:
+            return False
+        values = self._values * vcp_max / LEVEL_MAX
+        # 四捨五入（np.rint 的銀行家捨入會讓相鄰的 .5 交替落在不同方向）
+        levels = np.arange(LEVEL_MAX + 1, dtype=np.float64)
+        self.to_vcp = np.clip(np.floor(np.interp(levels, self._levels, values) + 0.5),
+                              0, vcp_max).astype(int).tolist()
+        steps = np.arange(vcp_max + 1, dtype=np.float64)
+        self.to_level = np.clip(np.floor(np.interp(steps, values, self._levels) + 0.5),
+                                0, LEVEL_MAX).astype(int).tolist()
+        self.vcp_max = vcp_max
+        return True
+
+    @classmethod
+    def parse(cls, text):
+        """解析 "0:0, 50:35, 100:100" 格式，無效時返回線性曲線"""
+        try:
+            points = [tuple(int(x) for x in item.split(':'))
+                      for item in text.split(',') if item.strip()]
+            if all(len(p) == 2 for p in points):
+                return cls(points)
+        except ValueError:
+            pass
+        return cls()
+
+    def format(self):
+        """格式化為 "0:0, 50:35, 100:100" 字串"""
+        return ', '.join(f'{level}:{value}' for level, value in self.points)
+
+    def vcp_for(self, level):
+        """感知亮度對應的VCP值"""
+        return self.to_vcp[max(0, min(LEVEL_MAX, level))]
+
+    def level_for(self, value):
+        """VCP值對應的感知亮度"""
+        to_level = self.to_level
+        return to_level[max(0, min(len(to_level) - 1, value))]
+
+    def step(self, value, adjustment):
+        """從VCP值 value 調整 adjustment 感知亮度，返回新的感知亮度
+
+        曲線平緩處多個感知亮度對應同一VCP值，此時繼續往調整方向找，
+        確保VCP值至少移動一格（已在 0 或最大值時不變）。
+        """
+        level = max(0, min(LEVEL_MAX, self.level_for(value) + adjustment))
+        if adjustment > 0:
+            while level < LEVEL_MAX and self.vcp_for(level) <= value:
+                level += 1
+        elif adjustment < 0:
+            while level > 0 and self.vcp_for(level) >= value:
+                level -= 1
+        return level
@@ -0,0 +1,341 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from assets.EventLog import event_log
+
+# 優先等級（數字越小越優先）
+INTERACTIVE = 0  # 滑條拖曳、快捷鍵
+BATCH = 1        # 使用者觸發的批次：載入預設、前景程式預設、喚醒後重新套用
+BACKGROUND = 2   # 背景讀取：漂移偵測
+CLASS_NAMES = ('interactive', 'batch', 'background')
+
+# 較低等級的請求等待超過此時間（秒）時優先執行，避免被持續的高優先請求餓死
+MAX_WAIT = (None, 0.5, 2.0)
+
+WAIT_SAMPLES = 256
+
+
+class BusRequest(Future):
+    """一筆排隊的匯流排操作（set 的結果為是否成功，get 為 {'current', 'max'} 或None，
+    supported_codes 為支援的VCP代碼清單或None）
+
+    status: queued / running / done / expired（超過期限未執行）/ replaced（被新的寫入取代）
+    """
+
+    def __init__(self, op, monitor_idx, vcp_code, value, priority, deadline):
+        super().__init__()
+        self.op = op
+        self.monitor_idx = monitor_idx
+        self.vcp_code = vcp_code
+        self.value = value
+        self.priority = priority
+        self.deadline = deadline
+        self.submitted = time.perf_counter()
+        self.enqueued = self.submitted  # 防止飢餓的等待起點（取代時沿用被取代者的）
+        self.status = 'queued'
+
+    def failed_result(self):
+        return False if self.op == 'set' else None
+
+
+class _ClassStats:
+    """單一優先等級的統計"""
+
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.replaced = 0
+        self.expired = 0
+        self.max_depth = 0
+        self.waits = deque(maxlen=WAIT_SAMPLES)  # 開始執行前的等待（毫秒）
+
+
+class _MonitorQueue:
+    """單一顯示器的三個等級佇列與背景執行線程"""
+
+    def __init__(self):
+        self.queues = tuple(deque() for _ in CLASS_NAMES)
+        self.writes = {}   # VCP代碼 -> 排隊中的寫入（供新的寫入取代）
+        self.running = None
+        self.thread = None
+
+    def depth(self):
+        return sum(len(queue) for queue in self.queues)
+
+
+class BusScheduler:
+    """依優先等級排程的匯流排存取 - 每台顯示器一條執行線程
+
+    所有寫入來源與背景讀取都經由此處，互動操作永遠排在批次與背景之前；
+    等待過久的低優先請求會被提前（MAX_WAIT）。同一代碼排隊中的寫入會被
+    新的寫入取代，超過期限仍未執行的請求直接丟棄。
+    """
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.last_write_requests = {}  # 顯示器索引 -> 最後一次送出寫入請求的時間
+        self.stats_by_class = tuple(_ClassStats() for _ in CLASS_NAMES)
+        self.listeners = []  # 寫入成功後在執行線程呼叫 (顯示器索引, VCP代碼, 值)
+        self._monitors = {}
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def submit(self, op, monitor_idx, vcp_code, value=None, priority=INTERACTIVE, timeout=None):
+        """排入一筆 'get'、'set' 或 'supported_codes' 操作並立即返回 BusRequest
+        （timeout 秒內未開始則丟棄）"""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        request = BusRequest(op, monitor_idx, vcp_code, value, priority, deadline)
+        with self._condition:
+            if self._closed:
+                request.status = 'expired'
+                request.set_result(request.failed_result())
+                return request
+            monitor = self._monitor(monitor_idx)
+            stats = self.stats_by_class[priority]
+            stats.submitted += 1
+            if op == 'set':
+                self.last_write_requests[monitor_idx] = request.submitted
+                placed = self._replace_queued_write(monitor, request)
+                monitor.writes[vcp_code] = request
+            else:
+                placed = False
+            if not placed:
+                monitor.queues[request.priority].append(request)
+            stats.max_depth = max(stats.max_depth, len(monitor.queues[priority]))
+            self._condition.notify_all()
+        return request
+
+    def set(self, monitor_idx, vcp_code, value, priority=INTERACTIVE, timeout=None):
+        """排入寫入（不等待結果）"""
+        return self.submit('set', monitor_idx, vcp_code, value, priority, timeout)
+
+    def get(self, monitor_idx, vcp_code, priority=BACKGROUND, timeout=None):
+        """排入讀取（以 result() 等待結果）"""
+        return self.submit('get', monitor_idx, vcp_code, None, priority, timeout)
+
+    def supported_codes(self, monitor_idx, priority=BACKGROUND, codes=None, timeout=None):
+        """排入能力查詢（讀取並快取能力字串，沒有能力字串時逐一探測），結果為支援的代碼清單"""
+        return self.submit('supported_codes', monitor_idx, None, codes, priority, timeout)
+
+    def client(self, priority, timeout=None):
+        """以指定等級存取匯流排、介面與控制器相同的同步物件（供背景線程使用）"""
+        return BusClient(self, priority, timeout)
+
+    def add_listener(self, callback):
+        """訂閱已套用的寫入（回調在執行線程上執行，不可阻塞）"""
+        self.listeners.append(callback)
+
+    def pending(self, monitor_idx):
+        """顯示器排隊中與執行中的請求數"""
+        with self._condition:
+            monitor = self._monitors.get(monitor_idx)
+            if monitor is None:
+                return 0
+            return monitor.depth() + (monitor.running is not None)
+
+    def last_write_time(self, monitor_idx):
+        """最後一次寫入請求或寫入完成的時間（較晚者）"""
+        return max(self.last_write_requests.get(monitor_idx, 0.0),
+                   self.controller.last_write_times.get(monitor_idx, 0.0))
+
+    def wait_idle(self, timeout=None):
+        """等待所有佇列清空且結果（含 done callback）都已送出，逾時返回False"""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with self._condition:
+            while any(monitor.depth() or monitor.running is not None
+                      for monitor in self._monitors.values()):
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self):
+        """丟棄排隊中的請求並停止執行線程（執行中的交易會先完成）"""
+        with self._condition:
+            self._closed = True
+            for monitor in self._monitors.values():
+                for queue in monitor.queues:
+                    for request in queue:
+                        request.status = 'expired'
+                        request.set_result(request.failed_result())
+                    queue.clear()
+                monitor.writes.clear()
+            self._condition.notify_all()
+        for monitor in list(self._monitors.values()):
+            if monitor.thread is not threading.current_thread():
+                monitor.thread.join(timeout=1.0)
+
+    def _monitor(self, monitor_idx):
+        """顯示器的佇列（首次使用時啟動執行線程）"""
+        monitor = self._monitors.get(monitor_idx)
+        if monitor is None:
+            monitor = self._monitors[monitor_idx] = _MonitorQueue()
+            monitor.thread = threading.Thread(
+                target=self._run, args=(monitor_idx, monitor),
+                name=f'BusScheduler-{monitor_idx}', daemon=True)
+            monitor.thread.start()
+        return monitor
+
+    def _replace_queued_write(self, monitor, request):
+        """同一代碼已有排隊中的寫入：新的寫入接替其位置（等級取較高者），已放入佇列時返回True"""
+        previous = monitor.writes.get(request.vcp_code)
+        if previous is None or previous.status != 'queued':
+            return False
+        queue = monitor.queues[previous.priority]
+        index = queue.index(previous)
+        request.enqueued = previous.enqueued
+        previous.status = 'replaced'
+        self.stats_by_class[previous.priority].replaced += 1
+        request.add_done_callback(lambda f: previous.set_result(f.result()))
+        if request.priority >= previous.priority:
+            request.priority = previous.priority
+            queue[index] = request
+            return True
+        del queue[index]
+        return False
+
+    def _next_request(self, monitor):
+        """選出下一筆請求：等待過久的低優先請求先執行，其次依等級"""
+        now = time.perf_counter()
+        starved = [queue[0] for priority, queue in enumerate(monitor.queues)
+                   if queue and MAX_WAIT[priority] is not None
+                   and now - queue[0].enqueued > MAX_WAIT[priority]]
+        if starved:
+            request = min(starved, key=lambda r: r.enqueued)
+        else:
+            request = next(queue[0] for queue in monitor.queues if queue)
+        monitor.queues[request.priority].popleft()
+        if monitor.writes.get(request.vcp_code) is request:
+            del monitor.writes[request.vcp_code]
+        return request
+
+    def _run(self, monitor_idx, monitor):
+        while True:
+            with self._condition:
+                while not monitor.depth() and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                request = self._next_request(monitor)
+                stats = self.stats_by_class[request.priority]
+                if request.deadline is not None and time.perf_counter() > request.deadline:
+                    request.status = 'expired'
+                    request.set_result(request.failed_result())
+                    stats.expired += 1
+                    self._condition.notify_all()
+                    continue
+                request.status = 'running'
+                monitor.running = request
+                stats.waits.append((time.perf_counter() - request.submitted) * 1000)
+
+            result = self._execute(request)
+            if request.op == 'set' and result:
+                self._notify(request)
+
+            # 先完成請求（含 done callback）再清除 running，wait_idle 返回時結果都已送出
+            request.status = 'done'
+            request.set_result(result)
+            with self._condition:
+                monitor.running = None
+                stats.completed += 1
+                self._condition.notify_all()
+
+    def _notify(self, request):
+        for listener in self.listeners:
+            try:
+                listener(request.monitor_idx, request.vcp_code, request.value)
+            except Exception as e:
+                event_log.record('bus_listener', request.monitor_idx,
+                                 request.vcp_code, error=repr(e))
+
+    def _execute(self, request):
+        """在執行線程上呼叫控制器"""
+        try:
+            if request.op == 'set':
+                return self.controller.VCP_set(
+                    request.monitor_idx, request.vcp_code, request.value)
+            if request.op == 'supported_codes':
+                if request.value is None:
+                    return self.controller.get_supported_codes(request.monitor_idx)
+                return self.controller.get_supported_codes(request.monitor_idx, request.value)
+            return self.controller.get_vcp_feature(request.monitor_idx, request.vcp_code)
+        except Exception as e:
+            event_log.record(f'bus_{request.op}', request.monitor_idx,
+                             request.vcp_code, error=repr(e))
+            return request.failed_result()
+
+    def stats(self):
+        """各等級的統計 {等級: {...}}（等待時間為毫秒）"""
+        with self._condition:
+            result = {}
+            for priority, name in enumerate(CLASS_NAMES):
+                stats = self.stats_by_class[priority]
+                waits = sorted(stats.waits)
+                result[name] = {
+                    'depth': sum(len(m.queues[priority]) for m in self._monitors.values()),
+                    'max_depth': stats.max_depth,
+                    'submitted': stats.submitted,
+                    'completed': stats.completed,
+                    'replaced': stats.replaced,
+                    'expired': stats.expired,
+                    'wait_p50': waits[len(waits) // 2] if waits else None,
+                    'wait_p99': waits[min(len(waits) - 1, len(waits) * 99 // 100)] if waits else None,
+                    'wait_max': waits[-1] if waits else None,
+                }
+            return result
+
+    def summary(self):
+        """格式化的統計摘要"""
+        lines = []
+        for name, stats in self.stats().items():
+            if not stats['submitted']:
+                continue
+            line = (f"{name}: 佇列 {stats['depth']}（最多 {stats['max_depth']}）"
+                    f" / 完成 {stats['completed']} / 取代 {stats['replaced']}"
+                    f" / 逾期 {stats['expired']}")
+            if stats['wait_max'] is not None:
+                line += (f" / 等待 p50 {stats['wait_p50']:.1f}ms"
+                         f" p99 {stats['wait_p99']:.1f}ms")
+            lines.append(line)
+        return '\n'.join(lines) or "尚無匯流排資料"
+
+
+class BusClient:
+    """以固定等級經由 BusScheduler 存取匯流排的同步介面（與控制器相同的方法）
+
+    每次呼叫會等待執行線程完成，不可在執行線程或主線程上使用；
+    其他屬性（monitors、last_write_times 等）直接取自控制器。
+    """
+
+    def __init__(self, scheduler, priority, timeout=None):
+        self.scheduler = scheduler
+        self.priority = priority
+        self.timeout = timeout
+
+    def __getattr__(self, name):
+        return getattr(self.scheduler.controller, name)
+
+    def get_vcp_feature(self, monitor_idx, vcp_code):
+        return self.scheduler.get(monitor_idx, vcp_code,
+                                  self.priority, self.timeout).result()
+
+    def VCP_set(self, monitor_idx, vcp_code, value):
+        return self.scheduler.set(monitor_idx, vcp_code, value,
+                                  self.priority, self.timeout).result()
+
+    def VCP_get(self, monitor_idx, vcp_code):
+        result = self.get_vcp_feature(monitor_idx, vcp_code)
+        return (result['current'], result['max']) if result else None
+
+    def get_supported_codes(self, monitor_idx, codes=None):
+        return self.scheduler.supported_codes(
+            monitor_idx, self.priority, codes, self.timeout).result()
+
+    def pending(self, monitor_idx):
+        return self.scheduler.pending(monitor_idx)
+
+    def last_write_time(self, monitor_idx):
+        return self.scheduler.last_write_time(monitor_idx)
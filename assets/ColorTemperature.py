@@ -0,0 +1,54 @@
+import numpy as np
+
+# 色溫範圍（K）
+KELVIN_MIN = 1900
+KELVIN_MAX = 10000
+KELVIN_STEP = 100
+KELVIN_DEFAULT = 6500
+
+KELVINS = np.arange(KELVIN_MIN, KELVIN_MAX + KELVIN_STEP, KELVIN_STEP)
+
+
+def kelvin_to_gains(kelvins):
+    """色溫轉換為RGB增益（0~100），使用黑體輻射的近似公式，支援陣列輸入"""
+    t = np.asarray(kelvins, dtype=np.float64) / 100
+
+    red = np.where(t <= 66, 255.0,
+                   329.698727446 * np.power(np.maximum(t - 60, 1e-6), -0.1332047592))
+    green = np.where(t <= 66,
+                     99.4708025861 * np.log(t) - 161.1195681661,
+                     288.1221695283 * np.power(np.maximum(t - 60, 1e-6), -0.0755148492))
+    blue = np.where(t >= 66, 255.0,
+                    np.where(t <= 19, 0.0,
+                             138.5177312231 * np.log(np.maximum(t - 10, 1e-6)) - 305.0447927307))
+
+    rgb = np.stack([red, green, blue], axis=-1)
+    return np.clip(rgb, 0, 255) / 255 * 100
+
+
+# 預先計算的基礎表（每列為一個色溫的 R, G, B 增益）
+BASE_GAINS = kelvin_to_gains(KELVINS)
+
+
+class ColorTemperatureTable:
+    """單一顯示器的色溫查找表 - 套用該顯示器的RGB校正係數後預先計算"""
+
+    def __init__(self, correction=(1.0, 1.0, 1.0)):
+        self.correction = tuple(correction)
+        corrected = BASE_GAINS * np.asarray(self.correction, dtype=np.float64)
+        self.gains = np.clip(np.rint(corrected), 0, 100).astype(np.int64)
+
+    @staticmethod
+    def index_of(kelvin):
+        """色溫對應的表格索引"""
+        index = int(round((kelvin - KELVIN_MIN) / KELVIN_STEP))
+        return max(0, min(len(KELVINS) - 1, index))
+
+    def gains_for(self, kelvin):
+        """色溫對應的 (R, G, B) 增益"""
+        return tuple(int(v) for v in self.gains[self.index_of(kelvin)])
+
+    def nearest_kelvin(self, gains):
+        """與目前 RGB 增益最接近的色溫"""
+        distance = np.abs(self.gains - np.asarray(gains)).sum(axis=1)
+        return int(KELVINS[int(np.argmin(distance))])
@@ -0,0 +1,84 @@
+import configparser
+import io
+import os
+
+# 允許行尾註解，例如 "code.exe = 2  ; 所有螢幕套用預設2"
+INLINE_COMMENT_PREFIXES = (';', '#')
+COMMENT_PREFIXES = ('#', ';')
+
+
+def create_parser():
+    """建立 config.ini 使用的 ConfigParser（所有讀取 config.ini 的地方都應使用）"""
+    return configparser.ConfigParser(inline_comment_prefixes=INLINE_COMMENT_PREFIXES)
+
+
+def read_config(config_file='config.ini'):
+    """讀取 config.ini，檔案不存在時返回空的設定"""
+    config = create_parser()
+    if os.path.exists(config_file):
+        config.read(config_file, encoding='utf-8')
+    return config
+
+
+def split_sections(text):
+    """將設定檔原文依區段切開，返回 (區段前的文字, {區段名稱: 原文})
+
+    區段之間緊接在標題前的註解行歸屬於下一個區段（通常是說明該區段的註解）。
+    """
+    preamble = []
+    sections = {}
+    name, lines = None, preamble
+    for line in text.splitlines(keepends=True):
+        stripped = line.strip()
+        if stripped.startswith('[') and stripped.endswith(']'):
+            comments = []
+            while name is not None and lines and lines[-1].strip().startswith(COMMENT_PREFIXES):
+                comments.insert(0, lines.pop())
+            name, lines = stripped[1:-1].strip(), comments
+            sections[name] = lines
+        lines.append(line)
+    return ''.join(preamble), {name: ''.join(lines) for name, lines in sections.items()}
+
+
+def read_sections(config_file='config.ini'):
+    """讀取設定檔原文並依區段切開，檔案不存在時返回 ('', {})"""
+    if not os.path.exists(config_file):
+        return '', {}
+    with open(config_file, encoding='utf-8') as file:
+        return split_sections(file.read())
+
+
+def _section_items(config, section):
+    return dict(config.items(section, raw=True))
+
+
+def _unchanged(config, section, original):
+    """區段原文解析後的內容是否與目前的設定相同"""
+    parsed = create_parser()
+    try:
+        parsed.read_string(original)
+    except configparser.Error:
+        return False
+    return (parsed.has_section(section)
+            and _section_items(parsed, section) == _section_items(config, section))
+
+
+def format_config(config, preamble='', originals=None):
+    """輸出設定檔文字：內容未改變的區段沿用原文（保留註解與排版），其餘重新產生"""
+    originals = originals or {}
+    chunks = []
+    for section in config.sections():
+        original = originals.get(section)
+        if original is not None and _unchanged(config, section, original):
+            chunks.append(original)
+            continue
+        generated = create_parser()
+        generated.read_dict({section: _section_items(config, section)})
+        buffer = io.StringIO()
+        generated.write(buffer)
+        chunks.append(buffer.getvalue())
+    # 區段之間至少以一行空白分隔（原文的最後一個區段可能沒有結尾空行）
+    chunks = [chunk if chunk.endswith('\n\n') or i == len(chunks) - 1
+              else chunk.rstrip('\n') + '\n\n'
+              for i, chunk in enumerate(chunks)]
+    return preamble + ''.join(chunks)
@@ -1,9 +1,25 @@
 import ctypes
+import os
+import re
+import threading
 import time
-from ctypes import windll, wintypes
+from ctypes import wintypes
+
+from assets.ConfigFile import read_config
+from assets.EventLog import event_log
+
+# 非 Windows 平台沒有 windll，只能使用重播等替代後端
+windll = getattr(ctypes, 'windll', None)
+
+# 後端選擇環境變數
+BACKEND_ENV = 'VCPANEL_DDC_BACKEND'  # windows（預設）或 simulated
+RECORD_ENV = 'VCPANEL_DDC_RECORD'  # 記錄DDC流量到指定的追蹤檔
+REPLAY_ENV = 'VCPANEL_DDC_REPLAY'  # 以指定的追蹤檔重播DDC回應
 
 # Windows API 常數
 PHYSICAL_MONITOR_DESCRIPTION_SIZE = 128
+EDD_GET_DEVICE_INTERFACE_NAME = 0x00000001
+DISPLAY_DEVICE_ACTIVE = 0x00000001
 VCP_CODES = {
     0x10: "Brightness",
     0x12: "Contrast",
@@ -18,6 +34,9 @@ VCP_CODES = {
 }
 INPUT_CODE = 0x60
 
+# 預設可保存的VCP代碼（實際保存時只保留顯示器支援的代碼）
+PRESET_CODES = tuple(VCP_CODES) + (INPUT_CODE,)
+
 INPUT_SOURCE = {
     0x11: "HDMI1",
     0x12: "HDMI2",
@@ -25,6 +44,16 @@ INPUT_SOURCE = {
 }
 
 
+def monitor_model(monitor):
+    """顯示器型號識別：裝置介面名稱中的EDID廠商與產品代碼（例如 DEL41B8），
+    沒有裝置名稱時使用描述（多數系統為 "Generic PnP Monitor"，無法區分型號）"""
+    # 裝置介面名稱格式為 \\?\DISPLAY#DEL41B8#5&2a3b...&UID4357#{...}
+    parts = monitor.get('device_id', '').split('#')
+    if len(parts) > 2 and parts[1]:
+        return parts[1]
+    return str(monitor.get('description', ''))
+
+
 class PHYSICAL_MONITOR(ctypes.Structure):
     _fields_ = [
         ('hPhysicalMonitor', wintypes.HANDLE),
@@ -33,14 +62,47 @@ class PHYSICAL_MONITOR(ctypes.Structure):
     ]
 
 
+class MONITORINFOEXW(ctypes.Structure):
+    _fields_ = [
+        ('cbSize', wintypes.DWORD),
+        ('rcMonitor', wintypes.RECT),
+        ('rcWork', wintypes.RECT),
+        ('dwFlags', wintypes.DWORD),
+        ('szDevice', wintypes.WCHAR * 32)
+    ]
+
+
+class DISPLAY_DEVICEW(ctypes.Structure):
+    _fields_ = [
+        ('cb', wintypes.DWORD),
+        ('DeviceName', wintypes.WCHAR * 32),
+        ('DeviceString', wintypes.WCHAR * 128),
+        ('StateFlags', wintypes.DWORD),
+        ('DeviceID', wintypes.WCHAR * 128),
+        ('DeviceKey', wintypes.WCHAR * 128)
+    ]
+
+
 class DDCCIController:
     def __init__(self):
         self.user32 = windll.user32
         self.dxva2 = windll.dxva2
+        self._init_monitors()
+
+    def _init_monitors(self):
+        """初始化顯示器清單與匯流排狀態"""
         self.monitors = []
+        self._supported_codes = {}  # 顯示器索引 -> 支援的VCP代碼
+        self._capability_values = {}  # 顯示器索引 -> {VCP代碼: 能力字串列出的可選值}
+        self._bus_locks = {}        # 顯示器索引 -> 匯流排鎖（同一台顯示器的指令序列化）
+        self.last_write_times = {}  # 顯示器索引 -> 最後一次寫入完成的時間
         self._discover_monitors()
         self.input_source = {0x11: 'HDMI1', 0x12: 'HDMI2', 0x0F: 'DisplayPort'}
 
+    def bus_lock(self, monitor_idx):
+        """顯示器的匯流排鎖（可重入）"""
+        return self._bus_locks.setdefault(monitor_idx, threading.RLock())
+
     def _discover_monitors(self):
         """發現所有支援DDC/CI的顯示器"""
         def enum_callback(hmonitor, hdc, lprect, lparam):
@@ -56,10 +118,12 @@ class DDCCIController:
                 if self.dxva2.GetPhysicalMonitorsFromHMONITOR(
                     hmonitor, num_monitors.value, monitors_array
                 ):
-                    for monitor in monitors_array:
+                    device_ids = self._device_ids(hmonitor)
+                    for i, monitor in enumerate(monitors_array):
                         self.monitors.append({
                             'handle': monitor.hPhysicalMonitor,
-                            'description': monitor.szPhysicalMonitorDescription
+                            'description': monitor.szPhysicalMonitorDescription,
+                            'device_id': device_ids[i] if i < len(device_ids) else ''
                         })
             return True
 
@@ -75,6 +139,25 @@ class DDCCIController:
         callback = MONITORENUMPROC(enum_callback)
         self.user32.EnumDisplayMonitors(None, None, callback, 0)
 
+    def _device_ids(self, hmonitor):
+        """螢幕上作用中顯示器的裝置介面名稱（含EDID廠商與型號，重新開機後不變）"""
+        info = MONITORINFOEXW()
+        info.cbSize = ctypes.sizeof(MONITORINFOEXW)
+        if not self.user32.GetMonitorInfoW(hmonitor, ctypes.byref(info)):
+            return []
+
+        device_ids = []
+        device = DISPLAY_DEVICEW()
+        device.cb = ctypes.sizeof(DISPLAY_DEVICEW)
+        index = 0
+        while self.user32.EnumDisplayDevicesW(
+            info.szDevice, index, ctypes.byref(device), EDD_GET_DEVICE_INTERFACE_NAME
+        ):
+            if device.StateFlags & DISPLAY_DEVICE_ACTIVE:
+                device_ids.append(device.DeviceID)
+            index += 1
+        return device_ids
+
     def get_vcp_feature(self, monitor_idx, vcp_code):
         """獲取VCP功能值"""
         if monitor_idx >= len(self.monitors):
@@ -83,20 +166,26 @@ class DDCCIController:
         handle = self.monitors[monitor_idx]['handle']
         current_value = wintypes.DWORD()
         max_value = wintypes.DWORD()
-        # result = self.dxva2.SetVCPFeature(handle, vcp_code, current_value)
-        result = self.dxva2.GetVCPFeatureAndVCPFeatureReply(
-            handle,
-            vcp_code,
-            None,  # VCP type (can be None)
-            ctypes.byref(current_value),
-            ctypes.byref(max_value)
-        )
+        start = time.perf_counter()
+        with self.bus_lock(monitor_idx):
+            # result = self.dxva2.SetVCPFeature(handle, vcp_code, current_value)
+            result = self.dxva2.GetVCPFeatureAndVCPFeatureReply(
+                handle,
+                vcp_code,
+                None,  # VCP type (can be None)
+                ctypes.byref(current_value),
+                ctypes.byref(max_value)
+            )
+        duration = (time.perf_counter() - start) * 1000
 
         if result:
+            event_log.record('get', monitor_idx, vcp_code, duration)
             return {
                 'current': current_value.value,
                 'max': max_value.value
             }
+        event_log.record('get', monitor_idx, vcp_code, duration,
+                         error='GetVCPFeatureAndVCPFeatureReply failed')
         return None
 
     def VCP_set(self, monitor_idx, vcp_code, value):
@@ -105,18 +194,94 @@ class DDCCIController:
             return False
 
         handle = self.monitors[monitor_idx]['handle']
-        for _ in range(3):  # 嘗試三次以確保設定成功
-            result = self.dxva2.SetVCPFeature(handle, vcp_code, value)
-            if result:
-                time.sleep(0.1)  # 給顯示器時間處理
-                return True
-            time.sleep(0.05)
+        start = time.perf_counter()
+        with self.bus_lock(monitor_idx):
+            for attempt in range(1, 4):  # 嘗試三次以確保設定成功
+                result = self.dxva2.SetVCPFeature(handle, vcp_code, value)
+                if result:
+                    event_log.record('set', monitor_idx, vcp_code,
+                                     (time.perf_counter() - start) * 1000, attempt)
+                    time.sleep(0.1)  # 給顯示器時間處理
+                    self.last_write_times[monitor_idx] = time.perf_counter()
+                    return True
+                time.sleep(0.05)
+            self.last_write_times[monitor_idx] = time.perf_counter()
+        event_log.record('set', monitor_idx, vcp_code,
+                         (time.perf_counter() - start) * 1000, 3,
+                         error='SetVCPFeature failed')
         return False
 
     def VCP_get(self, monitor_idx, VCP_code):
         time.sleep(0.05)
         result = self.get_vcp_feature(monitor_idx, VCP_code)
-        return result['current'], result['max'] if result else None
+        return (result['current'], result['max']) if result else None
+
+    def get_capabilities(self, monitor_idx):
+        """獲取顯示器的MCCS能力字串，失敗時返回None"""
+        if monitor_idx >= len(self.monitors):
+            return None
+
+        handle = self.monitors[monitor_idx]['handle']
+        length = wintypes.DWORD()
+        with self.bus_lock(monitor_idx):
+            if not self.dxva2.GetCapabilitiesStringLength(handle, ctypes.byref(length)):
+                return None
+
+            buffer = ctypes.create_string_buffer(length.value)
+            if not self.dxva2.CapabilitiesRequestAndCapabilitiesReply(
+                handle, buffer, length
+            ):
+                return None
+        return buffer.value.decode('ascii', errors='ignore')
+
+    def get_supported_codes(self, monitor_idx, codes=PRESET_CODES):
+        """獲取顯示器支援的VCP代碼（依 codes 順序，結果會被快取）"""
+        if monitor_idx not in self._supported_codes:
+            values = self._parse_capability_values(
+                self.get_capabilities(monitor_idx))
+            self._capability_values[monitor_idx] = values or {}
+            supported = set(values) if values else None
+            if supported is None:
+                # 沒有能力字串時逐一探測
+                supported = set()
+                for code in PRESET_CODES:
+                    time.sleep(0.05)
+                    if self.get_vcp_feature(monitor_idx, code) is not None:
+                        supported.add(code)
+            self._supported_codes[monitor_idx] = supported
+
+        return [code for code in codes if code in self._supported_codes[monitor_idx]]
+
+    def get_capability_values(self, monitor_idx):
+        """能力字串中列出可選值的VCP代碼 {代碼: (值, ...)}（不存取匯流排，
+        尚未讀取能力字串或沒有能力字串時為空）"""
+        return self._capability_values.get(monitor_idx, {})
+
+    @staticmethod
+    def _parse_capability_values(capabilities):
+        """從能力字串 "vcp(10 12 14(05 08) 16 ...)" 解析 {VCP代碼: 可選值}，
+        連續值代碼的可選值為空 tuple"""
+        if not capabilities:
+            return None
+        match = re.search(r'vcp\((.*)', capabilities, re.IGNORECASE)
+        if not match:
+            return None
+
+        # 最外層為代碼，緊接的括號內為該代碼的可選值（更深的巢狀略過）
+        values, code, depth = {}, None, 0
+        for token in re.findall(r'[0-9A-Fa-f]+|[()]', match.group(1)):
+            if token == '(':
+                depth += 1
+            elif token == ')':
+                if depth == 0:
+                    break
+                depth -= 1
+            elif depth == 0:
+                code = int(token, 16)
+                values[code] = ()
+            elif depth == 1 and code is not None:
+                values[code] += (int(token, 16),)
+        return values or None
 
     def get_input_source(self, monitor_idx=0):
         """獲取輸入源 (VCP code 0x60)"""
@@ -138,6 +303,36 @@ class DDCCIController:
         for monitor in self.monitors:
             self.dxva2.DestroyPhysicalMonitor(monitor['handle'])
 
+
+def get_backend_name(config_file='config.ini'):
+    """DDC後端名稱：環境變數優先，其次為 config.ini 的 [ddc] backend"""
+    backend = os.environ.get(BACKEND_ENV)
+    if not backend and os.path.exists(config_file):
+        backend = read_config(config_file).get('ddc', 'backend', fallback='')
+    return (backend or 'windows').strip().lower()
+
+
+def create_controller(config_file='config.ini'):
+    """依設定建立DDC控制器（重播、模擬或實體顯示器，可選擇記錄流量）"""
+    from assets.DDCTrace import RecordingController, ReplayController
+
+    replay_file = os.environ.get(REPLAY_ENV)
+    if replay_file:
+        controller = ReplayController(replay_file)
+    elif get_backend_name(config_file) == 'simulated':
+        from assets.SimulatedDDC import (SimulatedDDCCIController,
+                                         load_simulation_settings)
+        controller = SimulatedDDCCIController(
+            load_simulation_settings(config_file))
+    else:
+        controller = DDCCIController()
+
+    record_file = os.environ.get(RECORD_ENV)
+    if record_file:
+        controller = RecordingController(controller, record_file)
+    return controller
+
+
 # 使用範例
 
 
@@ -0,0 +1,411 @@
+"""
+DDC/CI 流量記錄與重播
+
+- RecordingController：包裝任何控制器，將每次匯流排呼叫（參數、結果、耗時）
+  與使用者輸入（快捷鍵、滑條、預設）寫入精簡的追蹤檔（JSON Lines，.gz 自動壓縮）
+- ReplayController：依追蹤檔回應匯流排呼叫並模擬當時的延遲
+- replay_session：在 offscreen Qt 中以 MyWindow 重播整段操作，統計匯流排時間與交易數
+
+追蹤檔每行為一個陣列：
+    ["h", 版本, [顯示器描述...]]           標頭
+    ["c", 設定檔內容]                      錄製時的 config.ini
+    ["b", 秒, 方法, [參數...], 結果, 毫秒, 錯誤]  匯流排呼叫
+    ["i", 秒, 輸入名稱, [參數...]]           使用者輸入
+
+執行方式：
+    python -m assets.DDCTrace replay session.trace.gz [--speed 0] [-o stats.json]
+    python -m assets.DDCTrace compare old.json new.json
+"""
+import argparse
+import functools
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+
+TRACE_VERSION = 1
+
+# 需要記錄的匯流排方法
+BUS_METHODS = ('get_vcp_feature', 'VCP_get', 'VCP_set', 'get_capabilities',
+               'get_supported_codes', 'get_input_source', 'set_input_source')
+
+
+class TraceReplayError(RuntimeError):
+    """重播時回應錄製當下失敗的呼叫"""
+
+
+def _open_trace(path, mode):
+    """開啟追蹤檔，副檔名為 .gz 時自動壓縮"""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def _to_json(value):
+    """將結果轉為可序列化的格式"""
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+
+class TraceRecorder:
+    """追蹤檔寫入器 - 匯流排呼叫可能來自多個線程，以鎖保護寫入"""
+
+    def __init__(self):
+        self.active = False
+        self.depth = 0  # 巢狀輸入深度，只記錄最外層的使用者輸入
+        self._file = None
+        self._origin = 0.0
+        self._lock = threading.Lock()
+
+    def open(self, path, monitors):
+        """開始記錄並寫入標頭"""
+        self._file = _open_trace(path, 'w')
+        self._origin = time.perf_counter()
+        self.active = True
+        self._write(['h', TRACE_VERSION,
+                     [str(m.get('description', '')) for m in monitors]])
+
+    def _write(self, entry):
+        with self._lock:
+            if self._file is not None:
+                self._file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+
+    def elapsed(self):
+        return round(time.perf_counter() - self._origin, 4)
+
+    def record_config(self, config):
+        """記錄錄製當下的設定檔（重播時還原預設內容）"""
+        if not self.active:
+            return
+        from io import StringIO
+        buffer = StringIO()
+        config.write(buffer)
+        self._write(['c', buffer.getvalue()])
+
+    def record_bus(self, method, args, result, duration_ms, error=None):
+        self._write(['b', self.elapsed(), method, list(args), _to_json(result),
+                     round(duration_ms, 2), error])
+
+    def record_input(self, name, args):
+        self._write(['i', self.elapsed(), name, list(args)])
+
+    def close(self):
+        with self._lock:
+            self.active = False
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# 全域記錄器（由 RecordingController 啟用）
+trace_recorder = TraceRecorder()
+
+
+def traced_input(name=None, encode=None):
+    """裝飾 MyWindow 的使用者輸入入口，記錄時只保留最外層呼叫
+
+    encode(self, *args) 可將參數轉為可序列化的重播參數。
+    Qt 信號可能傳入多餘參數（例如 clicked 的 checked），會依函數參數數量截斷。
+    """
+    def decorator(func):
+        input_name = name or func.__name__
+        arg_count = func.__code__.co_argcount - 1
+
+        @functools.wraps(func)
+        def wrapper(self, *args):
+            args = args[:arg_count]
+            if not trace_recorder.active:
+                return func(self, *args)
+            if trace_recorder.depth == 0:
+                trace_recorder.record_input(
+                    input_name, encode(self, *args) if encode else args)
+            trace_recorder.depth += 1
+            try:
+                return func(self, *args)
+            finally:
+                trace_recorder.depth -= 1
+        return wrapper
+    return decorator
+
+
+class RecordingController:
+    """記錄控制器 - 轉發所有呼叫並記錄匯流排方法的參數、結果與耗時"""
+
+    def __init__(self, controller, path):
+        self._controller = controller
+        trace_recorder.open(path, controller.monitors)
+        for method in BUS_METHODS:
+            if hasattr(controller, method):
+                setattr(self, method, self._wrap(method))
+
+    def _wrap(self, method):
+        target = getattr(self._controller, method)
+
+        def call(*args):
+            start = time.perf_counter()
+            try:
+                result = target(*args)
+            except Exception as e:
+                trace_recorder.record_bus(
+                    method, args, None, (time.perf_counter() - start) * 1000, repr(e))
+                raise
+            trace_recorder.record_bus(
+                method, args, result, (time.perf_counter() - start) * 1000)
+            return result
+        return call
+
+    def __getattr__(self, name):
+        return getattr(self._controller, name)
+
+    def cleanup(self):
+        """清理資源並關閉追蹤檔"""
+        trace_recorder.close()
+        self._controller.cleanup()
+
+
+def load_trace(path):
+    """讀取追蹤檔，返回 (顯示器描述, 設定檔內容, 匯流排紀錄, 輸入紀錄)"""
+    monitors, config_text, bus, inputs = [], None, [], []
+    with _open_trace(path, 'r') as trace_file:
+        for line in trace_file:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            kind = entry[0]
+            if kind == 'h':
+                monitors = entry[2]
+            elif kind == 'c':
+                config_text = entry[1]
+            elif kind == 'b':
+                bus.append(entry)
+            elif kind == 'i':
+                inputs.append(entry)
+    return monitors, config_text, bus, inputs
+
+
+class ReplayController:
+    """重播控制器 - 以追蹤檔回應匯流排呼叫並模擬錄製時的延遲
+
+    相同方法與參數的呼叫依錄製順序回應；重播的操作順序不同時，
+    改由追蹤中觀察到的VCP狀態回應，延遲取該方法的平均值。
+    """
+
+    def __init__(self, path, latency_scale=1.0):
+        description, _, bus, _ = load_trace(path)
+        self.monitors = [{'handle': i, 'description': d}
+                         for i, d in enumerate(description)]
+        self.latency_scale = latency_scale
+        self.transactions = defaultdict(int)
+        self.bus_time_ms = 0.0
+        self._responses = defaultdict(deque)
+        self._method_latency = {}
+        self._state = defaultdict(dict)  # 顯示器 -> {VCP代碼: (目前值, 最大值)}
+        self._supported = {}
+        self._lock = threading.Lock()
+        self._bus_locks = {}
+        self.last_write_times = {}
+        self._load(bus)
+
+    def _load(self, bus):
+        """建立回應佇列、各方法的平均延遲與初始VCP狀態"""
+        latencies = defaultdict(list)
+        for _, _, method, args, result, duration, error in bus:
+            self._responses[(method, json.dumps(args))].append(
+                (result, duration, error))
+            latencies[method].append(duration)
+            if error:
+                continue
+            if method == 'VCP_get' and result and result[1] is not None:
+                self._state[args[0]].setdefault(args[1], tuple(result))
+            elif method == 'get_vcp_feature' and result:
+                self._state[args[0]].setdefault(
+                    args[1], (result['current'], result['max']))
+            elif method == 'get_supported_codes':
+                self._supported[args[0]] = list(result)
+        self._method_latency = {
+            method: sum(values) / len(values) for method, values in latencies.items()}
+
+    def _serve(self, method, args, fallback):
+        """取得錄製的回應（或狀態推導的回應）並模擬延遲"""
+        with self._lock:
+            queue = self._responses.get((method, json.dumps(list(args))))
+            if queue:
+                result, duration, error = queue.popleft()
+            else:
+                result, duration, error = fallback(), self._method_latency.get(method, 0.0), None
+            self.transactions[method] += 1
+            self.bus_time_ms += duration
+
+        if self.latency_scale:
+            time.sleep(duration * self.latency_scale / 1000)
+        if error:
+            raise TraceReplayError(error)
+        return result
+
+    def bus_lock(self, monitor_idx):
+        return self._bus_locks.setdefault(monitor_idx, threading.RLock())
+
+    def _current(self, monitor_idx, vcp_code):
+        return self._state[monitor_idx].get(vcp_code, (50, 100))
+
+    def get_vcp_feature(self, monitor_idx, vcp_code):
+        def fallback():
+            current, maximum = self._current(monitor_idx, vcp_code)
+            return {'current': current, 'max': maximum}
+        with self.bus_lock(monitor_idx):
+            return self._serve('get_vcp_feature', (monitor_idx, vcp_code), fallback)
+
+    def VCP_get(self, monitor_idx, vcp_code):
+        result = self._serve('VCP_get', (monitor_idx, vcp_code),
+                             lambda: list(self._current(monitor_idx, vcp_code)))
+        return tuple(result)
+
+    def VCP_set(self, monitor_idx, vcp_code, value):
+        with self.bus_lock(monitor_idx):
+            result = self._serve('VCP_set', (monitor_idx, vcp_code, value), lambda: True)
+            self.last_write_times[monitor_idx] = time.perf_counter()
+        if result:
+            maximum = self._current(monitor_idx, vcp_code)[1]
+            self._state[monitor_idx][vcp_code] = (value, maximum)
+        return result
+
+    def get_capabilities(self, monitor_idx):
+        return self._serve('get_capabilities', (monitor_idx,), lambda: None)
+
+    def get_supported_codes(self, monitor_idx, codes=None):
+        result = self._serve('get_supported_codes', (monitor_idx,),
+                             lambda: self._supported.get(
+                                 monitor_idx, sorted(self._state[monitor_idx])))
+        if codes is None:
+            return list(result)
+        return [code for code in codes if code in result]
+
+    def get_capability_values(self, monitor_idx):
+        return {}
+
+    def get_input_source(self, monitor_idx=0):
+        return self._serve('get_input_source', (monitor_idx,),
+                           lambda: self._current(monitor_idx, 0x60)[0])
+
+    def set_input_source(self, monitor_idx, source):
+        return self.VCP_set(monitor_idx, 0x60, source)
+
+    def list_monitors(self):
+        for i, monitor in enumerate(self.monitors):
+            print(f"Monitor {i}: {monitor['description']}")
+
+    def cleanup(self):
+        pass
+
+    def stats(self):
+        """重播統計：匯流排時間與各方法交易數"""
+        return {
+            'bus_time_ms': round(self.bus_time_ms, 2),
+            'transactions': dict(self.transactions),
+            'total_transactions': sum(self.transactions.values()),
+        }
+
+
+def replay_session(path, speed=1.0, latency_scale=1.0):
+    """在 offscreen Qt 中以 MyWindow 重播整段操作，返回統計
+
+    speed 為輸入間隔的時間倍率（0 表示不等待）；自動隱藏等計時器
+    只有在 speed 為 1 時才會與錄製時相同地觸發。
+    """
+    from assets.DDCCI import REPLAY_ENV, create_controller
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    path = os.path.abspath(path)
+    os.environ[REPLAY_ENV] = path
+    _, config_text, _, inputs = load_trace(path)
+
+    # 在暫存目錄中執行，避免覆寫使用者的 config.ini
+    workdir = tempfile.mkdtemp(prefix='vcpanel-replay-')
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        if config_text:
+            with open('config.ini', 'w', encoding='utf-8') as config_file:
+                config_file.write(config_text)
+
+        from PyQt6.QtWidgets import QApplication
+        qt_app = QApplication.instance() or QApplication(sys.argv)
+        import app
+
+        controller = create_controller()
+        controller.latency_scale = latency_scale
+        window = app.MyWindow(controller)
+
+        start = time.perf_counter()
+        for _, at, name, args in inputs:
+            target = start + at * speed
+            while time.perf_counter() < target:
+                qt_app.processEvents()
+                time.sleep(0.001)
+            getattr(window, name)(*args)
+            qt_app.processEvents()
+        qt_app.processEvents()
+        window.bus.wait_idle()  # 寫入在匯流排排程器中非同步執行
+
+        stats = controller.stats()
+        stats['inputs'] = len(inputs)
+        stats['wall_time_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        window.hotkey_manager.cleanup()
+        return stats
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def compare_stats(old, new):
+    """比較兩次重播的統計，返回差異文字"""
+    lines = [f"bus_time_ms: {old['bus_time_ms']} -> {new['bus_time_ms']} "
+             f"({new['bus_time_ms'] - old['bus_time_ms']:+.2f})",
+             f"total_transactions: {old['total_transactions']} -> "
+             f"{new['total_transactions']} "
+             f"({new['total_transactions'] - old['total_transactions']:+d})"]
+    for method in sorted(set(old['transactions']) | set(new['transactions'])):
+        before = old['transactions'].get(method, 0)
+        after = new['transactions'].get(method, 0)
+        if before != after:
+            lines.append(f"  {method}: {before} -> {after} ({after - before:+d})")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DDC/CI 追蹤重播")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    replay = subparsers.add_parser('replay', help="重播追蹤檔並輸出統計")
+    replay.add_argument('trace')
+    replay.add_argument('--speed', type=float, default=1.0,
+                        help="輸入間隔倍率，0 為不等待")
+    replay.add_argument('--latency-scale', type=float, default=1.0,
+                        help="匯流排延遲倍率，0 為不等待")
+    replay.add_argument('-o', '--output', help="統計輸出檔 (JSON)")
+
+    compare = subparsers.add_parser('compare', help="比較兩次重播的統計")
+    compare.add_argument('old')
+    compare.add_argument('new')
+
+    args = parser.parse_args()
+    if args.command == 'replay':
+        stats = replay_session(args.trace, args.speed, args.latency_scale)
+        text = json.dumps(stats, indent=2)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as output:
+                output.write(text)
+        print(text)
+    else:
+        with open(args.old, encoding='utf-8') as old, open(args.new, encoding='utf-8') as new:
+            print(compare_stats(json.load(old), json.load(new)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import threading
+import time
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from assets.EventLog import event_log
+
+
+class DriftPoller(QObject):
+    """狀態漂移偵測 - 背景線程輪流讀取實際VCP值，與快取不同時通知主線程
+
+    UI 顯示後以較短間隔輪詢，閒置時間隔逐步加倍到接近停止。
+    只在匯流排空閒時讀取：最近有寫入或排程器中有待處理的請求時直接跳過。
+    讀取以背景等級經由 BusScheduler 進行，不會延遲互動操作。
+    """
+
+    # 信號參數：顯示器索引, VCP代碼, 實際值, 讀取開始時間
+    drift_detected = pyqtSignal(int, int, int, float)
+
+    ACTIVE_INTERVAL = 0.5   # UI 顯示後的輪詢間隔（秒）
+    ACTIVE_WINDOW = 30.0    # 維持短間隔的時間（秒）
+    IDLE_INTERVAL = 300.0   # 閒置時的最長間隔（秒）
+    QUIET_PERIOD = 1.0      # 互動寫入後暫停輪詢的時間（秒）
+
+    def __init__(self, bus, state_provider, parent=None):
+        super().__init__(parent)
+        self.bus = bus  # BusScheduler 的背景等級 BusClient
+        self.state_provider = state_provider  # 返回 vcp_temp（每台顯示器的 {VCP代碼: 值}）
+        self.interval = self.IDLE_INTERVAL
+        self._active_until = 0.0
+        self._cursor = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """啟動背景線程"""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name='DriftPoller', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """停止背景線程"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def notify_active(self):
+        """UI 顯示時呼叫：恢復短間隔輪詢"""
+        self._active_until = time.monotonic() + self.ACTIVE_WINDOW
+        self.interval = self.ACTIVE_INTERVAL
+        self._wake.set()
+
+    def _next_interval(self):
+        """活躍期間維持短間隔，之後逐步加倍到閒置間隔"""
+        if time.monotonic() < self._active_until:
+            return self.ACTIVE_INTERVAL
+        return min(self.IDLE_INTERVAL, self.interval * 2)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            self._poll_once()
+            self.interval = self._next_interval()
+
+    def _targets(self):
+        """所有需要檢查的 (顯示器, VCP代碼)"""
+        return [(monitor_idx, vcp_code)
+                for monitor_idx, values in enumerate(self.state_provider())
+                for vcp_code in list(values)]
+
+    def _poll_once(self):
+        """輪流讀取下一個VCP值（匯流排忙碌時跳過）"""
+        targets = self._targets()
+        if not targets:
+            return
+        self._cursor %= len(targets)
+        monitor_idx, vcp_code = targets[self._cursor]
+
+        last_write = self.bus.last_write_time(monitor_idx)
+        if time.perf_counter() - last_write < self.QUIET_PERIOD:
+            return
+        if self.bus.pending(monitor_idx):
+            return
+
+        try:
+            started = time.perf_counter()
+            result = self.bus.get_vcp_feature(monitor_idx, vcp_code)
+        except Exception as e:
+            event_log.record('drift_poll', monitor_idx, vcp_code, error=repr(e))
+            result = None
+        self._cursor += 1
+
+        if result is None:
+            return
+        expected = self.state_provider()[monitor_idx].get(vcp_code)
+        if expected is not None and result['current'] != expected:
+            self.drift_detected.emit(monitor_idx, vcp_code, result['current'], started)
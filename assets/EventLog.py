@@ -0,0 +1,72 @@
+import json
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+
+class EventLog:
+    """記憶體環形事件紀錄 - 記錄DDC操作與錯誤，需要時或程式崩潰時輸出到檔案"""
+
+    # 每筆事件的欄位順序（事件以 tuple 保存以降低記錄成本）
+    # error 只用於實際的失敗，其他說明（例如漂移前後的值）放在 detail
+    FIELDS = ('time', 'operation', 'monitor', 'vcp_code',
+              'duration_ms', 'attempts', 'error', 'detail')
+    DEFAULT_DUMP_FILE = 'vcpanel_events.jsonl'
+
+    def __init__(self, capacity=2048):
+        self.events = deque(maxlen=capacity)
+        self._previous_excepthook = None
+        self._previous_thread_excepthook = None
+
+    def record(self, operation, monitor=None, vcp_code=None,
+               duration_ms=0.0, attempts=1, error=None, detail=None):
+        """記錄一筆事件（deque.append 為線程安全）"""
+        self.events.append((time.time(), operation, monitor, vcp_code,
+                            duration_ms, attempts, error, detail))
+
+    def snapshot(self):
+        """以字典清單返回目前所有事件"""
+        return [dict(zip(self.FIELDS, event)) for event in list(self.events)]
+
+    def dump(self, path=None):
+        """將事件以 JSON Lines 格式寫入檔案，返回檔案路徑"""
+        path = path or self.DEFAULT_DUMP_FILE
+        with open(path, 'w', encoding='utf-8') as dump_file:
+            for event in self.snapshot():
+                if event['vcp_code'] is not None:
+                    event['vcp_code'] = f"0x{event['vcp_code']:02X}"
+                dump_file.write(json.dumps(event, ensure_ascii=False) + '\n')
+        return path
+
+    def install_crash_handler(self, path=None):
+        """未處理的例外發生時記錄並輸出事件"""
+        if self._previous_excepthook is not None:
+            return
+        self._previous_excepthook = sys.excepthook
+        self._previous_thread_excepthook = threading.excepthook
+
+        def record_crash(exc_type, exc_value, exc_traceback):
+            self.record('crash', error=''.join(traceback.format_exception(
+                exc_type, exc_value, exc_traceback)))
+            try:
+                self.dump(path)
+            except OSError:
+                pass
+
+        def crash_hook(exc_type, exc_value, exc_traceback):
+            record_crash(exc_type, exc_value, exc_traceback)
+            self._previous_excepthook(exc_type, exc_value, exc_traceback)
+
+        def thread_crash_hook(args):
+            # 線程的例外交給原本的 threading.excepthook（含線程名稱，且尊重其他程式庫的設定）
+            record_crash(args.exc_type, args.exc_value, args.exc_traceback)
+            self._previous_thread_excepthook(args)
+
+        sys.excepthook = crash_hook
+        threading.excepthook = thread_crash_hook
+
+
+# 全域事件紀錄
+event_log = EventLog()
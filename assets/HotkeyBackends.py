@@ -0,0 +1,144 @@
+import ctypes
+from ctypes import wintypes
+
+from PyQt6.QtCore import QAbstractNativeEventFilter
+from PyQt6.QtWidgets import QApplication
+
+from assets.EventLog import event_log
+
+BACKEND_NAMES = ('auto', 'native', 'hook')
+
+# RegisterHotKey 常數
+WM_HOTKEY = 0x0312
+# 送到 Qt 視窗的訊息為 generic；NULL 視窗的線程訊息（WM_HOTKEY）由事件分派器送出
+NATIVE_EVENT_TYPES = (b'windows_generic_MSG', b'windows_dispatcher_MSG')
+MODIFIERS = {
+    'alt': 0x0001,
+    'ctrl': 0x0002,
+    'control': 0x0002,
+    'shift': 0x0004,
+    'win': 0x0008,
+    'windows': 0x0008,
+}
+VIRTUAL_KEYS = {
+    'space': 0x20, 'tab': 0x09, 'enter': 0x0D, 'esc': 0x1B, 'backspace': 0x08,
+    'left': 0x25, 'up': 0x26, 'right': 0x27, 'down': 0x28,
+    'home': 0x24, 'end': 0x23, 'page up': 0x21, 'page down': 0x22,
+    'insert': 0x2D, 'delete': 0x2E,
+    '-': 0xBD, '=': 0xBB, ',': 0xBC, '.': 0xBE, '/': 0xBF, ';': 0xBA,
+    '[': 0xDB, ']': 0xDD, '\\': 0xDC, "'": 0xDE, '`': 0xC0,
+}
+VIRTUAL_KEYS.update({f'f{i}': 0x6F + i for i in range(1, 25)})
+
+
+def parse_hotkey(hotkey_string):
+    """將 "alt+a" 之類的快捷鍵字串轉換為 (修飾鍵旗標, 虛擬鍵碼)"""
+    parts = [part.strip() for part in hotkey_string.lower().split('+')]
+    *modifier_names, key = parts
+    modifiers = 0
+    for name in modifier_names:
+        if name not in MODIFIERS:
+            raise ValueError(f"不支援的修飾鍵: {name}")
+        modifiers |= MODIFIERS[name]
+
+    if len(key) == 1 and key.isalnum():
+        return modifiers, ord(key.upper())
+    if key in VIRTUAL_KEYS:
+        return modifiers, VIRTUAL_KEYS[key]
+    raise ValueError(f"不支援的按鍵: {key}")
+
+
+class HotkeyBackend:
+    """快捷鍵後端介面 - register 失敗時拋出例外"""
+
+    name = ''
+
+    def register(self, hotkey_string, callback):
+        raise NotImplementedError
+
+    def unregister_all(self):
+        raise NotImplementedError
+
+
+class KeyboardHookBackend(HotkeyBackend):
+    """keyboard 函式庫的低階鍵盤鉤子（每次按鍵都會執行 Python，回調在鉤子線程）"""
+
+    name = 'hook'
+
+    def register(self, hotkey_string, callback):
+        import keyboard
+        keyboard.add_hotkey(hotkey_string.lower(), callback)
+
+    def unregister_all(self):
+        import keyboard
+        keyboard.unhook_all_hotkeys()
+
+
+class NativeHotkeyBackend(HotkeyBackend, QAbstractNativeEventFilter):
+    """Windows RegisterHotKey - 由系統比對按鍵，WM_HOTKEY 在 Qt 主線程處理
+
+    以 NULL 視窗註冊，WM_HOTKEY 以線程訊息進入主線程的訊息佇列，
+    由 Qt 事件分派器以 windows_dispatcher_MSG 交給原生事件過濾器。
+    user32 可替換為模擬物件以便在非 Windows 平台測試。
+    """
+
+    name = 'native'
+
+    def __init__(self, user32=None):
+        QAbstractNativeEventFilter.__init__(self)
+        if user32 is None:
+            # 獨立的 DLL 物件，宣告的函數型別不影響其他模組
+            user32 = ctypes.WinDLL('user32', use_last_error=True)
+            user32.RegisterHotKey.argtypes = [
+                wintypes.HWND, ctypes.c_int, wintypes.UINT, wintypes.UINT]
+            user32.RegisterHotKey.restype = wintypes.BOOL
+            user32.UnregisterHotKey.argtypes = [wintypes.HWND, ctypes.c_int]
+            user32.UnregisterHotKey.restype = wintypes.BOOL
+        self.user32 = user32
+        self.callbacks = {}  # 快捷鍵ID -> 回調
+        self._next_id = 1
+        self._installed = False
+
+    def register(self, hotkey_string, callback):
+        modifiers, vk = parse_hotkey(hotkey_string)
+        if not self._installed:
+            QApplication.instance().installNativeEventFilter(self)
+            self._installed = True
+
+        hotkey_id = self._next_id
+        if not self.user32.RegisterHotKey(None, hotkey_id, modifiers, vk):
+            raise OSError(f"RegisterHotKey failed: {hotkey_string!r}"
+                          f" (error {ctypes.get_last_error()})")
+        self._next_id += 1
+        self.callbacks[hotkey_id] = callback
+
+    def unregister_all(self):
+        for hotkey_id in self.callbacks:
+            self.user32.UnregisterHotKey(None, hotkey_id)
+        self.callbacks.clear()
+
+    def nativeEventFilter(self, event_type, message):
+        if event_type in NATIVE_EVENT_TYPES:
+            msg = wintypes.MSG.from_address(int(message))
+            if msg.message == WM_HOTKEY and msg.wParam in self.callbacks:
+                self.callbacks[msg.wParam]()
+                return True, 0
+        return False, 0
+
+
+def create_hotkey_backend(name='auto'):
+    """建立快捷鍵後端：auto 在 Windows 使用 native，其他平台使用 hook
+
+    無法辨識的名稱，或平台不支援 native 時，記錄事件並改用 hook。
+    """
+    name = (name or 'auto').strip().lower()
+    if name not in BACKEND_NAMES:
+        event_log.record('hotkey_backend', error=f"unknown backend {name!r}, using hook")
+        return KeyboardHookBackend()
+    if not hasattr(ctypes, 'windll'):
+        if name == 'native':
+            event_log.record('hotkey_backend', error="native backend requires Windows, using hook")
+        return KeyboardHookBackend()
+    if name == 'hook':
+        return KeyboardHookBackend()
+    return NativeHotkeyBackend()
@@ -1,20 +1,32 @@
-import keyboard
+import time
+
 from PyQt6.QtCore import QObject, pyqtSignal
 
+from assets.EventLog import event_log
+from assets.HotkeyBackends import KeyboardHookBackend, create_hotkey_backend
+
 
 class GlobalHotkeyManager(QObject):
-    """全域快捷鍵管理器 - 使用keyboard.add_hotkey"""
+    """全域快捷鍵管理器 - 優先使用系統原生註冊，失敗的快捷鍵改用鍵盤鉤子
+
+    後端回調只發出 hotkey_triggered 信號（可在任何線程呼叫），
+    判斷視窗狀態與之後的處理都在 Qt 主線程執行。
+    """
 
     # 定義信號用於線程安全的通信
+    hotkey_triggered = pyqtSignal(str, int, float)  # 動作, 參數, 按下時間
     show_requested = pyqtSignal()
     compact_requested = pyqtSignal()
     preset_requested = pyqtSignal(int)  # 預設快捷鍵信號
     brightness_adjust_requested = pyqtSignal(int)  # 亮度調整信號 (+5 或 -5)
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, backend='auto'):
         super().__init__(parent)
         self.registered_hotkeys = []  # 存儲已註冊的快捷鍵
         self.parent_window = parent
+        self.backend = create_hotkey_backend(backend)
+        self.fallback_backend = None  # 原生註冊失敗時才建立鍵盤鉤子
+        self.hotkey_triggered.connect(self._on_hotkey)
 
         # 連接信號到主線程的槽函數
         if self.parent_window:
@@ -30,61 +42,71 @@ class GlobalHotkeyManager(QObject):
         # 清理舊的快捷鍵
         self.cleanup()
 
-        try:
-            # 轉換快捷鍵格式
-            show_key = self._convert_hotkey_format(show_hotkey)
-            compact_key = self._convert_hotkey_format(compact_hotkey)
-            brightness_up_key = self._convert_hotkey_format(brightness_up)
-            brightness_down_key = self._convert_hotkey_format(brightness_down)
-
-            # 註冊基本快捷鍵
-            keyboard.add_hotkey(show_key, self._on_show_hotkey)
-            keyboard.add_hotkey(compact_key, self._on_compact_hotkey)
-            keyboard.add_hotkey(brightness_up_key,
-                                lambda: self._on_brightness_adjust(5))
-            keyboard.add_hotkey(brightness_down_key,
-                                lambda: self._on_brightness_adjust(-5))
-
-            self.registered_hotkeys = [
-                show_key, compact_key, brightness_up_key, brightness_down_key]
-
-            # 註冊preset快捷鍵
-            for i, preset_hotkey in enumerate(preset_hotkeys, 1):
-                preset_key = self._convert_hotkey_format(preset_hotkey)
-                keyboard.add_hotkey(
-                    preset_key, lambda preset_id=i: self._on_preset_hotkey(preset_id))
-                self.registered_hotkeys.append(preset_key)
+        # 逐一註冊，單一快捷鍵字串錯誤不影響其他快捷鍵
+        self._register(show_hotkey, 'show')
+        self._register(compact_hotkey, 'compact')
+        self._register(brightness_up, 'brightness', 5)
+        self._register(brightness_down, 'brightness', -5)
 
-        except Exception as e:
-            pass  # 靜默處理錯誤
+        # 註冊preset快捷鍵
+        for i, preset_hotkey in enumerate(preset_hotkeys, 1):
+            self._register(preset_hotkey, 'preset', i)
 
-    def _convert_hotkey_format(self, hotkey_string):
-        """轉換快捷鍵格式"""
-        return hotkey_string.lower()
+    def _register(self, hotkey_string, action, arg=0):
+        """註冊單一快捷鍵（原生註冊失敗時改用鍵盤鉤子），都失敗時記錄到事件紀錄"""
+        def callback():
+            self._trigger(action, arg)
 
-    def _on_show_hotkey(self):
-        """顯示UI快捷鍵回調 - 線程安全版本"""
-        if self.parent_window and not self.parent_window.isVisible():
-            self.show_requested.emit()
+        try:
+            self.backend.register(hotkey_string, callback)
+            self.registered_hotkeys.append((hotkey_string, self.backend.name))
+            return
+        except Exception as e:
+            event_log.record('hotkey_register',
+                             error=f"{self.backend.name} {hotkey_string!r}: {e!r}")
+        if self.backend.name == KeyboardHookBackend.name:
+            return
 
-    def _on_compact_hotkey(self):
-        """快捷模式快捷鍵回調 - 線程安全版本"""
-        if self.parent_window and not self.parent_window.isVisible():
+        try:
+            if self.fallback_backend is None:
+                self.fallback_backend = KeyboardHookBackend()
+            self.fallback_backend.register(hotkey_string, callback)
+            self.registered_hotkeys.append((hotkey_string, self.fallback_backend.name))
+        except Exception as e:
+            event_log.record('hotkey_register',
+                             error=f"{self.fallback_backend.name} {hotkey_string!r}: {e!r}")
+
+    def _trigger(self, action, arg):
+        """後端回調（可能在鉤子線程）：只記錄按下時間並發出信號"""
+        self.hotkey_triggered.emit(action, arg, time.perf_counter())
+
+    def _on_hotkey(self, action, arg, pressed_at):
+        """在 Qt 主線程處理快捷鍵"""
+        if action == 'brightness':
+            self.brightness_adjust_requested.emit(arg)
+            return
+        # 面板已顯示時忽略顯示與預設快捷鍵
+        if self.parent_window is None or self.parent_window.isVisible():
+            return
+
+        self.parent_window.latency_tracer.begin(f'hotkey_{action}', pressed_at)
+        if action == 'show':
+            self.show_requested.emit()
+        elif action == 'compact':
             self.compact_requested.emit()
-
-    def _on_preset_hotkey(self, preset_id):
-        """預設快捷鍵回調"""
-        if self.parent_window and not self.parent_window.isVisible():
-            self.preset_requested.emit(preset_id)
-
-    def _on_brightness_adjust(self, adjustment):
-        """亮度調整快捷鍵回調"""
-        self.brightness_adjust_requested.emit(adjustment)
+        elif action == 'preset':
+            self.preset_requested.emit(arg)
+        # 處理後面板沒有顯示時捨棄追蹤，避免之後的顯示沿用這次的開始時間
+        if not self.parent_window.isVisible():
+            self.parent_window.latency_tracer.cancel()
 
     def cleanup(self):
         """清理所有註冊的快捷鍵"""
-        try:
-            keyboard.unhook_all_hotkeys()
-            self.registered_hotkeys.clear()
-        except Exception as e:
-            pass  # 靜默處理錯誤
+        for backend in (self.backend, self.fallback_backend):
+            if backend is None:
+                continue
+            try:
+                backend.unregister_all()
+            except Exception as e:
+                event_log.record('hotkey_cleanup', error=f"{backend.name}: {e!r}")
+        self.registered_hotkeys.clear()
@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import deque
+
+# 開始後超過此時間仍未完成的追蹤視為面板沒有顯示（捨棄，不計入統計）
+STALE_SECONDS = 2.0
+
+
+class LatencyTracer:
+    """延遲追蹤器 - 記錄「快捷鍵 → 面板可見」各階段的時間戳並統計百分位數"""
+
+    def __init__(self, max_samples=256):
+        self.samples = deque(maxlen=max_samples)  # 每筆為 {階段: 毫秒}
+        self._lock = threading.Lock()
+        self._start = None
+        self._source = None
+        self._stages = {}
+
+    def begin(self, source='hotkey', started=None):
+        """開始一次追蹤（started 為按鍵發生的時間，預設為現在）"""
+        with self._lock:
+            self._start = time.perf_counter() if started is None else started
+            self._source = source
+            self._stages = {}
+
+    def begin_if_idle(self, source):
+        """若沒有進行中的追蹤則開始一次（托盤等非快捷鍵來源）"""
+        with self._lock:
+            if self._start is not None and not self._stale():
+                return
+        self.begin(source)
+
+    def cancel(self):
+        """捨棄進行中的追蹤（快捷鍵被忽略、面板沒有顯示）"""
+        with self._lock:
+            self._start = None
+            self._stages = {}
+
+    def _stale(self):
+        return time.perf_counter() - self._start > STALE_SECONDS
+
+    def mark(self, stage):
+        """記錄階段時間（相對於開始的毫秒數）"""
+        with self._lock:
+            if self._start is not None:
+                self._stages[stage] = (time.perf_counter() - self._start) * 1000
+
+    def finish(self, stage='visible'):
+        """記錄最後階段並保存這次追蹤"""
+        with self._lock:
+            if self._start is None:
+                return
+            if not self._stale():
+                self._stages[stage] = (time.perf_counter() - self._start) * 1000
+                self._stages['source'] = self._source
+                self.samples.append(self._stages)
+            self._start = None
+            self._stages = {}
+
+    def percentiles(self, percents=(50, 90, 99)):
+        """各階段的百分位數 {階段: {百分位: 毫秒}}"""
+        with self._lock:
+            samples = list(self.samples)
+
+        stages = []
+        for sample in samples:
+            for stage in sample:
+                if stage != 'source' and stage not in stages:
+                    stages.append(stage)
+
+        result = {}
+        for stage in stages:
+            values = sorted(s[stage] for s in samples if stage in s)
+            result[stage] = {
+                p: values[min(len(values) - 1,
+                              max(0, int(round(p / 100 * len(values))) - 1))]
+                for p in percents
+            }
+        return result
+
+    def summary(self):
+        """格式化的統計摘要"""
+        stats = self.percentiles()
+        if not stats:
+            return "尚無延遲資料"
+        lines = [f"樣本數: {len(self.samples)}"]
+        for stage, values in stats.items():
+            text = ' / '.join(f"p{p} {ms:.1f}ms" for p, ms in values.items())
+            lines.append(f"{stage}: {text}")
+        return '\n'.join(lines)
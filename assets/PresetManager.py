@@ -1,8 +1,12 @@
-import configparser
 import os
 
 from PyQt6.QtCore import QTimer
 
+from assets.BrightnessCurve import BrightnessCurve
+from assets.ConfigFile import (create_parser, format_config, read_sections,
+                               split_sections)
+from assets.EventLog import event_log
+
 
 class PresetManager:
     """預設配置管理器 - 支援多螢幕"""
@@ -10,10 +14,19 @@ class PresetManager:
     # 配置常數
     SETTINGS_SECTION = 'settings'
     HOTKEYS_SECTION = 'hotkeys'
+    APP_PRESETS_SECTION = 'app_presets'
+
+    # 顯示器型號的亮度校正區段前綴，例如 [calibration:DEL41B8]（EDID廠商與產品代碼）
+    CALIBRATION_PREFIX = 'calibration:'
+
+    # 舊版清單格式 "[15, 80, 100, 98, 91]" 對應的VCP代碼順序
+    LEGACY_PRESET_CODES = (0x10, 0x12, 0x16, 0x18, 0x1A)
 
     def __init__(self, config_file='config.ini'):
         self.config_file = config_file
-        self.config = configparser.ConfigParser()
+        # 允許行尾註解；保存時內容未改變的區段保留原文與註解
+        self.config = create_parser()
+        self._preamble, self._original_sections = '', {}
         self._save_timer = None
         self.load_config()
 
@@ -21,6 +34,7 @@ class PresetManager:
         """載入配置文件"""
         if os.path.exists(self.config_file):
             self.config.read(self.config_file, encoding='utf-8')
+            self._preamble, self._original_sections = read_sections(self.config_file)
         else:
             self._create_default_config()
 
@@ -28,7 +42,17 @@ class PresetManager:
         """創建預設配置"""
         # 設置預設值
         self.config[self.SETTINGS_SECTION] = {
-            'auto_hide_seconds': '2'
+            'auto_hide_seconds': '2',
+            'prewarm_panel': 'false',
+            'link_brightness': 'false',
+            'drift_poll': 'true',
+            'reapply_on_resume': 'true',
+            'stall_watchdog': 'false',
+            'software_dimming': 'false',
+            'warm_start': 'true',
+            'usage_analytics': 'false',
+            'adaptive_brightness': 'false',
+            'adaptive_brightness_range': '70, 40'
         }
 
         self.config[self.HOTKEYS_SECTION] = {
@@ -39,7 +63,8 @@ class PresetManager:
             'preset_3': 'alt+3',
             'preset_4': 'alt+4',
             'brightness_up': 'alt+x',
-            'brightness_down': 'alt+z'
+            'brightness_down': 'alt+z',
+            'backend': 'auto'
         }
 
         # 創建預設的 screen0 區段
@@ -76,33 +101,110 @@ class PresetManager:
         if not preset_value:
             return None
 
-        try:
-            # 解析類似 "[15, 80, 100, 98, 91]" 的字符串
-            # 移除方括號並分割
-            clean_value = preset_value.strip('[]')
-            values = [int(x.strip()) for x in clean_value.split(',')]
-
-            if len(values) == 5:
-                return values
-            else:
-                return None
-
-        except (ValueError, AttributeError):
-            return None
+        return self.parse_preset(preset_value)
 
     def save_preset(self, screen_index, preset_id, values):
-        """保存指定螢幕的預設值"""
+        """保存指定螢幕的預設值（接受 {VCP代碼: 值} 或舊版清單）"""
         self.ensure_screen_exists(screen_index)
 
         section_name = f'screen{screen_index}'
         preset_key = f'preset_{preset_id}'
 
-        # 格式化為 "[15, 80, 100, 98, 91]" 格式
-        preset_value = f"[{', '.join(map(str, values))}]"
+        self.config.set(section_name, preset_key, self.format_preset(values))
+        self.save_config()
+
+    @classmethod
+    def parse_preset(cls, preset_value):
+        """解析預設字串為 {VCP代碼: 值}，無效時返回None"""
+        try:
+            text = preset_value.strip()
+            if text.startswith('['):
+                # 舊版格式 "[15, 80, 100, 98, 91]"
+                values = [int(x.strip()) for x in text.strip('[]').split(',')]
+                if len(values) != len(cls.LEGACY_PRESET_CODES):
+                    return None
+                return dict(zip(cls.LEGACY_PRESET_CODES, values))
+
+            # 稀疏格式 "{0x10: 15, 0x12: 80, 0xF0: 1}"
+            values = {}
+            for item in text.strip('{}').split(','):
+                if not item.strip():
+                    continue
+                code, value = item.split(':')
+                values[int(code.strip(), 0)] = int(value.strip())
+            return values or None
 
-        self.config.set(section_name, preset_key, preset_value)
+        except (ValueError, AttributeError):
+            return None
+
+    @classmethod
+    def format_preset(cls, values):
+        """格式化預設值為 "{0x10: 15, 0x12: 80}" 字串"""
+        if not isinstance(values, dict):
+            values = dict(zip(cls.LEGACY_PRESET_CODES, values))
+        items = ', '.join(
+            f'0x{code:02X}: {value}' for code, value in sorted(values.items()))
+        return f'{{{items}}}'
+
+    def get_color_correction(self, screen_index):
+        """獲取指定螢幕的RGB校正係數（例如 "1.0, 0.97, 1.02"）"""
+        value = self.config.get(
+            f'screen{screen_index}', 'color_correction', fallback='')
+        try:
+            correction = tuple(float(x) for x in value.split(','))
+            if len(correction) == 3:
+                return correction
+        except ValueError:
+            pass
+        return (1.0, 1.0, 1.0)
+
+    def get_brightness_curve(self, model, fallback_model=None):
+        """獲取顯示器型號的亮度響應曲線（未校正時為線性）
+
+        fallback_model 為舊版以顯示器描述保存的區段，型號沒有校正時使用。
+        """
+        section_name = f'{self.CALIBRATION_PREFIX}{model}'
+        if not self.config.has_section(section_name) and fallback_model:
+            section_name = f'{self.CALIBRATION_PREFIX}{fallback_model}'
+        return BrightnessCurve.parse(
+            self.config.get(section_name, 'brightness', fallback=''))
+
+    def save_brightness_curve(self, model, curve):
+        """保存顯示器型號的亮度響應曲線"""
+        section_name = f'{self.CALIBRATION_PREFIX}{model}'
+        self._ensure_section_exists(section_name)
+        self.config.set(section_name, 'brightness', curve.format())
         self.save_config()
 
+    def get_app_preset_rules(self, monitor_count):
+        """獲取前景程式對應的預設規則 {程式名稱: {螢幕索引: 預設編號}}
+
+        例如 "code.exe = 2" 套用到所有螢幕，"game.exe = 0:3, 1:4" 為個別螢幕指定。
+        """
+        rules = {}
+        if self.APP_PRESETS_SECTION not in self.config:
+            return rules
+        for app_name, value in self.config.items(self.APP_PRESETS_SECTION):
+            presets = {}
+            try:
+                for item in value.split(','):
+                    item = item.strip()
+                    if not item:
+                        continue
+                    if ':' in item:
+                        screen, preset_id = (int(x) for x in item.split(':'))
+                        presets[screen] = preset_id
+                    else:
+                        presets.update(dict.fromkeys(range(monitor_count), int(item)))
+            except ValueError:
+                event_log.record('app_preset_rule', error=f'{app_name} = {value}')
+                continue
+            presets = {screen: preset_id for screen, preset_id in presets.items()
+                       if 0 <= screen < monitor_count and 1 <= preset_id <= 4}
+            if presets:
+                rules[app_name.lower()] = presets
+        return rules
+
     def is_preset_empty(self, screen_index, preset_id):
         """檢查指定螢幕的預設是否為空"""
         return self.get_preset(screen_index, preset_id) is None
@@ -147,11 +249,13 @@ class PresetManager:
 
     def _do_save_config(self):
         """實際執行保存操作"""
+        text = format_config(self.config, self._preamble, self._original_sections)
         try:
             with open(self.config_file, 'w', encoding='utf-8') as configfile:
-                self.config.write(configfile)
+                configfile.write(text)
+            self._preamble, self._original_sections = split_sections(text)
         except Exception as e:
-            pass
+            event_log.record('save_config', error=repr(e))
 
     def get_hotkey_config(self):
         """獲取快捷鍵配置"""
@@ -166,10 +270,62 @@ class PresetManager:
             'brightness_down': self.config.get(self.HOTKEYS_SECTION, 'brightness_down', fallback='alt+z')
         }
 
+    def get_hotkey_backend(self):
+        """快捷鍵後端：auto、native（RegisterHotKey）或 hook（keyboard 鍵盤鉤子）"""
+        return self.config.get(self.HOTKEYS_SECTION, 'backend', fallback='auto')
+
     def get_auto_hide_seconds(self):
         """獲取自動隱藏秒數"""
         return self.config.getint(self.SETTINGS_SECTION, 'auto_hide_seconds', fallback=5)
 
+    def get_prewarm_panel(self):
+        """是否啟用預熱面板（隱藏時預先排好佈局）"""
+        return self.config.getboolean(self.SETTINGS_SECTION, 'prewarm_panel', fallback=False)
+
+    def get_link_brightness(self):
+        """是否連動所有螢幕的亮度"""
+        return self.config.getboolean(self.SETTINGS_SECTION, 'link_brightness', fallback=False)
+
+    def get_drift_poll(self):
+        """是否在背景偵測顯示器狀態漂移"""
+        return self.config.getboolean(self.SETTINGS_SECTION, 'drift_poll', fallback=True)
+
+    def get_reapply_on_resume(self):
+        """是否在系統喚醒或螢幕開啟後重新套用目前的VCP狀態"""
+        return self.config.getboolean(self.SETTINGS_SECTION, 'reapply_on_resume', fallback=True)
+
+    def get_stall_watchdog(self):
+        """是否啟用事件循環卡頓偵測"""
+        return self.config.getboolean(self.SETTINGS_SECTION, 'stall_watchdog', fallback=False)
+
+    def get_software_dimming(self):
+        """是否啟用軟體調光（亮度低於硬體最小值時以遮罩調暗）"""
+        return self.config.getboolean(self.SETTINGS_SECTION, 'software_dimming', fallback=False)
+
+    def get_warm_start(self):
+        """是否以上次保存的VCP狀態快速啟動（背景驗證，不在啟動時讀取DDC）"""
+        return self.config.getboolean(self.SETTINGS_SECTION, 'warm_start', fallback=True)
+
+    def get_usage_analytics(self):
+        """是否記錄亮度與預設的使用統計（需自行開啟）"""
+        return self.config.getboolean(self.SETTINGS_SECTION, 'usage_analytics', fallback=False)
+
+    def get_adaptive_brightness(self):
+        """是否依畫面內容的明暗自動調整亮度"""
+        return self.config.getboolean(self.SETTINGS_SECTION, 'adaptive_brightness', fallback=False)
+
+    def get_adaptive_brightness_range(self):
+        """內容自適應亮度的 (暗畫面亮度, 亮畫面亮度)，設定值例如 70, 40"""
+        value = self.config.get(
+            self.SETTINGS_SECTION, 'adaptive_brightness_range', fallback='')
+        try:
+            dark_level, bright_level = (int(x) for x in value.split(','))
+            if 0 <= dark_level <= 100 and 0 <= bright_level <= 100:
+                return dark_level, bright_level
+        except ValueError:
+            pass
+        return 70, 40
+
     def save_auto_hide_seconds(self, seconds):
         """保存自動隱藏秒數"""
         self._ensure_section_exists(self.SETTINGS_SECTION)
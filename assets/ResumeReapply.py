@@ -0,0 +1,218 @@
+import ctypes
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from ctypes import wintypes
+
+from PyQt6.QtCore import QAbstractNativeEventFilter, QObject, pyqtSignal
+from PyQt6.QtWidgets import QApplication
+
+from assets.DDCCI import INPUT_CODE
+from assets.EventLog import event_log
+
+# Windows 電源事件常數
+WM_POWERBROADCAST = 0x0218
+WM_DISPLAYCHANGE = 0x007E
+PBT_APMRESUMESUSPEND = 0x0007
+PBT_APMRESUMEAUTOMATIC = 0x0012
+PBT_POWERSETTINGCHANGE = 0x8013
+DEVICE_NOTIFY_WINDOW_HANDLE = 0x0000
+DISPLAY_ON = 1
+
+BRIGHTNESS = 0x10
+
+
+class GUID(ctypes.Structure):
+    _fields_ = [
+        ('Data1', wintypes.DWORD),
+        ('Data2', wintypes.WORD),
+        ('Data3', wintypes.WORD),
+        ('Data4', ctypes.c_ubyte * 8)
+    ]
+
+
+class POWERBROADCAST_SETTING(ctypes.Structure):
+    _fields_ = [
+        ('PowerSetting', GUID),
+        ('DataLength', wintypes.DWORD),
+        ('Data', ctypes.c_ubyte * 1)
+    ]
+
+
+# GUID_CONSOLE_DISPLAY_STATE {6FE69556-704A-47A0-8F24-C28D936FDA47}
+GUID_CONSOLE_DISPLAY_STATE = GUID(
+    0x6FE69556, 0x704A, 0x47A0,
+    (ctypes.c_ubyte * 8)(0x8F, 0x24, 0xC2, 0x8D, 0x93, 0x6F, 0xDA, 0x47))
+
+
+def _wait_until_ready(controller, monitor_idx, probe_code, deadline):
+    """重複讀取直到顯示器回應，返回讀到的值，逾時返回None"""
+    delay = 0.05
+    while True:
+        result = controller.get_vcp_feature(monitor_idx, probe_code)
+        if result is not None:
+            return result['current']
+        if time.perf_counter() + delay >= deadline:
+            return None
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+
+def reapply_monitor(controller, monitor_idx, state, deadline):
+    """等待單一顯示器就緒後重新套用 state（{VCP代碼: 值}），讀回相同的值不寫入"""
+    started = time.perf_counter()
+    result = {'status': 'ok', 'ready_ms': None, 'written': [], 'skipped': []}
+    # 不重新套用輸入來源：能回應DDC就代表已在可用的輸入上，切換會讓畫面消失
+    state = {code: value for code, value in state.items() if code != INPUT_CODE}
+    if not state:
+        return result
+
+    probe_code = BRIGHTNESS if BRIGHTNESS in state else next(iter(state))
+    current = _wait_until_ready(controller, monitor_idx, probe_code, deadline)
+    if current is None:
+        result['status'] = 'timeout'
+        return result
+    result['ready_ms'] = (time.perf_counter() - started) * 1000
+
+    for vcp_code, value in state.items():
+        if time.perf_counter() >= deadline:
+            result['status'] = 'timeout'
+            break
+        if vcp_code != probe_code:
+            readback = controller.get_vcp_feature(monitor_idx, vcp_code)
+            current = None if readback is None else readback['current']
+        if current == value:
+            result['skipped'].append(vcp_code)
+        elif controller.VCP_set(monitor_idx, vcp_code, value):
+            result['written'].append(vcp_code)
+        else:
+            result['status'] = 'failed'
+    return result
+
+
+def reapply_all(controller, states, timeout=10.0):
+    """所有顯示器並行重新套用，返回 {顯示器索引: 結果}"""
+    deadline = time.perf_counter() + timeout
+    with ThreadPoolExecutor(max_workers=max(1, len(states)),
+                            thread_name_prefix='reapply') as executor:
+        futures = {
+            monitor_idx: executor.submit(
+                reapply_monitor, controller, monitor_idx, state, deadline)
+            for monitor_idx, state in enumerate(states)
+        }
+        results = {}
+        for monitor_idx, future in futures.items():
+            try:
+                results[monitor_idx] = future.result()
+            except Exception as e:
+                event_log.record('reapply', monitor_idx, error=repr(e))
+                results[monitor_idx] = {'status': 'error', 'ready_ms': None,
+                                        'written': [], 'skipped': []}
+    return results
+
+
+class PowerEventFilter(QAbstractNativeEventFilter):
+    """攔截系統喚醒、螢幕開啟與顯示設定改變的 Windows 訊息"""
+
+    def __init__(self, callback):
+        super().__init__()
+        self.callback = callback
+
+    def nativeEventFilter(self, event_type, message):
+        if event_type != b'windows_generic_MSG':
+            return False, 0
+        msg = wintypes.MSG.from_address(int(message))
+        if msg.message == WM_POWERBROADCAST:
+            if msg.wParam in (PBT_APMRESUMEAUTOMATIC, PBT_APMRESUMESUSPEND):
+                self.callback('resume')
+            elif msg.wParam == PBT_POWERSETTINGCHANGE and msg.lParam:
+                setting = POWERBROADCAST_SETTING.from_address(msg.lParam)
+                if bytes(setting.PowerSetting) == bytes(GUID_CONSOLE_DISPLAY_STATE) \
+                        and setting.Data[0] == DISPLAY_ON:
+                    self.callback('display_on')
+        elif msg.message == WM_DISPLAYCHANGE:
+            self.callback('display_change')
+        return False, 0
+
+
+class ResumeReapplier(QObject):
+    """系統喚醒或顯示器開啟後，在背景重新套用快取的VCP狀態
+
+    短時間內的多個事件（喚醒通常伴隨螢幕開啟與顯示設定改變）合併為一次；
+    執行中收到新事件時，結束後再執行一次。
+    """
+
+    # 信號參數：{顯示器索引: 結果}
+    finished = pyqtSignal(object)
+
+    TIMEOUT = 10.0  # 等待所有顯示器就緒與套用的上限（秒）
+
+    def __init__(self, controller, state_provider, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self.state_provider = state_provider  # 返回 vcp_temp（每台顯示器的 {VCP代碼: 值}）
+        self._running = False
+        self._rerun = False
+        self._event_filter = None
+        self._power_notify = None
+        # 跨線程信號會排入主線程執行
+        self.finished.connect(self._on_finished)
+
+    def install(self, window):
+        """註冊電源事件（Windows）與螢幕新增事件"""
+        app = QApplication.instance()
+        app.screenAdded.connect(lambda screen: self.trigger('screen_added'))
+        if not hasattr(ctypes, 'windll'):
+            return
+        self._event_filter = PowerEventFilter(self.trigger)
+        app.installNativeEventFilter(self._event_filter)
+        # 獨立的 DLL 物件宣告 HPOWERNOTIFY 返回值（未宣告時在64位元被截斷）
+        self._user32 = ctypes.WinDLL('user32')
+        self._user32.RegisterPowerSettingNotification.argtypes = [
+            wintypes.HANDLE, ctypes.POINTER(GUID), wintypes.DWORD]
+        self._user32.RegisterPowerSettingNotification.restype = wintypes.HANDLE
+        self._user32.UnregisterPowerSettingNotification.argtypes = [wintypes.HANDLE]
+        self._user32.UnregisterPowerSettingNotification.restype = wintypes.BOOL
+        self._power_notify = self._user32.RegisterPowerSettingNotification(
+            int(window.winId()),
+            ctypes.byref(GUID_CONSOLE_DISPLAY_STATE), DEVICE_NOTIFY_WINDOW_HANDLE)
+
+    def uninstall(self):
+        """取消電源事件註冊"""
+        if self._event_filter is not None:
+            QApplication.instance().removeNativeEventFilter(self._event_filter)
+            self._event_filter = None
+        if self._power_notify:
+            self._user32.UnregisterPowerSettingNotification(self._power_notify)
+            self._power_notify = None
+
+    def trigger(self, reason='manual'):
+        """排程一次重新套用（在主線程呼叫）"""
+        event_log.record(f'reapply_trigger:{reason}')
+        if self._running:
+            self._rerun = True
+            return
+        self._start()
+
+    def _start(self):
+        self._running = True
+        self._rerun = False
+        # 在主線程複製快取，背景線程不直接讀取 vcp_temp
+        states = [dict(values) for values in self.state_provider()]
+        threading.Thread(target=self._run, args=(states,),
+                         name='ResumeReapplier', daemon=True).start()
+
+    def _run(self, states):
+        started = time.perf_counter()
+        results = reapply_all(self.controller, states, self.TIMEOUT)
+        for monitor_idx, result in results.items():
+            event_log.record('reapply', monitor_idx,
+                             duration_ms=(time.perf_counter() - started) * 1000,
+                             error=None if result['status'] == 'ok' else result['status'])
+        self.finished.emit(results)
+
+    def _on_finished(self, results):
+        """執行期間有新的事件時再執行一次"""
+        self._running = False
+        if self._rerun:
+            self._start()
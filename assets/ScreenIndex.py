@@ -0,0 +1,84 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class ScreenGeometryIndex(QObject):
+    """螢幕幾何索引 - 快取每個螢幕的範圍與UI預設位置，隨 QScreen 信號更新"""
+
+    changed = pyqtSignal()
+
+    # UI 預設位置相對於可用區域的偏移
+    PANEL_HALF_WIDTH = 115
+
+    def __init__(self, app, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.screens = []
+        self.bounds = []     # (左, 上, 右, 下)，用於游標查找
+        self.positions = []  # UI 預設位置 (x, y)
+
+        app.screenAdded.connect(self._on_screen_added)
+        app.screenRemoved.connect(self._rebuild)
+        app.primaryScreenChanged.connect(self._rebuild)
+        for screen in app.screens():
+            self._watch(screen)
+        self._rebuild()
+
+    def _watch(self, screen):
+        """監聽螢幕的解析度、工作列與DPI變化"""
+        screen.geometryChanged.connect(lambda _, s=screen: self._update(s))
+        screen.availableGeometryChanged.connect(
+            lambda _, s=screen: self._update(s))
+        screen.logicalDotsPerInchChanged.connect(
+            lambda _, s=screen: self._update(s))
+
+    def _on_screen_added(self, screen):
+        """新增螢幕"""
+        self._watch(screen)
+        self._rebuild()
+
+    def _rebuild(self, *_):
+        """依 QApplication.screens() 的順序重建索引"""
+        self.screens = list(self.app.screens())
+        self.bounds = [self._bounds(screen) for screen in self.screens]
+        self.positions = [self._default_position(screen)
+                          for screen in self.screens]
+        self.changed.emit()
+
+    def _update(self, screen):
+        """只更新單一螢幕的快取"""
+        for i, cached in enumerate(self.screens):
+            if cached is screen:
+                self.bounds[i] = self._bounds(screen)
+                self.positions[i] = self._default_position(screen)
+                self.changed.emit()
+                return
+        self._rebuild()
+
+    @staticmethod
+    def _bounds(screen):
+        """螢幕範圍"""
+        geom = screen.geometry()
+        return (geom.x(), geom.y(), geom.x() + geom.width(), geom.y() + geom.height())
+
+    @classmethod
+    def _default_position(cls, screen):
+        """UI 在該螢幕的預設位置（可用區域底部置中）"""
+        geom = screen.availableGeometry()
+        return (
+            geom.x() + geom.width() // 2 - cls.PANEL_HALF_WIDTH,
+            geom.y() + geom.height() - geom.height() // 9
+        )
+
+    def index_at(self, point):
+        """座標所在的螢幕索引，找不到時返回主螢幕 0"""
+        x, y = point.x(), point.y()
+        for i, (left, top, right, bottom) in enumerate(self.bounds):
+            if left <= x < right and top <= y < bottom:
+                return i
+        return 0
+
+    def position(self, index):
+        """螢幕索引對應的 UI 預設位置"""
+        if 0 <= index < len(self.positions):
+            return self.positions[index]
+        return self.positions[0] if self.positions else (0, 0)
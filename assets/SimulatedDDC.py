@@ -0,0 +1,205 @@
+"""
+模擬 DDC/CI 後端
+
+以模擬的 dxva2 取代 windll.dxva2，DDCCIController 的重試、等待與事件紀錄
+照常執行，只有硬體行為被替換：每台虛擬顯示器有自己的VCP狀態、支援代碼、
+指令間隔、延遲抖動、失敗率與寫入後的忙碌時間。
+
+選擇方式（環境變數優先於 config.ini 的 [ddc] 區段）：
+    VCPANEL_DDC_BACKEND=simulated      或  [ddc] backend = simulated
+    VCPANEL_SIM_MONITORS=4             或  [ddc] sim_monitors = 4
+其他參數同樣以 VCPANEL_SIM_<名稱> 或 [ddc] sim_<名稱> 設定，見 DEFAULT_SETTINGS。
+"""
+import os
+import random
+import threading
+import time
+
+from assets.ConfigFile import read_config
+from assets.DDCCI import INPUT_CODE, PRESET_CODES, DDCCIController
+
+SIM_ENV_PREFIX = 'VCPANEL_SIM_'
+DDC_SECTION = 'ddc'
+
+DEFAULT_SETTINGS = {
+    'monitors': 2,             # 虛擬顯示器數量（1~16）
+    'command_gap_ms': 50.0,    # 兩次指令之間顯示器要求的最小間隔
+    'read_latency_ms': 40.0,   # 讀取回覆的基本延遲
+    'write_latency_ms': 10.0,  # 寫入的基本延遲
+    'jitter_ms': 5.0,          # 延遲的隨機抖動上限
+    'failure_rate': 0.0,       # 每次交易失敗的機率
+    'busy_ms': 0.0,            # 寫入後顯示器拒絕指令的時間
+    'wake_ms': 1500.0,         # 喚醒後匯流排恢復回應所需的時間
+    'seed': None,              # 亂數種子（用於重現）
+}
+
+MAX_MONITORS = 16
+
+# 出廠預設值 {VCP代碼: (目前值, 最大值)}
+FACTORY_VALUES = {
+    0x10: (50, 100),
+    0x12: (50, 100),
+    0x16: (50, 100),
+    0x18: (50, 100),
+    0x1A: (50, 100),
+    0xF0: (0, 1),
+    0xEC: (0, 6),
+    0xEF: (0, 20),
+    INPUT_CODE: (0x0F, 0x12),
+}
+
+# 能力字串中列出可選值的非連續代碼
+CAPABILITY_VALUES = {
+    0xF0: (0x00, 0x01),
+    0xEC: (0x00, 0x05, 0x06),
+    INPUT_CODE: (0x0F, 0x11, 0x12),
+}
+
+
+def load_simulation_settings(config_file='config.ini'):
+    """讀取模擬參數：預設值 → config.ini [ddc] sim_* → VCPANEL_SIM_* 環境變數"""
+    settings = dict(DEFAULT_SETTINGS)
+
+    config = read_config(config_file)
+    for key in DEFAULT_SETTINGS:
+        value = config.get(DDC_SECTION, f'sim_{key}', fallback=None)
+        value = os.environ.get(SIM_ENV_PREFIX + key.upper(), value)
+        if value not in (None, ''):
+            settings[key] = int(value) if key in ('monitors', 'seed') else float(value)
+
+    settings['monitors'] = max(1, min(MAX_MONITORS, settings['monitors']))
+    return settings
+
+
+class SimulatedMonitor:
+    """虛擬顯示器 - 保存VCP狀態並模擬匯流排時序"""
+
+    def __init__(self, index, settings, supported_codes=PRESET_CODES):
+        self.index = index
+        self.description = f"Simulated Monitor {index + 1}"
+        self.settings = settings
+        seed = settings['seed']
+        self.rng = random.Random(None if seed is None else seed + index)
+        self.supported_codes = tuple(supported_codes)
+        self.values = {}
+        self.transactions = 0
+        self.failures = 0
+        self._bus_free_at = 0.0
+        self._busy_until = 0.0
+        self._asleep_until = 0.0
+        self._lock = threading.Lock()  # 同一台顯示器的匯流排是序列的
+        self.reset()
+
+    def reset(self):
+        """回到出廠預設值"""
+        self.values = {code: FACTORY_VALUES.get(code, (0, 100))
+                       for code in self.supported_codes}
+
+    def power_cycle(self, wake_ms=None):
+        """模擬關機再開機：VCP狀態回到出廠值，匯流排在 wake_ms 內不回應"""
+        wake_ms = self.settings['wake_ms'] if wake_ms is None else wake_ms
+        with self._lock:
+            self.reset()
+            self._asleep_until = time.perf_counter() + wake_ms / 1000
+
+    def _transact(self, latency_ms):
+        """等待指令間隔並模擬延遲，返回這次交易是否成功"""
+        with self._lock:
+            now = time.perf_counter()
+            if now < self._bus_free_at:
+                time.sleep(self._bus_free_at - now)
+
+            jitter = self.rng.uniform(0, self.settings['jitter_ms'])
+            time.sleep((latency_ms + jitter) / 1000)
+
+            now = time.perf_counter()
+            self._bus_free_at = now + self.settings['command_gap_ms'] / 1000
+            self.transactions += 1
+            if now < self._busy_until or now < self._asleep_until \
+                    or self.rng.random() < self.settings['failure_rate']:
+                self.failures += 1
+                return False
+            return True
+
+    def read(self, vcp_code):
+        """讀取VCP值，失敗或不支援時返回None"""
+        if not self._transact(self.settings['read_latency_ms']):
+            return None
+        return self.values.get(vcp_code)
+
+    def write(self, vcp_code, value):
+        """寫入VCP值"""
+        if not self._transact(self.settings['write_latency_ms']):
+            return False
+        if vcp_code not in self.values:
+            return False
+        self.values[vcp_code] = (value, self.values[vcp_code][1])
+        self._busy_until = time.perf_counter() + self.settings['busy_ms'] / 1000
+        return True
+
+    def capabilities(self):
+        """MCCS能力字串"""
+        codes = ' '.join(
+            f'{code:02X}' + (f"({' '.join(f'{value:02X}' for value in CAPABILITY_VALUES[code])})"
+                             if code in CAPABILITY_VALUES else '')
+            for code in self.supported_codes)
+        return f"(prot(monitor)type(lcd)model(SIM{self.index + 1})vcp({codes})mccs_ver(2.2))"
+
+    def request_capabilities(self):
+        """經由匯流排讀取能力字串，失敗時返回None"""
+        if not self._transact(self.settings['read_latency_ms']):
+            return None
+        return self.capabilities()
+
+
+class SimulatedDxva2:
+    """模擬的 dxva2 API - 以顯示器索引作為 handle"""
+
+    def __init__(self, monitors):
+        self.monitors = monitors
+
+    def GetVCPFeatureAndVCPFeatureReply(self, handle, vcp_code, vcp_type, current, maximum):
+        result = self.monitors[handle].read(vcp_code)
+        if result is None:
+            return 0
+        current._obj.value, maximum._obj.value = result
+        return 1
+
+    def SetVCPFeature(self, handle, vcp_code, value):
+        return int(self.monitors[handle].write(vcp_code, value))
+
+    def GetCapabilitiesStringLength(self, handle, length):
+        length._obj.value = len(self.monitors[handle].capabilities()) + 1
+        return 1
+
+    def CapabilitiesRequestAndCapabilitiesReply(self, handle, buffer, length):
+        capabilities = self.monitors[handle].request_capabilities()
+        if capabilities is None:
+            return 0
+        buffer.value = capabilities.encode('ascii')
+        return 1
+
+    def DestroyPhysicalMonitor(self, handle):
+        return 1
+
+
+class SimulatedDDCCIController(DDCCIController):
+    """使用虛擬顯示器的DDC控制器"""
+
+    def __init__(self, settings=None):
+        self.settings = settings or load_simulation_settings()
+        self.simulated_monitors = [
+            SimulatedMonitor(i, self.settings)
+            for i in range(self.settings['monitors'])
+        ]
+        self.user32 = None
+        self.dxva2 = SimulatedDxva2(self.simulated_monitors)
+        self._init_monitors()
+
+    def _discover_monitors(self):
+        """列出虛擬顯示器"""
+        for monitor in self.simulated_monitors:
+            self.monitors.append({
+                'handle': monitor.index,
+                'description': monitor.description
+            })
@@ -0,0 +1,112 @@
+"""
+單一實例保護
+
+第二次啟動時以本機 socket（Windows 為具名管道）連到執行中的實例，轉交命令列
+參數後立即結束，不會進行DDC探索或建立視窗。
+
+命令列參數：
+    (無)                顯示控制面板
+    --show              顯示控制面板
+    --compact           顯示快捷模式
+    --preset N          在滑鼠所在螢幕套用預設 N（1~4）
+    --set CODE=VALUE    在滑鼠所在螢幕設定VCP值，例如 --set 0x10=40（可重複）
+"""
+import argparse
+import json
+import os
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+# 依使用者區分，避免多使用者環境互相轉交
+SERVER_NAME = f"VCPanel-{os.environ.get('USERNAME') or os.environ.get('USER', '')}"
+CONNECT_TIMEOUT_MS = 100
+
+
+def send_to_running_instance(args, server_name=SERVER_NAME):
+    """嘗試把參數轉交給執行中的實例，成功返回True"""
+    socket = QLocalSocket()
+    socket.connectToServer(server_name)
+    if not socket.waitForConnected(CONNECT_TIMEOUT_MS):
+        return False
+    socket.write(json.dumps(list(args)).encode('utf-8') + b'\n')
+    socket.waitForBytesWritten(CONNECT_TIMEOUT_MS)
+    socket.disconnectFromServer()
+    return True
+
+
+class _CommandParser(argparse.ArgumentParser):
+    """解析錯誤時拋出例外而不是結束程式"""
+
+    def error(self, message):
+        raise ValueError(message)
+
+
+def _vcp_assignment(text):
+    code, value = text.split('=')
+    return int(code, 0), int(value, 0)
+
+
+def parse_command(args):
+    """解析轉交的命令列參數，無效時返回None"""
+    parser = _CommandParser(prog='VCPanel', add_help=False)
+    parser.add_argument('--show', action='store_true')
+    parser.add_argument('--compact', action='store_true')
+    parser.add_argument('--preset', type=int, choices=range(1, 5))
+    parser.add_argument('--set', type=_vcp_assignment, action='append', default=[])
+    try:
+        return parser.parse_args(args)
+    except ValueError:
+        return None
+
+
+class InstanceServer(QObject):
+    """主實例的本機 socket 伺服器，收到其他實例轉交的參數時發出信號"""
+
+    # 信號參數：命令列參數清單
+    command_received = pyqtSignal(list)
+
+    def __init__(self, server_name=SERVER_NAME, parent=None):
+        super().__init__(parent)
+        self.server_name = server_name
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self._on_new_connection)
+
+    def listen(self):
+        """開始監聽；已有其他實例在監聽時返回False"""
+        if self.server.listen(self.server_name):
+            return True
+        probe = QLocalSocket()
+        probe.connectToServer(self.server_name)
+        if probe.waitForConnected(CONNECT_TIMEOUT_MS):
+            probe.disconnectFromServer()
+            return False
+        # 上次異常結束留下的 socket 檔案
+        QLocalServer.removeServer(self.server_name)
+        return self.server.listen(self.server_name)
+
+    def close(self):
+        self.server.close()
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            buffer = bytearray()
+            connection.readyRead.connect(
+                lambda c=connection, b=buffer: b.extend(bytes(c.readAll())))
+            connection.disconnected.connect(
+                lambda c=connection, b=buffer: self._on_disconnected(c, b))
+            if connection.state() == QLocalSocket.LocalSocketState.UnconnectedState:
+                self._on_disconnected(connection, buffer)  # 連線前對方已送完並中斷
+
+    def _on_disconnected(self, connection, buffer):
+        """連線結束：解析收到的每一行參數"""
+        buffer.extend(bytes(connection.readAll()))
+        connection.deleteLater()
+        for line in bytes(buffer).splitlines():
+            try:
+                args = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(args, list):
+                self.command_received.emit([str(arg) for arg in args])
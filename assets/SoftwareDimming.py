@@ -0,0 +1,159 @@
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.QtGui import QColor, QPainter
+from PyQt6.QtWidgets import QWidget
+
+from assets.BusScheduler import INTERACTIVE
+
+BRIGHTNESS = 0x10
+
+DIM_LEVELS = 50   # 感知亮度 0 以下可再調低的級數（-50 為最暗）
+MAX_DIM = 0.85    # 最暗時遮罩的不透明度
+MIN_LUMINANCE = 0.2  # 硬體感知亮度 0 時相對於 100 的發光量（估計值）
+
+
+def _luminance(level):
+    """硬體感知亮度（0~100）對應的相對發光量"""
+    return MIN_LUMINANCE + (1 - MIN_LUMINANCE) * level / 100
+
+
+class DimmingOverlay(QWidget):
+    """覆蓋整個螢幕的半透明黑色遮罩（不接收滑鼠與焦點）"""
+
+    def __init__(self):
+        super().__init__(None, Qt.WindowType.FramelessWindowHint
+                         | Qt.WindowType.Tool
+                         | Qt.WindowType.WindowStaysOnTopHint
+                         | Qt.WindowType.WindowTransparentForInput
+                         | Qt.WindowType.WindowDoesNotAcceptFocus)
+        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WidgetAttribute.WA_ShowWithoutActivating)
+        self.opacity = 0.0
+
+    def set_opacity(self, opacity):
+        """設定遮罩不透明度，0 時隱藏視窗"""
+        if opacity == self.opacity:
+            return
+        self.opacity = opacity
+        if opacity <= 0:
+            self.hide()
+            return
+        self.update()
+        if not self.isVisible():
+            self.show()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(0, 0, 0, round(self.opacity * 255)))
+
+
+class SoftwareDimmer(QObject):
+    """軟體調光 - 以遮罩補足硬體亮度
+
+    感知亮度延伸到 -DIM_LEVELS，0 以下由遮罩調暗。調整時遮罩立即反映
+    目標亮度，硬體亮度經由匯流排排程器寫入（排隊中的寫入會被新的目標取代）；
+    寫入完成後遮罩退回只負責 0 以下的部分。
+    """
+
+    # 信號參數：顯示器索引, VCP值, 是否成功（匯流排執行線程發出，主線程接收）
+    hardware_written = pyqtSignal(int, int, bool)
+
+    def __init__(self, bus, curves, screen_index, parent=None):
+        super().__init__(parent)
+        self.bus = bus  # BusScheduler
+        self.curves = curves
+        self.screen_index = screen_index
+        self.targets = {}          # 顯示器索引 -> 目標感知亮度
+        self.hardware_levels = {}  # 顯示器索引 -> 硬體目前的感知亮度
+        self._requested = {}       # 顯示器索引 -> 最後送出的VCP值
+        self._writes = {}          # 顯示器索引 -> 尚未回報完成的最新寫入請求
+        self._overlays = {}
+
+        self.hardware_written.connect(self._on_hardware_written)
+        self.screen_index.changed.connect(self._place_overlays)
+
+    def sync(self, monitor_idx, value):
+        """硬體亮度由其他途徑寫入（預設、漂移等）：以該值為準並取消遮罩"""
+        level = self.curves[monitor_idx].level_for(value)
+        self.targets[monitor_idx] = level
+        self.hardware_levels[monitor_idx] = level
+        self._requested[monitor_idx] = value
+        self._writes.pop(monitor_idx, None)  # 其他途徑的寫入會取代排隊中的調光寫入
+        self._update_overlay(monitor_idx)
+
+    def target_level(self, monitor_idx):
+        """目前的目標感知亮度（可能小於 0），未設定時返回None"""
+        return self.targets.get(monitor_idx)
+
+    def set_level(self, monitor_idx, level):
+        """設定目標感知亮度：遮罩立即更新，硬體在背景寫入，返回目標VCP值"""
+        level = max(-DIM_LEVELS, min(100, level))
+        self.targets[monitor_idx] = level
+        value = self.curves[monitor_idx].vcp_for(max(0, level))
+        if self._requested.get(monitor_idx) != value:
+            self._requested[monitor_idx] = value
+            request = self.bus.set(monitor_idx, BRIGHTNESS, value, INTERACTIVE)
+            self._writes[monitor_idx] = request
+            request.add_done_callback(self._on_request_done)
+        self._update_overlay(monitor_idx)
+        return value
+
+    def opacity(self, monitor_idx):
+        """遮罩不透明度：0 以下的軟體調光，加上硬體尚未調暗到目標的差距"""
+        level = self.targets.get(monitor_idx)
+        if level is None:
+            return 0.0
+        dim = min(0, level) / -DIM_LEVELS * MAX_DIM
+        hardware = self.hardware_levels.get(monitor_idx, max(0, level))
+        pending = 0.0
+        if hardware > max(0, level):
+            pending = 1 - _luminance(max(0, level)) / _luminance(hardware)
+        return 1 - (1 - dim) * (1 - pending)
+
+    def pending(self, monitor_idx):
+        """最新的硬體寫入是否尚未在主線程回報完成"""
+        return monitor_idx in self._writes
+
+    def _on_request_done(self, request):
+        """寫入完成（被新的目標取代的寫入不回報，由取代者回報）"""
+        if request.status != 'replaced':
+            self.hardware_written.emit(request.monitor_idx, request.value, request.result())
+
+    def _on_hardware_written(self, monitor_idx, value, ok):
+        """硬體寫入完成：更新硬體亮度並重新計算遮罩"""
+        request = self._writes.get(monitor_idx)
+        if request is not None and request.done() and request.value == value:
+            del self._writes[monitor_idx]
+        if ok:
+            self.hardware_levels[monitor_idx] = self.curves[monitor_idx].level_for(value)
+        elif self._requested.get(monitor_idx) == value:
+            self._requested[monitor_idx] = None  # 下次調整時重試
+        self._update_overlay(monitor_idx)
+
+    def _overlay(self, monitor_idx):
+        if monitor_idx not in self._overlays:
+            overlay = DimmingOverlay()
+            self._overlays[monitor_idx] = overlay
+            self._place(monitor_idx, overlay)
+        return self._overlays[monitor_idx]
+
+    def _place(self, monitor_idx, overlay):
+        """將遮罩移到顯示器對應的螢幕"""
+        screens = self.screen_index.screens
+        if monitor_idx < len(screens):
+            overlay.setGeometry(screens[monitor_idx].geometry())
+
+    def _place_overlays(self):
+        for monitor_idx, overlay in self._overlays.items():
+            self._place(monitor_idx, overlay)
+
+    def _update_overlay(self, monitor_idx):
+        opacity = self.opacity(monitor_idx)
+        if opacity > 0 or monitor_idx in self._overlays:
+            self._overlay(monitor_idx).set_opacity(opacity)
+
+    def close(self):
+        """關閉所有遮罩"""
+        for overlay in self._overlays.values():
+            overlay.close()
+        self._overlays.clear()
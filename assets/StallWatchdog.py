@@ -0,0 +1,135 @@
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+
+from PyQt6.QtCore import QObject, QTimer
+
+from assets.EventLog import event_log
+
+# 不視為事件處理函式的框架（traced_input 包裝與信號連接用的 lambda）
+WRAPPER_FILES = ('DDCTrace.py',)
+WRAPPER_FUNCTIONS = ('<lambda>',)
+
+
+def _frame_label(frame):
+    return f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}"
+
+
+def attribute_stack(stack):
+    """從主線程堆疊找出 (事件處理函式, 最內層呼叫位置)
+
+    事件處理函式是最內層事件循環（app.exec()、選單或對話框的 exec()）
+    直接呼叫的 Python 函式。
+    """
+    frames = [frame for frame in stack
+              if os.path.basename(frame.filename) not in WRAPPER_FILES
+              and frame.name not in WRAPPER_FUNCTIONS]
+    loops = [i for i, frame in enumerate(frames) if '.exec(' in (frame.line or '')]
+    handlers = frames[loops[-1] + 1:] if loops else frames
+    if not handlers:
+        return 'event loop', 'event loop'
+    return _frame_label(handlers[0]), _frame_label(frames[-1])
+
+
+class StallWatchdog(QObject):
+    """事件循環卡頓偵測
+
+    主線程以計時器定期更新心跳，監看線程發現心跳停止超過門檻時擷取主線程的
+    Python 堆疊；心跳恢復後由主線程計算卡頓時間並記錄報告。
+    """
+
+    HEARTBEAT_MS = 50     # 心跳間隔
+    THRESHOLD_MS = 250    # 超過此時間視為卡頓
+
+    def __init__(self, parent=None, max_reports=64):
+        super().__init__(parent)
+        self.reports = deque(maxlen=max_reports)
+        self._main_ident = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._captured = {}  # 心跳時間 -> 卡頓期間擷取的堆疊
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._heartbeat = QTimer(self)
+        self._heartbeat.timeout.connect(self._beat)
+
+    def start(self):
+        """開始監看"""
+        if self._thread is not None:
+            return
+        self._last_beat = time.perf_counter()
+        self._heartbeat.start(self.HEARTBEAT_MS)
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name='StallWatchdog', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止監看"""
+        self._heartbeat.stop()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _beat(self):
+        """主線程心跳：與上次的間隔過長時記錄卡頓"""
+        now = time.perf_counter()
+        previous, self._last_beat = self._last_beat, now
+        stalled_ms = (now - previous) * 1000 - self.HEARTBEAT_MS
+        with self._lock:
+            stack = self._captured.pop(previous, None)
+            self._captured.clear()
+        if stalled_ms >= self.THRESHOLD_MS:
+            self._record(stalled_ms, stack)
+
+    def _watch(self):
+        """監看線程：心跳停止超過門檻時擷取一次主線程堆疊"""
+        interval = self.THRESHOLD_MS / 2000
+        while not self._stop.wait(interval):
+            beat = self._last_beat
+            if (time.perf_counter() - beat) * 1000 < self.THRESHOLD_MS:
+                continue
+            with self._lock:
+                if beat in self._captured:
+                    continue
+            frame = sys._current_frames().get(self._main_ident)
+            stack = traceback.extract_stack(frame) if frame is not None else None
+            with self._lock:
+                self._captured[beat] = stack
+
+    def _record(self, duration_ms, stack):
+        """保存一筆卡頓報告"""
+        if stack:
+            handler, site = attribute_stack(stack)
+            lines = [_frame_label(frame) for frame in stack]
+        else:
+            handler = site = 'unknown'
+            lines = []
+        self.reports.append({
+            'time': time.time(),
+            'duration_ms': duration_ms,
+            'handler': handler,
+            'site': site,
+            'stack': lines,
+        })
+        event_log.record('stall', duration_ms=duration_ms, detail=f"{handler} -> {site}")
+
+    def summary(self, top=5):
+        """依事件處理函式彙總的卡頓統計文字"""
+        reports = list(self.reports)
+        if not reports:
+            return "尚無卡頓紀錄"
+        counts = Counter(report['handler'] for report in reports)
+        lines = [f"卡頓 {len(reports)} 次，最長 "
+                 f"{max(report['duration_ms'] for report in reports):.0f} ms"]
+        for handler, count in counts.most_common(top):
+            durations = [r['duration_ms'] for r in reports if r['handler'] == handler]
+            sites = Counter(r['site'] for r in reports if r['handler'] == handler)
+            lines.append(f"{handler} ×{count} 共 {sum(durations):.0f} ms"
+                         f"（{sites.most_common(1)[0][0]}）")
+        return '\n'.join(lines)
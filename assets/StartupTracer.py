@@ -0,0 +1,80 @@
+import builtins
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# 設定此環境變數（例如 VCPANEL_TRACE_STARTUP=1）即啟用啟動追蹤
+TRACE_ENV = 'VCPANEL_TRACE_STARTUP'
+
+
+class StartupTracer:
+    """啟動追蹤器 - 記錄每個啟動階段與每個模組匯入的耗時（僅依賴標準函式庫）"""
+
+    def __init__(self, enabled=None):
+        if enabled is None:
+            enabled = os.environ.get(TRACE_ENV, '') not in ('', '0')
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self.phases = []   # (階段名稱, 毫秒)
+        self.imports = []  # (模組名稱, 毫秒)
+        self._import_depth = 0
+        self._original_import = None
+
+    def install_import_hook(self):
+        """攔截頂層匯入以記錄耗時（巢狀匯入計入最外層）"""
+        if not self.enabled or self._original_import is not None:
+            return
+        self._original_import = builtins.__import__
+
+        def traced_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if self._import_depth or level or name in sys.modules:
+                return self._original_import(name, globals, locals, fromlist, level)
+
+            self._import_depth += 1
+            start = time.perf_counter()
+            try:
+                return self._original_import(name, globals, locals, fromlist, level)
+            finally:
+                self._import_depth -= 1
+                self.imports.append(
+                    (name, (time.perf_counter() - start) * 1000))
+
+        builtins.__import__ = traced_import
+
+    def uninstall_import_hook(self):
+        """還原原本的匯入函數"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    @contextmanager
+    def phase(self, name):
+        """記錄一個啟動階段的耗時"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, (time.perf_counter() - start) * 1000))
+
+    def report(self, stream=None):
+        """輸出啟動耗時報告（預設寫到 stderr）"""
+        if not self.enabled:
+            return
+        self.uninstall_import_hook()
+        stream = stream or sys.stderr
+        total = (time.perf_counter() - self.origin) * 1000
+
+        print(f"[startup] 總耗時 {total:.1f} ms", file=stream)
+        for name, ms in self.imports:
+            print(f"[startup] import {name:<28} {ms:8.1f} ms", file=stream)
+        for name, ms in self.phases:
+            print(f"[startup] phase  {name:<28} {ms:8.1f} ms", file=stream)
+        stream.flush()
+
+
+# 全域追蹤器，於 app.py 最先匯入
+startup_tracer = StartupTracer()
@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+import time
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from assets.EventLog import event_log
+
+
+def monitor_identities(monitors):
+    """每台顯示器的穩定識別字串（裝置介面名稱，沒有時使用型號描述）
+
+    相同識別的顯示器（例如兩台同型號且沒有裝置名稱）依出現順序加上 #2、#3。
+    """
+    identities = []
+    counts = {}
+    for monitor in monitors:
+        identity = monitor.get('device_id') or str(monitor.get('description', ''))
+        counts[identity] = counts.get(identity, 0) + 1
+        identities.append(identity if counts[identity] == 1 else f'{identity}#{counts[identity]}')
+    return identities
+
+
+class StateSnapshot:
+    """以顯示器識別保存最後已知的VCP狀態，下次啟動時不需讀取DDC即可使用
+
+    檔案格式為 {識別: {"0x10": 值, ...}}；未連接的顯示器的紀錄會保留。
+    """
+
+    DEFAULT_FILE = 'vcp_state.json'
+    SAVE_DELAY_MS = 1000
+
+    def __init__(self, identities, path=DEFAULT_FILE):
+        self.identities = identities
+        self.path = path
+        self.entries = {}
+        self._states = None
+        self._save_timer = None
+
+    def load(self):
+        """讀取快照，返回每台顯示器的 {VCP代碼: 值}（沒有紀錄的顯示器為None）"""
+        try:
+            with open(self.path, encoding='utf-8') as snapshot_file:
+                data = json.load(snapshot_file)
+            self.entries = {
+                identity: {int(code, 0): int(value) for code, value in values.items()}
+                for identity, values in data.items()
+            }
+        except FileNotFoundError:
+            self.entries = {}
+        except (OSError, ValueError, AttributeError, TypeError) as e:
+            event_log.record('snapshot_load', error=repr(e))
+            self.entries = {}
+        return [self.entries.get(identity) for identity in self.identities]
+
+    def save_later(self, states):
+        """排程保存（防抖處理），states 為每台顯示器的 {VCP代碼: 值}"""
+        self._states = states
+        if self._save_timer is None:
+            self._save_timer = QTimer()
+            self._save_timer.setSingleShot(True)
+            self._save_timer.timeout.connect(self.flush)
+
+        self._save_timer.start(self.SAVE_DELAY_MS)
+
+    def flush(self):
+        """立即寫入排程中的保存"""
+        if self._save_timer is not None:
+            self._save_timer.stop()
+        if self._states is None:
+            return
+        for identity, values in zip(self.identities, self._states):
+            if values:
+                self.entries[identity] = dict(values)
+        self._states = None
+
+        data = {identity: {f'0x{code:02X}': value for code, value in sorted(values.items())}
+                for identity, values in self.entries.items()}
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as snapshot_file:
+                json.dump(data, snapshot_file, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            event_log.record('snapshot_save', error=repr(e))
+
+
+class SnapshotVerifier(QObject):
+    """在背景讀取實際VCP值，與快照載入的狀態不同時通知主線程修正"""
+
+    # 信號參數：顯示器索引, VCP代碼, 實際值, 讀取開始時間（與 DriftPoller 相同）
+    mismatch = pyqtSignal(int, int, int, float)
+    # 信號參數：顯示器索引, VCP代碼, 顯示器回報的最大值
+    maximum = pyqtSignal(int, int, int)
+
+    def __init__(self, bus, parent=None):
+        super().__init__(parent)
+        self.bus = bus  # BusScheduler 的背景等級 BusClient
+
+    def start(self, states):
+        """開始驗證 states（{顯示器索引: {VCP代碼: 值}}，在主線程複製），每台顯示器一條線程"""
+        for monitor_idx, values in states.items():
+            threading.Thread(target=self._run, args=(monitor_idx, dict(values)),
+                             name=f'SnapshotVerifier-{monitor_idx}', daemon=True).start()
+
+    def _run(self, monitor_idx, values):
+        started = time.perf_counter()
+        mismatched = 0
+        for vcp_code, value in values.items():
+            read_started = time.perf_counter()
+            try:
+                result = self.bus.get_vcp_feature(monitor_idx, vcp_code)
+            except Exception as e:
+                event_log.record('snapshot_verify', monitor_idx, vcp_code, error=repr(e))
+                continue
+            if result is None:
+                continue
+            self.maximum.emit(monitor_idx, vcp_code, result['max'])
+            if result['current'] != value:
+                mismatched += 1
+                self.mismatch.emit(monitor_idx, vcp_code, result['current'], read_started)
+        event_log.record('snapshot_verify', monitor_idx,
+                         duration_ms=(time.perf_counter() - started) * 1000,
+                         detail=f'{mismatched} mismatched' if mismatched else None)
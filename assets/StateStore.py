@@ -0,0 +1,101 @@
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+
+class MonitorState(dict):
+    """單一顯示器的VCP狀態 {VCP代碼: 值}，值改變時通知 StateStore"""
+
+    def __init__(self, store, monitor_idx, values=()):
+        super().__init__(values)
+        self._store = store
+        self.monitor_idx = monitor_idx
+
+    def __setitem__(self, vcp_code, value):
+        if vcp_code in self and self[vcp_code] == value:
+            return
+        super().__setitem__(vcp_code, value)
+        self._store._record(self.monitor_idx, vcp_code)
+
+    def __delitem__(self, vcp_code):
+        super().__delitem__(vcp_code)
+        self._store._record(self.monitor_idx, vcp_code)
+
+    def update(self, *args, **kwargs):
+        for vcp_code, value in dict(*args, **kwargs).items():
+            self[vcp_code] = value
+
+    def setdefault(self, vcp_code, value=None):
+        if vcp_code not in self:
+            self[vcp_code] = value
+        return self[vcp_code]
+
+
+class PresetState(list):
+    """每台顯示器目前的預設編號，改變時通知 StateStore"""
+
+    def __init__(self, store, monitor_count):
+        super().__init__([0] * monitor_count)
+        self._store = store
+
+    def __setitem__(self, monitor_idx, preset_id):
+        if self[monitor_idx] == preset_id:
+            return
+        super().__setitem__(monitor_idx, preset_id)
+        self._store._record(monitor_idx, preset=True)
+
+
+class StateStore(QObject):
+    """所有顯示器的狀態 - 記錄變更並在每幀最多發出一次合併的通知
+
+    以索引取得 MonitorState（可當作 dict 使用），presets 為目前的預設編號。
+    只應在主線程寫入。
+    """
+
+    # 信號參數：{顯示器索引: (改變的VCP代碼集合, 預設是否改變)}
+    changed = pyqtSignal(object)
+
+    FRAME_MS = 16
+
+    def __init__(self, monitor_count, parent=None):
+        super().__init__(parent)
+        self.monitors = [MonitorState(self, i) for i in range(monitor_count)]
+        self.presets = PresetState(self, monitor_count)
+        self.flush_count = 0
+        self._pending = {}
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self.flush)
+
+    def __getitem__(self, monitor_idx):
+        return self.monitors[monitor_idx]
+
+    def __len__(self):
+        return len(self.monitors)
+
+    def __iter__(self):
+        return iter(self.monitors)
+
+    def load(self, monitor_idx, values):
+        """以讀取到的值取代顯示器的狀態"""
+        state = self.monitors[monitor_idx]
+        for vcp_code in [code for code in state if code not in values]:
+            del state[vcp_code]
+        state.update(values)
+
+    def _record(self, monitor_idx, vcp_code=None, preset=False):
+        """記錄一筆變更，並在下一幀發出通知"""
+        codes, preset_changed = self._pending.get(monitor_idx, (set(), False))
+        if vcp_code is not None:
+            codes.add(vcp_code)
+        self._pending[monitor_idx] = (codes, preset_changed or preset)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start(self.FRAME_MS)
+
+    def flush(self):
+        """立即發出累積的變更"""
+        self._flush_timer.stop()
+        if not self._pending:
+            return
+        changes, self._pending = self._pending, {}
+        self.flush_count += 1
+        self.changed.emit(changes)
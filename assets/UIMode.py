@@ -6,6 +6,8 @@ class UIMode:
 
     def __init__(self, window):
         self.window = window
+        self.prewarmed = False  # 隱藏時已預先排好收縮模式的佈局
+        self.window_height = None  # 未加上動態控制項時的窗口高度
         self._init_ui_elements()
         self._hide_initial_panels()
 
@@ -26,6 +28,10 @@ class UIMode:
             self.window.g_label, self.window.b_label
         ]
 
+    def add_expanded_elements(self, *elements):
+        """加入只在展開模式顯示的控制項"""
+        self.additional_sliders.extend(elements)
+
     def _hide_initial_panels(self):
         """初始化時隱藏所有面板"""
         self.button_panel.hide()
@@ -33,12 +39,28 @@ class UIMode:
 
     def hide_all_panels(self):
         """隱藏所有面板並強制處理事件"""
+        self.prewarmed = False
         self.button_panel.hide()
         self.slider_panel.hide()
         QApplication.processEvents()  # 強制立即處理隱藏事件
 
+    def prepare_collapsed(self):
+        """預熱模式：窗口隱藏後立即排好收縮模式佈局，下次顯示只需移動"""
+        self.button_panel.hide()
+        self._hide_additional_elements()
+        self.slider_panel.show()
+        self.slider_panel.resize(210, 45)
+        self.window.ensurePolished()
+        self.prewarmed = True
+
     def set_collapsed(self):
         """設置收縮模式 - 只顯示亮度滑條"""
+        if self.prewarmed:
+            # 佈局已預先完成，只需移動到目前螢幕
+            self.window.move(self.window.x_default, self.window.y_default)
+            self._update_window_state(expanded=False, compact=False)
+            return
+
         # 隱藏按鈕面板
         self.button_panel.hide()
 
@@ -53,25 +75,30 @@ class UIMode:
         # 更新窗口狀態
         self._update_window_state(expanded=False, compact=False)
 
-    def set_expanded(self):
-        """設置展開模式 - 顯示所有控制項"""
+    def set_expanded(self, extra_height=0):
+        """設置展開模式 - 顯示所有控制項（extra_height 為動態VCP控制項所需的高度）"""
+        self.prewarmed = False
         # 顯示所有UI元素
         self.button_panel.show()
         self._show_additional_elements()
         self.slider_panel.show()
 
         # 調整窗口大小和位置
-        self.slider_panel.resize(210, 165)
-        self.window.move(self.window.x_default, self.window.y_default - 120)
+        self._resize_window(extra_height)
+        self.slider_panel.resize(210, 195 + extra_height)
+        self.window.move(self.window.x_default,
+                         self.window.y_default - 150 - extra_height)
 
         # 更新窗口狀態
         self._update_window_state(expanded=True, compact=False)
 
     def set_compact(self):
         """設置快捷模式 - 只顯示預設按鈕"""
+        self.prewarmed = False
         # 隱藏滑條面板，只顯示按鈕面板
         self.slider_panel.hide()
         self.button_panel.show()
+        self._resize_window(0)
 
         # 調整窗口位置
         self.window.move(self.window.x_default, self.window.y_default + 49)
@@ -83,12 +110,21 @@ class UIMode:
         """隱藏額外的滑條和標籤"""
         for element in self.additional_sliders + self.additional_labels:
             element.hide()
+        self._resize_window(0)
 
     def _show_additional_elements(self):
         """顯示額外的滑條和標籤"""
         for element in self.additional_sliders + self.additional_labels:
             element.show()
 
+    def _resize_window(self, extra_height):
+        """依動態VCP控制項調整窗口高度（收縮與快捷模式恢復原高度）"""
+        if self.window_height is None:
+            self.window_height = self.window.height()
+        height = self.window_height + extra_height
+        if self.window.height() != height:
+            self.window.resize(self.window.width(), height)
+
     def _update_window_state(self, expanded, compact):
         """更新窗口內部狀態"""
         self.window.is_expanded = expanded
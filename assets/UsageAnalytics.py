@@ -0,0 +1,170 @@
+import csv
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+from assets.EventLog import event_log
+
+BRIGHTNESS = 0x10
+
+LEVELS = 101      # 亮度直方圖的格數（感知亮度 0~100）
+DAYS_KEPT = 90    # 每台顯示器保留的每日統計天數
+MAX_PENDING = 4096
+CHECKPOINT_SECONDS = 300  # 建議的 checkpoint 間隔
+# 兩次累計相隔超過此時間視為系統睡眠或程式暫停，該段不計入
+MAX_GAP = CHECKPOINT_SECONDS * 2
+
+
+class _MonitorUsage:
+    """單一顯示器的累計統計與目前狀態"""
+
+    def __init__(self, data=None):
+        data = data or {}
+        histogram = data.get('histogram', [])
+        self.histogram = [float(x) for x in histogram[:LEVELS]]
+        self.histogram += [0.0] * (LEVELS - len(self.histogram))
+        # 日期 -> {'seconds': 亮度已知的秒數, 'brightness_seconds': 亮度×秒, 'presets': {預設: 秒}}
+        self.days = dict(data.get('days', {}))
+        self.brightness = None
+        self.preset = None
+        self.since = None
+
+    def to_dict(self):
+        return {'histogram': [round(x, 1) for x in self.histogram],
+                'days': self.days}
+
+
+def _day_chunks(start, end):
+    """將 [start, end) 依本地日期切開，返回 [(日期字串, 秒數)]"""
+    chunks = []
+    while start < end:
+        moment = datetime.fromtimestamp(start)
+        midnight = datetime.combine(moment.date() + timedelta(days=1), datetime.min.time())
+        chunk_end = min(end, midnight.timestamp())
+        chunks.append((moment.date().isoformat(), chunk_end - start))
+        start = chunk_end
+    return chunks
+
+
+class UsageAnalytics:
+    """亮度與預設使用統計 - 由變更串流增量計算時間加權的直方圖與每日統計
+
+    record/record_preset 只把事件放入佇列（任何線程皆可呼叫、不會阻塞），
+    彙總在 checkpoint 時於主線程進行（應每 CHECKPOINT_SECONDS 呼叫一次）。
+    以顯示器識別保存，大小固定：每台顯示器一個 101 格的直方圖與最多
+    DAYS_KEPT 天的每日統計。亮度以 to_level(顯示器索引, VCP值) 換算的感知亮度
+    記錄，與顯示器回報的VCP最大值無關。
+    """
+
+    DEFAULT_FILE = 'usage_stats.json'
+
+    def __init__(self, identities, to_level=None, path=DEFAULT_FILE):
+        self.identities = identities
+        self.to_level = to_level or (lambda monitor_idx, value: value)
+        self.path = path
+        self._pending = deque(maxlen=MAX_PENDING)
+        self.usage = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as stats_file:
+                data = json.load(stats_file)
+            self.usage = {identity: _MonitorUsage(values) for identity, values in data.items()}
+        except FileNotFoundError:
+            self.usage = {}
+        except (OSError, ValueError, AttributeError, TypeError) as e:
+            event_log.record('usage_load', error=repr(e))
+            self.usage = {}
+
+    def record(self, monitor_idx, vcp_code, value, at=None):
+        """記錄一筆已套用的VCP值（非亮度的代碼直接略過，亮度換算為感知亮度）"""
+        if vcp_code == BRIGHTNESS:
+            level = self.to_level(monitor_idx, value)
+            self._pending.append((time.time() if at is None else at, monitor_idx, 'brightness', level))
+
+    def record_preset(self, monitor_idx, preset_id, at=None):
+        """記錄顯示器目前的預設"""
+        self._pending.append((time.time() if at is None else at, monitor_idx, 'preset', preset_id))
+
+    def checkpoint(self, now=None):
+        """彙總佇列中的事件，並把進行中的區間累計到 now"""
+        now = time.time() if now is None else now
+        while self._pending:
+            at, monitor_idx, kind, value = self._pending.popleft()
+            usage = self._monitor(monitor_idx)
+            if usage is None:
+                continue
+            self._accumulate(usage, at)
+            if kind == 'brightness':
+                usage.brightness = max(0, min(LEVELS - 1, value))
+            else:
+                usage.preset = value
+        for usage in self.usage.values():
+            self._accumulate(usage, now)
+
+    def _monitor(self, monitor_idx):
+        if monitor_idx >= len(self.identities):
+            return None
+        return self.usage.setdefault(self.identities[monitor_idx], _MonitorUsage())
+
+    def _accumulate(self, usage, until):
+        """將上次事件到 until 的時間計入目前亮度與預設"""
+        if usage.since is not None and usage.since < until <= usage.since + MAX_GAP:
+            for day, seconds in _day_chunks(usage.since, until):
+                rollup = usage.days.setdefault(
+                    day, {'seconds': 0.0, 'brightness_seconds': 0.0, 'presets': {}})
+                if usage.brightness is not None:
+                    usage.histogram[usage.brightness] += seconds
+                    rollup['seconds'] += seconds
+                    rollup['brightness_seconds'] += usage.brightness * seconds
+                if usage.preset is not None:
+                    key = str(usage.preset)
+                    rollup['presets'][key] = rollup['presets'].get(key, 0.0) + seconds
+            for day in sorted(usage.days)[:-DAYS_KEPT]:
+                del usage.days[day]
+        if usage.since is None or until > usage.since:
+            usage.since = until
+
+    def save(self):
+        """彙總後寫入檔案"""
+        self.checkpoint()
+        data = {identity: usage.to_dict() for identity, usage in self.usage.items()}
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as stats_file:
+                json.dump(data, stats_file, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            event_log.record('usage_save', error=repr(e))
+
+    def export_csv(self, path='usage_daily.csv'):
+        """輸出每日統計（時數、平均亮度、各預設時數）與亮度直方圖，返回兩個檔案路徑"""
+        self.checkpoint()
+        presets = sorted({preset for usage in self.usage.values()
+                          for rollup in usage.days.values() for preset in rollup['presets']})
+        with open(path, 'w', encoding='utf-8', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(['monitor', 'date', 'hours', 'average_brightness']
+                            + [f'preset_{preset}_hours' for preset in presets])
+            for identity, usage in self.usage.items():
+                for day, rollup in sorted(usage.days.items()):
+                    seconds = rollup['seconds']
+                    average = rollup['brightness_seconds'] / seconds if seconds else ''
+                    writer.writerow(
+                        [identity, day, round(seconds / 3600, 3),
+                         round(average, 1) if seconds else average]
+                        + [round(rollup['presets'].get(preset, 0.0) / 3600, 3)
+                           for preset in presets])
+
+        levels_path = os.path.splitext(path)[0] + '_levels.csv'
+        with open(levels_path, 'w', encoding='utf-8', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(['monitor', 'brightness', 'hours'])
+            for identity, usage in self.usage.items():
+                for level, seconds in enumerate(usage.histogram):
+                    if seconds:
+                        writer.writerow([identity, level, round(seconds / 3600, 3)])
+        return path, levels_path
@@ -0,0 +1,252 @@
+from collections import namedtuple
+
+from PyQt6.QtCore import QObject, QRect, Qt, pyqtSignal
+from PyQt6.QtWidgets import QComboBox, QLabel, QPushButton
+
+from assets.BusScheduler import BACKGROUND
+from assets.DDCCI import INPUT_CODE, INPUT_SOURCE, VCP_CODES
+from UI_files.UI import ClickableSlider
+
+# 控制項類型
+CONTINUOUS = 'continuous'  # 滑條（0 ~ 顯示器回報的最大值）
+TOGGLE = 'toggle'          # 兩個可選值的開關
+LIST = 'list'              # 多個可選值的下拉清單
+
+ROW_HEIGHT = 30
+MAXIMUM_READ_TIMEOUT = 2.0  # 讀取滑條最大值的背景請求期限（秒）
+
+# icon: 左側圖示, maximum: 連續值的預設最大值, options: ((值, 名稱), ...)
+ControlSpec = namedtuple('ControlSpec', 'icon kind maximum options')
+
+# 依能力動態建立的控制項（亮度、對比與RGB增益由 Ui_Form 的固定滑條控制）
+# 顯示器的能力字串列出可選值時，以實際的可選值取代此處的類型與選項
+CONTROL_SPECS = {
+    0xF0: ControlSpec('🌙', TOGGLE, 1, ((0x00, "關"), (0x01, "開"))),
+    0xEC: ControlSpec('🎯', LIST, 6, ((0x00, "關閉"), (0x05, "紅點"), (0x06, "綠點"))),
+    0xEF: ControlSpec('🌑', CONTINUOUS, 20, ()),
+    INPUT_CODE: ControlSpec('📺', LIST, None, tuple(INPUT_SOURCE.items())),
+}
+
+
+def resolve_spec(vcp_code, capability_values=()):
+    """VCP代碼的控制項規格，沒有規格時返回None
+
+    能力字串列出可選值時：兩個值為開關，其餘為清單，選項名稱沿用 CONTROL_SPECS。
+    """
+    spec = CONTROL_SPECS.get(vcp_code)
+    if spec is None or not capability_values:
+        return spec
+    names = dict(spec.options)
+    options = tuple((value, names.get(value, f'{value:02X}')) for value in capability_values)
+    kind = TOGGLE if len(options) == 2 else LIST
+    return spec._replace(kind=kind, maximum=max(capability_values), options=options)
+
+
+class _ControlRow:
+    """一列控制項：圖示 + 滑條/開關/清單（滑條另有數值標籤）"""
+
+    def __init__(self, vcp_code, spec, parent, on_change):
+        self.vcp_code = vcp_code
+        self.spec = spec
+        self.value_label = None
+
+        self.icon = QLabel(spec.icon, parent=parent)
+        self.icon.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.icon.setToolTip(VCP_CODES.get(vcp_code, "Input Source"))
+
+        if spec.kind == CONTINUOUS:
+            self.control = ClickableSlider(parent=parent)
+            self.control.setOrientation(Qt.Orientation.Horizontal)
+            self.control.setRange(0, spec.maximum)
+            self.value_label = QLabel(parent=parent)
+            self.value_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.control.valueChanged.connect(
+                lambda value: self._on_slider_changed(value, on_change))
+        elif spec.kind == TOGGLE:
+            self.control = QPushButton(parent=parent)
+            self.control.setCheckable(True)
+            self.control.toggled.connect(
+                lambda checked: self._on_toggled(checked, on_change))
+        else:
+            self.control = QComboBox(parent=parent)
+            for value, name in spec.options:
+                self.control.addItem(name, value)
+            self.control.currentIndexChanged.connect(
+                lambda index: on_change(vcp_code, self.control.itemData(index)))
+
+    def _on_slider_changed(self, value, on_change):
+        self.value_label.setText(str(value))
+        on_change(self.vcp_code, value)
+
+    def _on_toggled(self, checked, on_change):
+        value, name = self.spec.options[int(checked)]
+        self.control.setText(name)
+        on_change(self.vcp_code, value)
+
+    def widgets(self):
+        return [widget for widget in (self.icon, self.control, self.value_label)
+                if widget is not None]
+
+    def place(self, y):
+        self.icon.setGeometry(QRect(11, y, 25, 25))
+        if self.value_label is None:
+            self.control.setGeometry(QRect(53, y, 143, 25))
+        else:
+            self.control.setGeometry(QRect(53, y, 110, 25))
+            self.value_label.setGeometry(QRect(175, y + 5, 21, 16))
+
+    def set_visible(self, visible):
+        for widget in self.widgets():
+            widget.setVisible(visible)
+
+    def is_dragging(self):
+        return self.spec.kind == CONTINUOUS and self.control.isSliderDown()
+
+    def set_maximum(self, maximum):
+        self.control.blockSignals(True)
+        self.control.setMaximum(maximum)
+        self.control.blockSignals(False)
+
+    def show_value(self, value):
+        """更新顯示（不觸發變更）"""
+        self.control.blockSignals(True)
+        if self.spec.kind == CONTINUOUS:
+            self.control.setValue(value)
+            self.value_label.setText(str(self.control.value()))
+        elif self.spec.kind == TOGGLE:
+            checked = value == self.spec.options[1][0]
+            self.control.setChecked(checked)
+            self.control.setText(self.spec.options[int(checked)][1])
+        else:
+            index = self.control.findData(value)
+            if index < 0:
+                # 能力字串沒有列出的值（例如由OSD設定）也要能顯示
+                self.control.addItem(f'{value:02X}', value)
+                index = self.control.count() - 1
+            self.control.setCurrentIndex(index)
+        self.control.blockSignals(False)
+
+    def apply_value(self, value):
+        """如同使用者操作般設定值（觸發變更）"""
+        if self.spec.kind == CONTINUOUS:
+            self.control.setValue(value)
+        elif self.spec.kind == TOGGLE:
+            self.control.setChecked(value == self.spec.options[1][0])
+        else:
+            index = self.control.findData(value)
+            if index >= 0:
+                self.control.setCurrentIndex(index)
+
+
+class VCPControlPanel(QObject):
+    """展開面板底部依顯示器能力建立的VCP控制項
+
+    只為目前顯示器支援（狀態中有值）且在 CONTROL_SPECS 中的代碼建立控制項，
+    控制項在首次需要時才建立並在之後重複使用；切換顯示器時只重新排列與顯示。
+    尚未讀取能力字串的顯示器（例如由快照啟動）先使用 CONTROL_SPECS，並以背景
+    等級讀取能力字串，讀到可選值後送出 capabilities_changed 以重新建立控制項。
+    連續值滑條的最大值同樣以背景等級讀取，讀到前使用規格的預設值。
+    """
+
+    # 信號參數：VCP代碼, 值（使用者操作）
+    value_changed = pyqtSignal(int, int)
+    # 信號參數：顯示器索引（能力字串的可選值已讀取，需要重新呼叫 show_for）
+    capabilities_changed = pyqtSignal(int)
+    # 信號參數：顯示器索引, VCP代碼, 最大值（由匯流排執行線程送出）
+    _maximum_read = pyqtSignal(int, int, int)
+    # 信號參數：顯示器索引（由匯流排執行線程送出）
+    _capabilities_read = pyqtSignal(int)
+
+    def __init__(self, container, top, bus, parent=None):
+        super().__init__(parent)
+        self.container = container
+        self.top = top
+        self.bus = bus  # BusScheduler
+        self.rows = {}      # (VCP代碼, 規格) -> _ControlRow
+        self.visible = {}   # VCP代碼 -> 目前顯示的 _ControlRow
+        self.maximums = {}  # (顯示器索引, VCP代碼) -> 最大值（None 表示讀取中）
+        self.monitor_idx = None
+        self.values = {}
+        self._capability_requests = set()  # 已排入能力查詢的顯示器
+        self._maximum_read.connect(self._on_maximum_read)
+        self._capabilities_read.connect(self._on_capabilities_read)
+
+    def show_for(self, monitor_idx, values):
+        """顯示 monitor_idx 支援的控制項並載入 values，返回需要的額外高度"""
+        self.monitor_idx = monitor_idx
+        self.values = values
+        capability_values = self._capability_values(monitor_idx)
+        shown = {}
+        for vcp_code in CONTROL_SPECS:
+            if vcp_code not in values:
+                continue
+            spec = resolve_spec(vcp_code, capability_values.get(vcp_code, ()))
+            row = self._row(vcp_code, spec)
+            row.place(self.top + len(shown) * ROW_HEIGHT)
+            if spec.kind == CONTINUOUS:
+                row.set_maximum(self._maximum(monitor_idx, vcp_code, spec.maximum))
+            row.show_value(values[vcp_code])
+            shown[vcp_code] = row
+
+        for row in self.rows.values():
+            row.set_visible(row in shown.values())
+        self.visible = shown
+        return len(shown) * ROW_HEIGHT
+
+    def update(self, codes, values):
+        """狀態變更：更新目前顯示且改變的控制項（使用者正在拖曳的滑條不更新）"""
+        for vcp_code in codes & self.visible.keys():
+            row = self.visible[vcp_code]
+            if not row.is_dragging():
+                row.show_value(values[vcp_code])
+
+    def set_value(self, vcp_code, value):
+        """以控制項設定值（用於重播），目前沒有顯示該代碼時返回False"""
+        row = self.visible.get(vcp_code)
+        if row is None:
+            return False
+        row.apply_value(value)
+        return True
+
+    def _row(self, vcp_code, spec):
+        key = (vcp_code, spec)
+        if key not in self.rows:
+            self.rows[key] = _ControlRow(vcp_code, spec, self.container, self.value_changed.emit)
+        return self.rows[key]
+
+    def _capability_values(self, monitor_idx):
+        """已快取的能力字串可選值，尚未讀取時排入背景讀取並返回空 dict"""
+        capability_values = self.bus.controller.get_capability_values(monitor_idx)
+        if not capability_values and monitor_idx not in self._capability_requests:
+            self._capability_requests.add(monitor_idx)
+            request = self.bus.supported_codes(monitor_idx, BACKGROUND)
+            request.add_done_callback(lambda done: self._capabilities_read.emit(monitor_idx))
+        return capability_values
+
+    def _on_capabilities_read(self, monitor_idx):
+        if self.bus.controller.get_capability_values(monitor_idx):
+            self.capabilities_changed.emit(monitor_idx)
+
+    def _maximum(self, monitor_idx, vcp_code, default):
+        """顯示器回報的最大值，尚未讀取時排入背景讀取並返回預設值"""
+        key = (monitor_idx, vcp_code)
+        if key not in self.maximums:
+            self.maximums[key] = None
+            request = self.bus.get(monitor_idx, vcp_code, BACKGROUND, MAXIMUM_READ_TIMEOUT)
+            request.add_done_callback(
+                lambda done: self._emit_maximum(monitor_idx, vcp_code, done.result()))
+        return self.maximums[key] or default
+
+    def _emit_maximum(self, monitor_idx, vcp_code, result):
+        self._maximum_read.emit(monitor_idx, vcp_code, result['max'] if result else 0)
+
+    def _on_maximum_read(self, monitor_idx, vcp_code, maximum):
+        if maximum <= 0:
+            # 讀取失敗或逾時，下次顯示時再試
+            self.maximums.pop((monitor_idx, vcp_code), None)
+            return
+        self.maximums[(monitor_idx, vcp_code)] = maximum
+        row = self.visible.get(vcp_code)
+        if monitor_idx == self.monitor_idx and row is not None and row.spec.kind == CONTINUOUS:
+            row.set_maximum(maximum)
+            row.show_value(self.values.get(vcp_code, 0))
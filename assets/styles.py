@@ -7,6 +7,9 @@
 class StyleSheets:
     """樣式表管理類"""
 
+    # 預設按鈕的選取狀態以動態屬性切換，由主樣式表統一匹配
+    SELECTED_PROPERTY = 'selected'
+
     @staticmethod
     def get_main_stylesheet():
         """獲取主要樣式表"""
@@ -52,7 +55,44 @@ class StyleSheets:
                 width: 2px;
                 margin: -6px 0;
             }
-
+            QPushButton[selected="false"] {
+                background-color: rgba(100, 100, 100, 220);
+                border: none;
+                border-radius: 7px;
+                font-size: 14px;
+            }
+            QPushButton[selected="false"]:hover {
+                background-color: rgba(150, 150, 150, 220);
+            }
+            QPushButton[selected="true"] {
+                background-color: rgba(100, 150, 255, 150);
+                border: 2px solid #4A90E2;
+                border-radius: 7px;
+                font-size: 14px;
+                font-weight: bold;
+            }
+            QPushButton[selected="true"]:hover {
+                background-color: rgba(120, 170, 255, 220);
+            }
+            QPushButton[checkable="true"] {
+                background-color: rgba(100, 100, 100, 220);
+            }
+            QPushButton[checkable="true"]:checked {
+                background-color: rgba(100, 150, 255, 150);
+                border: 2px solid #4A90E2;
+            }
+            QComboBox {
+                background-color: rgba(100, 100, 100, 220);
+                color: white;
+                border: none;
+                border-radius: 7px;
+                padding-left: 8px;
+            }
+            QComboBox QAbstractItemView {
+                background-color: rgba(50, 50, 50, 240);
+                color: white;
+                selection-background-color: #3daee9;
+            }
 
             """
         # """
@@ -74,7 +114,7 @@ class StyleSheets:
 
     @staticmethod
     def get_selected_button_style():
-        """獲取選中按鈕樣式"""
+        """獲取選中按鈕樣式（舊版逐按鈕樣式，主樣式表已以 selected 屬性涵蓋）"""
         return """
             QPushButton {
                 background-color: rgba(100, 150, 255, 150);
@@ -90,7 +130,7 @@ class StyleSheets:
 
     @staticmethod
     def get_normal_button_style():
-        """獲取普通按鈕樣式"""
+        """獲取普通按鈕樣式（舊版逐按鈕樣式，主樣式表已以 selected 屬性涵蓋）"""
         return """
             QPushButton {
                 background-color: rgba(100, 100, 100, 220);
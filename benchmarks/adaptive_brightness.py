@@ -0,0 +1,170 @@
+"""
+內容自適應亮度的行為檢查（offscreen + 模擬顯示器）
+
+啟用 adaptive_brightness 建立 MyWindow，以合成畫面取代 frame_source 並逐次
+呼叫取樣，記錄匯流排實際套用的亮度寫入並檢查：
+    1. 暗畫面（深色 IDE）連續出現後只寫入一次，亮度接近 dark_level
+    2. 變化小於 HYSTERESIS 的畫面不寫入
+    3. 切換視窗時短暫出現的亮畫面不寫入
+    4. 亮畫面（白底文件）連續出現後只寫入一次，亮度接近 bright_level
+    5. 手動調整亮度後暫停，暫停結束後才再依畫面寫入
+
+執行方式：python -m benchmarks.adaptive_brightness
+發現不一致時以非零狀態結束。
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from assets.AdaptiveBrightness import (  # noqa: E402
+    HYSTERESIS, SAMPLE_HEIGHT, SAMPLE_WIDTH, STABLE_SAMPLES)
+from assets.DDCCI import BACKEND_ENV, create_controller  # noqa: E402
+from assets.SoftwareDimming import BRIGHTNESS  # noqa: E402
+
+CONFIG_TEXT = """\
+[settings]
+drift_poll = false
+warm_start = false
+usage_analytics = false
+adaptive_brightness = true
+adaptive_brightness_range = 70, 40
+
+[hotkeys]
+backend = hook
+
+[ddc]
+backend = simulated
+sim_monitors = 1
+sim_command_gap_ms = 5
+sim_read_latency_ms = 2
+sim_write_latency_ms = 1
+sim_jitter_ms = 0
+"""
+
+MONITOR = 0
+SAMPLES = STABLE_SAMPLES + 2
+
+
+def _frame(gray):
+    return np.full((SAMPLE_HEIGHT, SAMPLE_WIDTH, 3), gray, dtype=np.uint8)
+
+
+FRAMES = {
+    'dark': _frame(10),       # 深色 IDE
+    'near dark': _frame(50),  # 與 dark 的目標相差不到 HYSTERESIS
+    'bright': _frame(245),    # 白底文件
+}
+
+
+class AdaptiveCheck:
+    """以合成畫面驅動 MyWindow.adaptive_brightness 並記錄不一致"""
+
+    def __init__(self, qt_app, window, controller):
+        self.qt_app = qt_app
+        self.window = window
+        self.adaptive = window.adaptive_brightness
+        self.monitor = controller.simulated_monitors[MONITOR]
+        self.curve = window.brightness_curves[MONITOR]
+        self.frame = None
+        self.writes = []  # 匯流排套用的亮度寫入
+        self.problems = []
+
+        self.adaptive.stop()
+        self.adaptive.frame_source = lambda screen: self.frame
+        window.bus.add_listener(self._on_write)
+
+    def _on_write(self, monitor_idx, vcp_code, value):
+        if monitor_idx == MONITOR and vcp_code == BRIGHTNESS:
+            self.writes.append(value)
+
+    def sample(self, *names):
+        """依序取樣指定的合成畫面，返回這段期間的亮度寫入"""
+        start = len(self.writes)
+        for name in names:
+            self.frame = FRAMES[name]
+            self.adaptive._tick()
+            self.adaptive.stop()  # 由此處逐次取樣，不讓計時器自行觸發
+        self.window.bus.wait_idle()
+        self.qt_app.processEvents()
+        return self.writes[start:]
+
+    def expect_writes(self, name, writes, count):
+        level = self.window._brightness_level(MONITOR)
+        print(f"{name:18s}: writes {writes}  level {level}")
+        if len(writes) != count:
+            self.problems.append(f"{name}: {len(writes)} writes != {count}")
+        if writes and self.monitor.values[BRIGHTNESS][0] != writes[-1]:
+            self.problems.append(f"{name}: hardware {self.monitor.values[BRIGHTNESS][0]}"
+                                 f" != written {writes[-1]}")
+
+    def expect_near(self, name, target):
+        level = self.window._brightness_level(MONITOR)
+        if abs(level - target) >= HYSTERESIS:
+            self.problems.append(f"{name}: level {level} not near {target}")
+
+    def run(self):
+        if self.adaptive is None:
+            self.problems.append("adaptive_brightness = true but not created")
+            return self.problems
+        dark_level, bright_level = self.adaptive.dark_level, self.adaptive.bright_level
+
+        self.expect_writes("dark", self.sample(*['dark'] * SAMPLES), 1)
+        self.expect_near("dark", dark_level)
+
+        self.expect_writes("near dark", self.sample(*['near dark'] * SAMPLES), 0)
+
+        glimpse = ['dark', 'bright', 'dark'] * SAMPLES
+        self.expect_writes("bright glimpse", self.sample(*glimpse), 0)
+
+        self.expect_writes("bright", self.sample(*['bright'] * SAMPLES), 1)
+        self.expect_near("bright", bright_level)
+
+        # 手動調整後暫停
+        self.window._set_brightness_level(80, MONITOR)
+        self.window.bus.wait_idle()
+        self.expect_writes("manual hold", self.sample(*['dark'] * SAMPLES), 0)
+        self.adaptive._hold_until.clear()
+        self.expect_writes("hold expired", self.sample(*['dark'] * SAMPLES), 1)
+        self.expect_near("hold expired", dark_level)
+        return self.problems
+
+
+def main():
+    # 在暫存目錄中執行，避免覆寫使用者的 config.ini 與狀態檔
+    workdir = tempfile.mkdtemp(prefix='vcpanel-adaptive-')
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        with open('config.ini', 'w', encoding='utf-8') as config_file:
+            config_file.write(CONFIG_TEXT)
+        os.environ[BACKEND_ENV] = 'simulated'
+
+        qt_app = QApplication.instance() or QApplication(sys.argv)
+        import app
+
+        controller = create_controller()
+        window = app.MyWindow(controller)
+        problems = AdaptiveCheck(qt_app, window, controller).run()
+        window.bus.close()
+        window.hotkey_manager.cleanup()
+
+        if problems:
+            print(f"\n不一致 {len(problems)} 筆：")
+            for problem in problems:
+                print("  " + problem)
+            return 1
+        print("\n所有情境一致")
+        return 0
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
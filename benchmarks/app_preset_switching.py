@@ -0,0 +1,161 @@
+"""
+依前景程式自動切換預設的行為檢查（offscreen + 模擬顯示器）
+
+以 FakeForegroundSource 取代 SetWinEventHook，將 AppPresetSwitcher 接到
+MyWindow._apply_app_preset，依序模擬前景切換並檢查：
+    1. README 範例的 [app_presets]（含行內註解）解析出的規則，保存設定後註解仍保留
+    2. 切換到有規則的程式時要求的預設，以及模擬顯示器的實際VCP值與目前預設
+    3. 重複聚焦同一程式、防抖時間內 alt-tab 回到原程式都不會要求任何預設
+    4. 切換到沒有規則的程式後再回來會重新套用
+
+執行方式：python -m benchmarks.app_preset_switching
+發現不一致時以非零狀態結束。
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QEventLoop, QTimer  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from assets.AppPresetSwitcher import AppPresetSwitcher, FakeForegroundSource  # noqa: E402
+from assets.DDCCI import BACKEND_ENV, create_controller  # noqa: E402
+
+CONFIG_TEXT = """\
+[settings]
+drift_poll = false
+warm_start = false
+usage_analytics = false
+
+[hotkeys]
+backend = hook
+
+[ddc]
+backend = simulated
+sim_monitors = 2  ; 行內註解也適用於 [ddc]
+sim_command_gap_ms = 5
+sim_read_latency_ms = 2
+sim_write_latency_ms = 1
+sim_jitter_ms = 0
+
+[app_presets]
+code.exe = 2          ; 所有螢幕套用預設2
+game.exe = 0:3, 1:4   ; 螢幕0套用預設3、螢幕1套用預設4
+"""
+
+EXPECTED_RULES = {'code.exe': {0: 2, 1: 2}, 'game.exe': {0: 3, 1: 4}}
+
+# {(顯示器索引, 預設編號): {VCP代碼: 值}}
+PRESETS = {
+    (0, 2): {0x10: 20, 0x12: 30},
+    (1, 2): {0x10: 25, 0x12: 35},
+    (0, 3): {0x10: 80, 0x12: 70},
+    (1, 4): {0x10: 90, 0x12: 60},
+}
+
+DEBOUNCE_MS = 50
+
+# (說明, 依序切換的前景程式, 預期要求的 (顯示器索引, 預設編號))
+SCENARIOS = (
+    ("切換到 code.exe", ('Code.exe',), [(0, 2), (1, 2)]),
+    ("重複聚焦 code.exe", ('code.exe',), []),
+    ("防抖內 alt-tab 回到 code.exe", ('game.exe', 'code.exe'), []),
+    ("沒有規則的程式", ('notepad.exe',), []),
+    ("回到 code.exe", ('code.exe',), [(0, 2), (1, 2)]),
+    ("切換到 game.exe", ('game.exe',), [(0, 3), (1, 4)]),
+)
+
+
+def _spin(ms):
+    """執行事件循環 ms 毫秒（讓防抖計時器觸發）"""
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+def run_checks(window, controller):
+    """執行所有情境，返回不一致的描述"""
+    problems = []
+    preset_manager = window.preset_manager
+
+    rules = preset_manager.get_app_preset_rules(window.screen_count)
+    if rules != EXPECTED_RULES:
+        problems.append(f"rules {rules} != {EXPECTED_RULES}")
+
+    for (monitor_idx, preset_id), values in PRESETS.items():
+        preset_manager.save_preset(monitor_idx, preset_id, values)
+    preset_manager._do_save_config()
+    with open(preset_manager.config_file, encoding='utf-8') as config_file:
+        saved = config_file.read()
+    for line in CONFIG_TEXT.split('[app_presets]\n')[1].splitlines():
+        if line not in saved:
+            problems.append(f"comment lost on save: {line!r}")
+
+    source = FakeForegroundSource()
+    switcher = AppPresetSwitcher(source, rules, window)
+    switcher.DEBOUNCE_MS = DEBOUNCE_MS
+    requested = []
+    switcher.preset_requested.connect(lambda *request: requested.append(request))
+    switcher.preset_requested.connect(window._apply_app_preset)
+
+    for name, apps, expected in SCENARIOS:
+        requested.clear()
+        for app_name in apps:
+            source.activate(app_name)
+        _spin(DEBOUNCE_MS * 3)
+        window.bus.wait_idle()
+
+        if requested != expected:
+            problems.append(f"{name}: requested {requested} != {expected}")
+        for monitor_idx, preset_id in expected:
+            if window.current_preset[monitor_idx] != preset_id:
+                problems.append(f"{name}: monitor {monitor_idx} current preset"
+                                f" {window.current_preset[monitor_idx]} != {preset_id}")
+            monitor = controller.simulated_monitors[monitor_idx]
+            for vcp_code, value in PRESETS[(monitor_idx, preset_id)].items():
+                actual = monitor.values[vcp_code][0]
+                if actual != value:
+                    problems.append(f"{name}: monitor {monitor_idx} 0x{vcp_code:02X}"
+                                    f" hardware {actual} != preset {value}")
+        print(f"{name:28s}: {requested}")
+
+    switcher.stop()
+    return problems
+
+
+def main():
+    # 在暫存目錄中執行，避免覆寫使用者的 config.ini 與狀態檔
+    workdir = tempfile.mkdtemp(prefix='vcpanel-app-presets-')
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        with open('config.ini', 'w', encoding='utf-8') as config_file:
+            config_file.write(CONFIG_TEXT)
+        os.environ[BACKEND_ENV] = 'simulated'
+
+        qt_app = QApplication.instance() or QApplication(sys.argv)  # noqa: F841
+        import app
+
+        controller = create_controller()
+        window = app.MyWindow(controller)
+        problems = run_checks(window, controller)
+        window.bus.close()
+        window.hotkey_manager.cleanup()
+
+        if problems:
+            print(f"\n不一致 {len(problems)} 筆：")
+            for problem in problems:
+                print("  " + problem)
+            return 1
+        print("\n所有情境一致")
+        return 0
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
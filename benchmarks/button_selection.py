@@ -0,0 +1,88 @@
+"""
+預設按鈕選取效果的重繪成本基準測試（offscreen）
+
+比較舊版「每次選取都對四個按鈕 setStyleSheet」與
+新版「以 selected 動態屬性切換並只重新套用兩個按鈕」的耗時。
+
+執行方式：python -m benchmarks.button_selection
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication, QPushButton, QWidget  # noqa: E402
+
+from assets.styles import StyleSheets  # noqa: E402
+
+ROUNDS = 500
+
+
+def _create_panel():
+    """建立與主視窗相同樣式的四按鈕面板"""
+    panel = QWidget()
+    panel.setStyleSheet(StyleSheets.get_main_stylesheet())
+    buttons = []
+    for i in range(4):
+        button = QPushButton(str(i + 1), panel)
+        button.setGeometry(10 + i * 50, 10, 40, 25)
+        button.setProperty(StyleSheets.SELECTED_PROPERTY, False)
+        buttons.append(button)
+    panel.resize(210, 45)
+    panel.show()
+    return panel, buttons
+
+
+def _select_by_stylesheet(buttons, selected):
+    """舊版：重新設定所有按鈕的樣式表"""
+    for i, button in enumerate(buttons, 1):
+        if i == selected:
+            button.setStyleSheet(StyleSheets.get_selected_button_style())
+        else:
+            button.setStyleSheet(StyleSheets.get_normal_button_style())
+
+
+def _select_by_property(buttons, selected, previous):
+    """新版：只切換狀態改變的按鈕屬性並重新套用樣式"""
+    for preset_id in (previous, selected):
+        if preset_id is None:
+            continue
+        button = buttons[preset_id - 1]
+        button.setProperty(StyleSheets.SELECTED_PROPERTY,
+                           preset_id == selected)
+        button.style().unpolish(button)
+        button.style().polish(button)
+
+
+def _measure(app, panel, select):
+    """量測每次選取變更（含重繪）的平均毫秒數"""
+    start = time.perf_counter()
+    for n in range(ROUNDS):
+        select(n % 4 + 1, (n - 1) % 4 + 1 if n else None)
+        panel.repaint()
+        app.processEvents()
+    return (time.perf_counter() - start) * 1000 / ROUNDS
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    panel, buttons = _create_panel()
+    legacy = _measure(app, panel,
+                      lambda selected, _: _select_by_stylesheet(buttons, selected))
+    panel.close()
+
+    panel, buttons = _create_panel()
+    current = _measure(app, panel,
+                       lambda selected, previous: _select_by_property(
+                           buttons, selected, previous))
+    panel.close()
+
+    print(f"setStyleSheet x4 : {legacy:.3f} ms / 次")
+    print(f"selected 屬性   : {current:.3f} ms / 次")
+    print(f"加速比          : {legacy / current:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
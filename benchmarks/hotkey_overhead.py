@@ -0,0 +1,227 @@
+"""
+快捷鍵後端的每次按鍵成本基準測試（合成按鍵事件，不安裝系統鉤子）
+
+keyboard 的鍵盤鉤子對系統上的每一次按鍵都會執行 Python：鉤子線程的
+direct_callback（同步位於系統輸入路徑上）與處理線程的快捷鍵比對。
+此測試以合成的按鍵表與事件註冊本程式的預設快捷鍵，量測「不符合任何快捷鍵」
+的按鍵增加的時間，以及符合時由處理線程送達 Qt 主線程的延遲。
+原生後端（RegisterHotKey）由系統比對按鍵，不符合的按鍵不會執行任何 Python；
+此處以模擬的 user32 與 WM_HOTKEY 訊息檢查其事件過濾器會送達回調
+（Qt 以 windows_generic_MSG 或 windows_dispatcher_MSG 傳入），並檢查無法辨識的後端名稱
+會改用鍵盤鉤子；檢查失敗時以非零狀態結束。
+
+執行方式：python -m benchmarks.hotkey_overhead
+"""
+import ctypes
+import os
+import random
+import string
+import sys
+import threading
+import time
+from ctypes import wintypes
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import keyboard  # noqa: E402
+from PyQt6.QtCore import QObject, pyqtSlot  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from assets.EventLog import event_log  # noqa: E402
+from assets.HotkeyBackends import (NATIVE_EVENT_TYPES, WM_HOTKEY,  # noqa: E402
+                                   KeyboardHookBackend, NativeHotkeyBackend,
+                                   create_hotkey_backend)
+from assets.HotkeyManager import GlobalHotkeyManager  # noqa: E402
+
+EVENTS = 20000
+DELIVERIES = 200
+
+DEFAULT_HOTKEYS = ('alt+a', 'alt+e', ['alt+1', 'alt+2', 'alt+3', 'alt+4'],
+                   'alt+x', 'alt+z')
+
+# 合成按鍵表：名稱 -> 掃描碼
+SCAN_CODES = {'left alt': 56, 'right alt': 100, 'left ctrl': 29, 'right ctrl': 97,
+              'left shift': 42, 'right shift': 54, 'left windows': 125}
+SCAN_CODES.update({c: 16 + i for i, c in enumerate(string.ascii_lowercase)})
+SCAN_CODES.update({str(d): 2 + d for d in range(10)})
+
+
+def _install_synthetic_keyboard():
+    """以合成按鍵表初始化 keyboard，不啟動系統鉤子與監聽線程"""
+    os_keyboard = keyboard._os_keyboard
+
+    def map_name(name):
+        if name in SCAN_CODES:
+            yield SCAN_CODES[name], ()
+
+    os_keyboard.map_name = map_name
+    os_keyboard.init = lambda: None
+    listener = keyboard._listener
+    listener.init()
+    listener.listening = True
+    return listener
+
+
+def _event(event_type, name):
+    return keyboard.KeyboardEvent(event_type, SCAN_CODES[name], name=name)
+
+
+def _process(listener, event):
+    """依序執行鉤子線程與處理線程對單一事件做的工作"""
+    listener.direct_callback(event)
+    if listener.pre_process_event(event):
+        listener.invoke_handlers(event)
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def _measure_keystrokes(listener):
+    """不符合快捷鍵的按鍵（按下與放開）每次的耗時（微秒）"""
+    rng = random.Random(0)
+    names = [rng.choice(string.ascii_lowercase) for _ in range(EVENTS // 2)]
+    durations = []
+    for name in names:
+        for event_type in (keyboard.KEY_DOWN, keyboard.KEY_UP):
+            event = _event(event_type, name)
+            start = time.perf_counter()
+            _process(listener, event)
+            durations.append((time.perf_counter() - start) * 1e6)
+    return durations
+
+
+class _Recorder(QObject):
+    """在主線程記錄快捷鍵送達的延遲"""
+
+    def __init__(self):
+        super().__init__()
+        self.latencies = []
+
+    @pyqtSlot(str, int, float)
+    def record(self, action, arg, pressed_at):
+        self.latencies.append((time.perf_counter() - pressed_at) * 1000)
+
+
+def _measure_delivery(app, listener, manager):
+    """符合的快捷鍵由處理線程送達 Qt 主線程的延遲（毫秒）"""
+    recorder = _Recorder()
+    manager.hotkey_triggered.connect(recorder.record)
+
+    def press_hotkeys():
+        for _ in range(DELIVERIES):
+            for event_type, name in ((keyboard.KEY_DOWN, 'left alt'),
+                                     (keyboard.KEY_DOWN, 'x'),
+                                     (keyboard.KEY_UP, 'x'),
+                                     (keyboard.KEY_UP, 'left alt')):
+                _process(listener, _event(event_type, name))
+            time.sleep(0.002)
+
+    worker = threading.Thread(target=press_hotkeys)
+    worker.start()
+    while worker.is_alive():
+        app.processEvents()
+        time.sleep(0.0005)
+    app.processEvents()
+    return recorder.latencies
+
+
+class _FakeUser32:
+    """模擬 RegisterHotKey / UnregisterHotKey（只記錄註冊）"""
+
+    def __init__(self):
+        self.registered = {}
+
+    def RegisterHotKey(self, hwnd, hotkey_id, modifiers, vk):
+        self.registered[hotkey_id] = (modifiers, vk)
+        return 1
+
+    def UnregisterHotKey(self, hwnd, hotkey_id):
+        return int(self.registered.pop(hotkey_id, None) is not None)
+
+
+def _check_native_dispatch():
+    """以 NULL 視窗的 WM_HOTKEY 線程訊息呼叫原生後端的事件過濾器，返回失敗描述"""
+    user32 = _FakeUser32()
+    backend = NativeHotkeyBackend(user32)
+    fired = []
+    backend.register('alt+x', lambda: fired.append('alt+x'))
+    backend.register('alt+z', lambda: fired.append('alt+z'))
+
+    failures = []
+    for event_type in NATIVE_EVENT_TYPES:
+        fired.clear()
+        msg = wintypes.MSG(hWnd=None, message=WM_HOTKEY, wParam=2)
+        handled, _ = backend.nativeEventFilter(event_type, ctypes.addressof(msg))
+        if not handled or fired != ['alt+z']:
+            failures.append(f"{event_type.decode()}: handled={handled} fired={fired}")
+
+    # 其他訊息與未註冊的ID不處理
+    for message, hotkey_id in ((WM_HOTKEY + 1, 1), (WM_HOTKEY, 99)):
+        msg = wintypes.MSG(hWnd=None, message=message, wParam=hotkey_id)
+        handled, _ = backend.nativeEventFilter(NATIVE_EVENT_TYPES[1], ctypes.addressof(msg))
+        if handled:
+            failures.append(f"message 0x{message:04X} id {hotkey_id} should not be handled")
+
+    backend.unregister_all()
+    if user32.registered:
+        failures.append(f"still registered: {sorted(user32.registered)}")
+    QApplication.instance().removeNativeEventFilter(backend)
+    return failures
+
+
+def _check_backend_names():
+    """無法辨識的後端名稱改用 hook 並記錄事件，返回失敗描述"""
+    failures = []
+    names = ['nativ', 'Hook ']
+    if not hasattr(ctypes, 'windll'):
+        names.append('native')  # 非 Windows 平台沒有 RegisterHotKey
+    for name in names:
+        recorded = len(event_log.events)
+        backend = create_hotkey_backend(name)
+        if not isinstance(backend, KeyboardHookBackend):
+            failures.append(f"backend {name!r}: {type(backend).__name__} instead of hook")
+        expect_event = name.strip().lower() != 'hook'
+        if expect_event != (len(event_log.events) > recorded):
+            failures.append(f"backend {name!r}: event recorded != {expect_event}")
+    return failures
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    native_failures = _check_native_dispatch() + _check_backend_names()
+
+    listener = _install_synthetic_keyboard()
+
+    # 沒有快捷鍵時 keyboard 本身的處理成本（實際上此時不會安裝鉤子）
+    idle = _measure_keystrokes(listener)
+
+    manager = GlobalHotkeyManager(backend='hook')
+    manager.setup_hotkeys(*DEFAULT_HOTKEYS)
+    registered = len(manager.registered_hotkeys)
+    hooked = _measure_keystrokes(listener)
+    delivery = _measure_delivery(app, listener, manager)
+    manager.cleanup()
+
+    def row(label, values, unit):
+        return (f"{label}: 平均 {sum(values) / len(values):.1f} {unit}"
+                f" / p50 {_percentile(values, 50):.1f} / p99 {_percentile(values, 99):.1f}")
+
+    print(f"已註冊快捷鍵 : {registered} 個（hook 後端）")
+    print(row("鉤子基本成本", idle, "µs"))
+    print(row("hook 每鍵    ", hooked, "µs"))
+    print(row("送達主線程  ", delivery, "ms") + f"（{len(delivery)} 次）")
+    print("native 每鍵  : 0 µs（由系統比對，不符合的按鍵不執行 Python）")
+    if native_failures:
+        print("native 事件過濾器與後端選擇檢查失敗：")
+        for failure in native_failures:
+            print("  " + failure)
+        return 1
+    print("native 事件過濾器: WM_HOTKEY 送達（generic 與 dispatcher 訊息）")
+    print("後端選擇      : 無法辨識的名稱改用 hook 並記錄事件")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+喚醒後重新套用狀態的行為檢查（offscreen + 模擬顯示器）
+
+以 SimulatedMonitor.power_cycle 模擬顯示器關機再開機（VCP狀態回到出廠值、
+匯流排在喚醒時間內不回應），由 MyWindow.resume_reapplier 重新套用並檢查：
+    1. 連續的喚醒事件合併為一次執行，執行中的事件在結束後再執行一次
+    2. 第一次執行等到顯示器回應後才寫入，只寫入與出廠值不同的代碼（不寫入輸入來源）
+    3. 之後的執行讀回相同的值，全部略過
+    4. 模擬顯示器的實際VCP值 == vcp_temp
+    5. 喚醒時間超過期限時回報 timeout，顯示器回應後再觸發即可恢復
+
+執行方式：python -m benchmarks.resume_reapply
+發現不一致時以非零狀態結束。
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from assets.DDCCI import BACKEND_ENV, INPUT_CODE, create_controller  # noqa: E402
+from assets.SimulatedDDC import FACTORY_VALUES  # noqa: E402
+
+CONFIG_TEXT = """\
+[settings]
+drift_poll = false
+warm_start = false
+usage_analytics = false
+reapply_on_resume = false
+
+[hotkeys]
+backend = hook
+
+[ddc]
+backend = simulated
+sim_monitors = 2
+sim_command_gap_ms = 5
+sim_read_latency_ms = 2
+sim_write_latency_ms = 1
+sim_jitter_ms = 0
+"""
+
+# 每台顯示器快取的 {VCP代碼: 值}（與出廠值不同）
+CACHED_VALUES = ({0x10: 30, 0x12: 70, 0x16: 40},
+                 {0x10: 80, 0x12: 35, 0x1A: 60})
+
+WAKE_MS = 300
+
+
+def _wait_for(qt_app, results, count, timeout):
+    """處理事件直到收到 count 次 finished 或逾時"""
+    deadline = time.perf_counter() + timeout
+    while len(results) < count and time.perf_counter() < deadline:
+        qt_app.processEvents()
+        time.sleep(0.01)
+    qt_app.processEvents()
+
+
+def _check_hardware(name, window, controller):
+    """模擬顯示器的實際VCP值 == vcp_temp（輸入來源除外）"""
+    problems = []
+    for monitor_idx, monitor in enumerate(controller.simulated_monitors):
+        for vcp_code, value in window.vcp_temp[monitor_idx].items():
+            actual = monitor.values[vcp_code][0]
+            if vcp_code != INPUT_CODE and actual != value:
+                problems.append(f"{name}: monitor {monitor_idx} 0x{vcp_code:02X}"
+                                f" hardware {actual} != vcp_temp {value}")
+    return problems
+
+
+def run_checks(qt_app, window, controller):
+    """執行所有情境，返回不一致的描述"""
+    problems = []
+    reapplier = window.resume_reapplier
+    results = []
+    reapplier.finished.connect(results.append)
+
+    for monitor_idx, values in enumerate(CACHED_VALUES):
+        for vcp_code, value in values.items():
+            window._set_vcp_value(vcp_code, value, monitor_idx)
+    window.bus.wait_idle()
+
+    # 喚醒：兩個事件合併為一次，執行中的事件在結束後再執行一次
+    for monitor in controller.simulated_monitors:
+        monitor.power_cycle(WAKE_MS)
+    reapplier.trigger('resume')
+    reapplier.trigger('display_on')
+    _wait_for(qt_app, results, 2, reapplier.TIMEOUT * 2)
+    if len(results) != 2:
+        problems.append(f"resume: finished {len(results)} times != 2")
+        return problems
+
+    first, second = results
+    for monitor_idx, state in enumerate(window.vcp_temp):
+        expected = sorted(code for code, value in state.items()
+                          if code != INPUT_CODE and FACTORY_VALUES[code][0] != value)
+        result = first[monitor_idx]
+        print(f"resume    monitor {monitor_idx}: {result['status']}"
+              f" ready {result['ready_ms']:.0f} ms, written"
+              f" {[f'0x{code:02X}' for code in result['written']]}")
+        if result['status'] != 'ok':
+            problems.append(f"resume: monitor {monitor_idx} status {result['status']}")
+        if result['ready_ms'] is None or result['ready_ms'] < WAKE_MS * 0.8:
+            problems.append(f"resume: monitor {monitor_idx} wrote before waking"
+                            f" ({result['ready_ms']} ms)")
+        if sorted(result['written']) != expected:
+            problems.append(f"resume: monitor {monitor_idx} written"
+                            f" {result['written']} != {expected}")
+        if second[monitor_idx]['written']:
+            problems.append(f"rerun: monitor {monitor_idx} wrote"
+                            f" {second[monitor_idx]['written']} (should skip all)")
+    problems += _check_hardware('resume', window, controller)
+
+    # 喚醒超過期限：回報 timeout，顯示器回應後再觸發即可恢復
+    results.clear()
+    reapplier.TIMEOUT = WAKE_MS / 1000
+    for monitor in controller.simulated_monitors:
+        monitor.power_cycle(WAKE_MS * 3)
+    reapplier.trigger('resume')
+    _wait_for(qt_app, results, 1, 5)
+    statuses = [result['status'] for result in results[0].values()] if results else []
+    print(f"slow wake : {statuses}")
+    if statuses != ['timeout'] * len(controller.simulated_monitors):
+        problems.append(f"slow wake: statuses {statuses} != timeout")
+
+    time.sleep(WAKE_MS * 3 / 1000)
+    results.clear()
+    reapplier.TIMEOUT = 10.0
+    reapplier.trigger('display_on')
+    _wait_for(qt_app, results, 1, 10)
+    statuses = [result['status'] for result in results[0].values()] if results else []
+    print(f"retry     : {statuses}")
+    if statuses != ['ok'] * len(controller.simulated_monitors):
+        problems.append(f"retry: statuses {statuses} != ok")
+    problems += _check_hardware('retry', window, controller)
+    return problems
+
+
+def main():
+    # 在暫存目錄中執行，避免覆寫使用者的 config.ini 與狀態檔
+    workdir = tempfile.mkdtemp(prefix='vcpanel-reapply-')
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        with open('config.ini', 'w', encoding='utf-8') as config_file:
+            config_file.write(CONFIG_TEXT)
+        os.environ[BACKEND_ENV] = 'simulated'
+
+        qt_app = QApplication.instance() or QApplication(sys.argv)
+        import app
+
+        controller = create_controller()
+        window = app.MyWindow(controller)
+        problems = run_checks(qt_app, window, controller)
+        window.bus.close()
+        window.hotkey_manager.cleanup()
+
+        if problems:
+            print(f"\n不一致 {len(problems)} 筆：")
+            for problem in problems:
+                print("  " + problem)
+            return 1
+        print("\n所有情境一致")
+        return 0
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
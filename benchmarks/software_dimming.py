@@ -0,0 +1,180 @@
+"""
+軟體調光的行為檢查（offscreen + 模擬顯示器）
+
+啟用 software_dimming 建立 MyWindow，以感知亮度調整並檢查：
+    1. 調暗時遮罩立即補足硬體尚未寫入的差距，寫入完成後退回 0
+    2. 0 以下由遮罩調暗，硬體停在最低亮度
+    3. 連續調整時排隊中的寫入被取代，硬體只寫入最後的目標
+    4. 其他途徑寫入亮度（預設等）時取消遮罩並以該值為準
+    5. close() 後不留下遮罩或寫入線程
+
+執行方式：python -m benchmarks.software_dimming
+發現不一致時以非零狀態結束。
+"""
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from assets.DDCCI import BACKEND_ENV, create_controller  # noqa: E402
+from assets.SoftwareDimming import BRIGHTNESS, DIM_LEVELS, MAX_DIM  # noqa: E402
+
+CONFIG_TEXT = """\
+[settings]
+drift_poll = false
+warm_start = false
+usage_analytics = false
+software_dimming = true
+
+[hotkeys]
+backend = hook
+
+[ddc]
+backend = simulated
+sim_monitors = 1
+sim_command_gap_ms = 5
+sim_read_latency_ms = 2
+sim_write_latency_ms = 5
+sim_jitter_ms = 0
+"""
+
+MONITOR = 0
+
+
+class DimmingCheck:
+    """以 MyWindow 的軟體調光路徑操作並記錄不一致"""
+
+    def __init__(self, qt_app, window, controller):
+        self.qt_app = qt_app
+        self.window = window
+        self.dimmer = window.dimmer
+        self.monitor = controller.simulated_monitors[MONITOR]
+        self.curve = window.brightness_curves[MONITOR]
+        self.problems = []
+
+    def settle(self, timeout=5.0):
+        """等待匯流排寫入完成，並處理事件直到寫入完成的信號送達遮罩"""
+        self.window.bus.wait_idle()
+        deadline = time.perf_counter() + timeout
+        self.qt_app.processEvents()
+        while self.dimmer.pending(MONITOR):
+            if time.perf_counter() > deadline:
+                self.problems.append("settle: hardware write never reported")
+                return
+            time.sleep(0.001)
+            self.qt_app.processEvents()
+
+    def expect(self, name, actual, expected):
+        if actual != expected:
+            self.problems.append(f"{name}: {actual!r} != {expected!r}")
+
+    def hardware(self):
+        return self.monitor.values[BRIGHTNESS][0]
+
+    def report(self, name):
+        print(f"{name:14s}: level {self.window._brightness_level(MONITOR):4d}"
+              f"  hardware {self.hardware():3d}"
+              f"  overlay {self.dimmer.opacity(MONITOR):.2f}")
+
+    def run(self):
+        window, dimmer = self.window, self.dimmer
+        if dimmer is None:
+            self.problems.append("software_dimming = true but no dimmer")
+            return self.problems
+
+        # 1. 調暗：寫入完成前遮罩補足差距
+        window._set_brightness_level(30, MONITOR)
+        if dimmer.opacity(MONITOR) <= 0:
+            self.problems.append("dim to 30: overlay not shown before the write")
+        self.settle()
+        self.report("dim to 30")
+        self.expect("dim to 30 hardware", self.hardware(), self.curve.vcp_for(30))
+        self.expect("dim to 30 overlay", dimmer.opacity(MONITOR), 0.0)
+
+        # 2. 0 以下：硬體停在最低亮度，遮罩負責其餘部分
+        window._set_brightness_level(-DIM_LEVELS // 2, MONITOR)
+        self.settle()
+        self.report("below zero")
+        self.expect("below zero hardware", self.hardware(), self.curve.vcp_for(0))
+        self.expect("below zero level", window._brightness_level(MONITOR), -DIM_LEVELS // 2)
+        self.expect("below zero overlay", round(dimmer.opacity(MONITOR), 3),
+                    round(MAX_DIM / 2, 3))
+
+        # 3. 連續調整：排隊中的寫入被取代
+        stats = window.bus.stats()['interactive']
+        replaced, completed = stats['replaced'], stats['completed']
+        steps = list(range(90, 9, -5))
+        for level in steps:
+            window._set_brightness_level(level, MONITOR)
+        self.settle()
+        self.report("burst")
+        stats = window.bus.stats()['interactive']
+        writes = stats['completed'] - completed
+        print(f"{'':14s}  {len(steps)} steps -> {writes} writes"
+              f" ({stats['replaced'] - replaced} replaced)")
+        self.expect("burst hardware", self.hardware(), self.curve.vcp_for(steps[-1]))
+        self.expect("burst overlay", dimmer.opacity(MONITOR), 0.0)
+        if writes >= len(steps):
+            self.problems.append(f"burst: {writes} writes for {len(steps)} steps (not coalesced)")
+
+        # 4. 其他途徑寫入：取消遮罩
+        window._set_brightness_level(-DIM_LEVELS, MONITOR)
+        self.settle()
+        window._set_vcp_value(BRIGHTNESS, 70, MONITOR)
+        self.settle()
+        self.report("preset write")
+        self.expect("preset write hardware", self.hardware(), 70)
+        self.expect("preset write overlay", dimmer.opacity(MONITOR), 0.0)
+        self.expect("preset write level", window._brightness_level(MONITOR),
+                    self.curve.level_for(70))
+
+        # 5. 關閉：不留下遮罩或寫入線程
+        window._set_brightness_level(-DIM_LEVELS, MONITOR)
+        self.settle()
+        dimmer.close()
+        self.expect("close overlays", dimmer._overlays, {})
+        writers = [thread.name for thread in threading.enumerate()
+                   if thread.name.startswith('BrightnessWriter')]
+        self.expect("close writer threads", writers, [])
+        return self.problems
+
+
+def main():
+    # 在暫存目錄中執行，避免覆寫使用者的 config.ini 與狀態檔
+    workdir = tempfile.mkdtemp(prefix='vcpanel-dimming-')
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        with open('config.ini', 'w', encoding='utf-8') as config_file:
+            config_file.write(CONFIG_TEXT)
+        os.environ[BACKEND_ENV] = 'simulated'
+
+        qt_app = QApplication.instance() or QApplication(sys.argv)
+        import app
+
+        controller = create_controller()
+        window = app.MyWindow(controller)
+        problems = DimmingCheck(qt_app, window, controller).run()
+        window.bus.close()
+        window.hotkey_manager.cleanup()
+
+        if problems:
+            print(f"\n不一致 {len(problems)} 筆：")
+            for problem in problems:
+                print("  " + problem)
+            return 1
+        print("\n所有情境一致")
+        return 0
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+混合輸入的壓力與長時間測試（offscreen + 模擬顯示器）
+
+每一輪以亂數交錯執行滑條拖曳、色溫拖曳、快捷鍵信號、
+load_preset_and_show_compact、_auto_hide_ui 與滑鼠離開（保存預設），
+等待匯流排排程器清空後檢查：
+    1. 模擬顯示器的實際VCP值 == vcp_temp
+    2. 目前螢幕的滑條與標籤 == vcp_temp
+    3. 目前預設保存的值 == vcp_temp，且 config.ini 內容與記憶體中的設定相同
+並輸出輸入處理的吞吐量與尾端延遲、匯流排各等級的等待時間，以及每輪結束時的
+Python 記憶體用量（tracemalloc）以觀察長時間執行的記憶體成長；事件紀錄等
+環形緩衝區填滿之前會有少量成長，之後應趨於平坦。
+
+執行方式：python -m benchmarks.stress_soak [--rounds 20] [--inputs 200] [--seed 1]
+發現不一致時以非零狀態結束，並印出可重現的種子與輪次。
+"""
+import argparse
+import gc
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from assets.ColorTemperature import KELVIN_MAX, KELVIN_MIN, KELVIN_STEP  # noqa: E402
+from assets.ConfigFile import read_config  # noqa: E402
+from assets.DDCCI import BACKEND_ENV, create_controller  # noqa: E402
+
+CONFIG_TEXT = """\
+[settings]
+auto_hide_seconds = 1
+drift_poll = true
+warm_start = false
+usage_analytics = true
+
+[hotkeys]
+backend = hook
+
+[ddc]
+backend = simulated
+sim_monitors = {monitors}
+sim_command_gap_ms = 5
+sim_read_latency_ms = 2
+sim_write_latency_ms = 1
+sim_jitter_ms = 1
+sim_seed = {seed}
+"""
+
+INPUT_KINDS = ('slider', 'color_temp', 'hotkey', 'preset', 'hide', 'leave')
+HOTKEYS = (('brightness', 5), ('brightness', -5), ('show', 0), ('compact', 0),
+           ('preset', 1), ('preset', 2), ('preset', 3), ('preset', 4))
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+class StressRun:
+    """在暫存目錄中建立 MyWindow 並執行多輪亂數輸入"""
+
+    def __init__(self, qt_app, window, controller, seed):
+        self.qt_app = qt_app
+        self.window = window
+        self.controller = controller
+        self.rng = random.Random(seed)
+        self.latencies = {kind: [] for kind in INPUT_KINDS}
+        self.failures = []
+
+    def _pump(self, max_sleep_ms):
+        """處理事件並隨機等待，讓匯流排寫入與計時器和輸入交錯"""
+        self.qt_app.processEvents()
+        if max_sleep_ms:
+            time.sleep(self.rng.uniform(0, max_sleep_ms) / 1000)
+
+    # 輸入
+
+    def _slider(self):
+        """拖曳一個滑條數步"""
+        slider, _, _ = self.rng.choice(self.window.vcp_controls)
+        slider.setSliderDown(True)
+        for _ in range(self.rng.randint(1, 6)):
+            slider.setValue(self.rng.randint(slider.minimum(), slider.maximum()))
+            self._pump(3)
+        slider.setSliderDown(False)
+
+    def _color_temp(self):
+        slider = self.window.slider_temp
+        slider.setSliderDown(True)
+        for _ in range(self.rng.randint(1, 4)):
+            slider.setValue(self.rng.randrange(KELVIN_MIN, KELVIN_MAX + 1, KELVIN_STEP))
+            self._pump(3)
+        slider.setSliderDown(False)
+
+    def _hotkey(self):
+        action, arg = self.rng.choice(HOTKEYS)
+        self.window.hotkey_manager.hotkey_triggered.emit(action, arg, time.perf_counter())
+
+    def _preset(self):
+        self.window.load_preset_and_show_compact(self.rng.randint(1, 4))
+
+    def _hide(self):
+        self.window._auto_hide_ui()
+
+    def _leave(self):
+        """滑鼠離開面板：保存變更到目前的預設"""
+        self.window._start_auto_hide_timer()
+
+    def run_round(self, inputs):
+        """執行一輪亂數輸入，返回輸入數"""
+        for _ in range(inputs):
+            kind = self.rng.choice(INPUT_KINDS)
+            start = time.perf_counter()
+            getattr(self, f'_{kind}')()
+            self.latencies[kind].append((time.perf_counter() - start) * 1000)
+            self._pump(2)
+        return inputs
+
+    # 檢查
+
+    def settle(self):
+        """等待色溫合併、匯流排寫入與狀態批次全部完成"""
+        for _ in range(3):
+            self.qt_app.processEvents()
+            self.window.bus.wait_idle(30)
+        self.window.state.flush()
+        self.qt_app.processEvents()
+
+    def check(self, round_idx):
+        """比對硬體、vcp_temp、滑條與保存的預設，返回不一致的描述"""
+        window = self.window
+        problems = []
+        for monitor_idx, monitor in enumerate(self.controller.simulated_monitors):
+            for vcp_code, value in window.vcp_temp[monitor_idx].items():
+                actual = monitor.values[vcp_code][0]
+                if actual != value:
+                    problems.append(f"monitor {monitor_idx} 0x{vcp_code:02X}:"
+                                    f" hardware {actual} != vcp_temp {value}")
+
+        values = window.vcp_temp[window.monitor_idx]
+        for slider, label, vcp_code in window.vcp_controls:
+            if vcp_code not in values:
+                continue
+            expected = window._slider_value(vcp_code, values[vcp_code])
+            if slider.value() != expected or label.text() != str(expected):
+                problems.append(f"slider 0x{vcp_code:02X}: {slider.value()}"
+                                f" / label {label.text()} != {expected}")
+
+        # 離開面板後目前的預設應等於目前的值，並已寫入 config.ini
+        window._start_auto_hide_timer()
+        window.preset_manager._do_save_config()
+        preset_id = window.current_preset[window.monitor_idx]
+        preset = window.preset_manager.get_preset(window.monitor_idx, preset_id) or {}
+        for vcp_code, value in preset.items():
+            if vcp_code in values and values[vcp_code] != value:
+                problems.append(f"preset {preset_id} 0x{vcp_code:02X}:"
+                                f" saved {value} != vcp_temp {values[vcp_code]}")
+        on_disk = read_config(window.preset_manager.config_file)
+        for section in window.preset_manager.config.sections():
+            if dict(on_disk[section]) != dict(window.preset_manager.config[section]):
+                problems.append(f"config.ini [{section}] differs from memory")
+
+        return [f"round {round_idx}: {problem}" for problem in problems]
+
+
+def _memory_kb():
+    """目前的 Python 記憶體用量（不含本測試自己保存的延遲紀錄）"""
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, __file__)])
+    return sum(stat.size for stat in snapshot.statistics('filename')) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="混合輸入壓力與長時間測試")
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--inputs', type=int, default=200, help="每輪的輸入數")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--monitors', type=int, default=2)
+    args = parser.parse_args()
+
+    # 在暫存目錄中執行，避免覆寫使用者的 config.ini 與狀態檔
+    workdir = tempfile.mkdtemp(prefix='vcpanel-stress-')
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        with open('config.ini', 'w', encoding='utf-8') as config_file:
+            config_file.write(CONFIG_TEXT.format(monitors=args.monitors, seed=args.seed))
+        os.environ[BACKEND_ENV] = 'simulated'
+
+        qt_app = QApplication.instance() or QApplication(sys.argv)
+        import app
+
+        tracemalloc.start()
+        controller = create_controller()
+        window = app.MyWindow(controller)
+        run = StressRun(qt_app, window, controller, args.seed)
+
+        memory = []
+        total_inputs = 0
+        busy_time = 0.0
+        for round_idx in range(1, args.rounds + 1):
+            start = time.perf_counter()
+            total_inputs += run.run_round(args.inputs)
+            run.settle()
+            busy_time += time.perf_counter() - start
+            run.failures += run.check(round_idx)
+            memory.append(_memory_kb())
+            print(f"round {round_idx:3d}: {memory[-1]:8.0f} KB"
+                  f"  failures {len(run.failures)}", flush=True)
+
+        print()
+        print(f"輸入數   : {total_inputs}（{total_inputs / busy_time:.0f} 次/秒，含等待匯流排）")
+        for kind, values in run.latencies.items():
+            if values:
+                print(f"{kind:10s}: {len(values):5d} 次  p50 {_percentile(values, 50):.2f}"
+                      f" / p99 {_percentile(values, 99):.2f} / max {max(values):.2f} ms")
+        print(window.bus.summary())
+        if len(memory) > 1:
+            # 第一輪包含延遲建立的元件，以之後的輪次計算成長
+            growth = memory[-1] - memory[0]
+            print(f"記憶體   : {memory[0]:.0f} -> {memory[-1]:.0f} KB"
+                  f"（{growth / (len(memory) - 1):+.1f} KB/輪）")
+
+        window.bus.close()
+        window.hotkey_manager.cleanup()
+        tracemalloc.stop()
+
+        if run.failures:
+            print(f"\n不一致 {len(run.failures)} 筆（--seed {args.seed}）：")
+            for failure in run.failures[:20]:
+                print("  " + failure)
+            return 1
+        print("\n所有輪次一致")
+        return 0
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())